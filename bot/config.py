@@ -7,9 +7,9 @@ Config: Bot Config
 import logging
 import sys
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Literal
 
-from pydantic import ValidationError, field_validator
+from pydantic import ValidationError, field_validator, model_validator
 from pydantic.networks import UrlConstraints
 from pydantic_core import MultiHostUrl
 from pydantic_settings import (
@@ -32,6 +32,12 @@ class ChannelInfo(TypedDict):
     channel_id: int
 
 
+class CacheConfig(TypedDict, total=False):
+    max_size: int
+    ttl: float
+    max_memory: int
+
+
 class Config(BaseSettings):
     """A general configuration setup to read either .env or environment keys."""
 
@@ -47,8 +53,28 @@ class Config(BaseSettings):
     BOT_SESSION: str = "Zaws-File-Share"
     BOT_MAX_MESSAGE_CACHE_SIZE: int = 100
 
-    MONGO_DB_URL: MongoSRVDsn
+    STORAGE_BACKEND: Literal["mongo", "sqlite", "memory"] = "mongo"
+    SQLITE_PATH: str = f"{BASE_PATH}/teleshare.db"
+
+    MONGO_DB_URL: MongoSRVDsn | None = None
     MONGO_DB_NAME: str = "Zaws-File-Share"
+    MONGO_MAX_POOL_SIZE: int = 50
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: int = 300000
+    MONGO_CONNECT_TIMEOUT_MS: int = 10000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    MONGO_SOCKET_TIMEOUT_MS: int = 0
+    MONGO_COMPRESSORS: str = ""
+    VERIFY_QUERY_PLANS: bool = False
+    WRITE_BEHIND_BATCH_SIZE: int = 500
+    WRITE_BEHIND_INTERVAL: float = 1.0
+    WRITE_BEHIND_MAX_PENDING: int = 10000
+    LINK_CHUNK_SIZE: int = 1000
+    LINK_MIRROR: bool = False
+    LINK_MIRROR_PATH: str = f"{BASE_PATH}/link_mirror.db"
+
+    # Cache config, per cache name overrides of max_size, ttl and max_memory
+    CACHES: dict[str, CacheConfig] = {}
 
     # Bot main config
     RATE_LIMITER: bool = True
@@ -58,6 +84,13 @@ class Config(BaseSettings):
     PROTECT_CONTENT: bool = True
     FORCE_SUB_CHANNELS: list[int] = []
     AUTO_GENERATE_LINK: bool = True
+    STATS_RECONCILE_SECONDS: int = 3600
+    LINK_TTL: int = 0
+    LINK_SWEEP_SECONDS: int = 600
+    LINK_STATS_FLUSH_SECONDS: int = 60
+    LINK_PREWARM_COUNT: int = 100
+    LINK_FILTER_CAPACITY: int = 1000000
+    OPTIONS_POLL_INTERVAL: int = 30
 
     # Injected Config
     channels_n_invite: dict[str, ChannelInfo] = {}
@@ -73,6 +106,13 @@ class Config(BaseSettings):
             return [value]
         return value
 
+    @model_validator(mode="after")
+    def require_mongo_url(self) -> "Config":
+        if self.STORAGE_BACKEND == "mongo" and self.MONGO_DB_URL is None:
+            msg = "MONGO_DB_URL is required when STORAGE_BACKEND is 'mongo'"
+            raise ValueError(msg)
+        return self
+
     @field_validator("channels_n_invite", mode="before")
     @classmethod
     def ignore_keys(cls, value: dict[str, ChannelInfo]) -> dict[str, ChannelInfo]:
@@ -1,3 +1,52 @@
+from .backends import get_storage
+from .counters import StatsModel
+from .indexes import INDEX_MANIFEST, QUERY_SHAPES, QueryPlanError, QueryShape
+from .invalidation import (
+    CHANGE_STREAM_HISTORY_LOST,
+    LINK_NAMESPACE,
+    USER_NAMESPACE,
+    InvalidationBus,
+    invalidation_bus,
+)
+from .link_access import LinkAccessCounter, link_access_counter
+from .link_mirror import LinkMirror
+from .link_schema import LINK_SCHEMA_VERSION, decode_files, encode_files
+from .memory_storage import MemoryStorage
+from .moderation import ModerationResult
 from .mongo_db import MongoDB
+from .recipients import CODEX_SOURCE, USERS_SOURCE, RecipientBatch
+from .registry import DatabaseRegistry, database_registry
+from .sqlite_storage import SQLiteStorage
+from .storage import StorageBackend
+from .user_context import UserContext
 
-__all__ = ["MongoDB"]
+__all__ = [
+    "CHANGE_STREAM_HISTORY_LOST",
+    "CODEX_SOURCE",
+    "INDEX_MANIFEST",
+    "LINK_NAMESPACE",
+    "LINK_SCHEMA_VERSION",
+    "QUERY_SHAPES",
+    "USERS_SOURCE",
+    "USER_NAMESPACE",
+    "DatabaseRegistry",
+    "InvalidationBus",
+    "LinkAccessCounter",
+    "LinkMirror",
+    "MemoryStorage",
+    "ModerationResult",
+    "MongoDB",
+    "QueryPlanError",
+    "QueryShape",
+    "RecipientBatch",
+    "SQLiteStorage",
+    "StatsModel",
+    "StorageBackend",
+    "UserContext",
+    "database_registry",
+    "decode_files",
+    "encode_files",
+    "get_storage",
+    "invalidation_bus",
+    "link_access_counter",
+]
@@ -0,0 +1,23 @@
+from functools import cache
+
+from bot.config import config
+
+from .memory_storage import MemoryStorage
+from .mongo_db import MongoDB
+from .sqlite_storage import SQLiteStorage
+from .storage import StorageBackend
+
+
+@cache
+def get_storage() -> StorageBackend:
+    """
+    Returns the process-wide storage backend selected by config.STORAGE_BACKEND.
+
+    Returns:
+        StorageBackend: A MongoDB, SQLiteStorage or MemoryStorage instance.
+    """
+    if config.STORAGE_BACKEND == "sqlite":
+        return SQLiteStorage(path=config.SQLITE_PATH)
+    if config.STORAGE_BACKEND == "memory":
+        return MemoryStorage()
+    return MongoDB()
@@ -0,0 +1,119 @@
+import datetime
+from typing import ClassVar
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import BaseModel
+
+
+class StatsModel(BaseModel):
+    """
+    A model representing the bot's statistics.
+
+    Parameters:
+        links_count (int): The amount of links.
+        users_count (int): The amount of users.
+        links_per_day (float): Links created per day, measured over the last day.
+        users_per_hour (float): New users per hour, measured over the last hour.
+    """
+
+    links_count: int = 0
+    users_count: int = 0
+    links_per_day: float = 0
+    users_per_hour: float = 0
+
+
+class Counters:
+    """
+    Incrementally maintained document counters.
+
+    Counters live in the 'Counters' collection and are reconciled against estimated_document_count by
+    a periodic job, which also stores snapshots in 'CounterSnapshots' to measure growth rates.
+    """
+
+    db: AsyncIOMotorDatabase
+
+    COUNTED_COLLECTIONS: ClassVar[dict[str, str]] = {"links": "Files", "users": "Users"}
+    SNAPSHOT_RETENTION: ClassVar[datetime.timedelta] = datetime.timedelta(days=8)
+
+    async def increment_counter(self, name: str, amount: int = 1) -> None:
+        """
+        Increments a counter, use a negative amount to decrement it.
+
+        Parameters:
+            name (str): The counter name, either 'links' or 'users'.
+            amount (int): The amount to add.
+        """
+        if not amount:
+            return
+
+        await self.db["Counters"].update_one(
+            filter={"_id": name},
+            update={"$inc": {"value": amount}},
+            upsert=True,
+        )
+
+    async def reconcile_counters(self) -> None:
+        """
+        Resets the counters to each collection's estimated document count and stores a snapshot.
+        Should be scheduled periodically.
+        """
+        now = datetime.datetime.now(tz=datetime.timezone.utc)
+        snapshot: dict[str, int | datetime.datetime] = {"_id": now}
+
+        for name, collection in self.COUNTED_COLLECTIONS.items():
+            count = await self.db[collection].estimated_document_count()
+            await self.db["Counters"].update_one(
+                filter={"_id": name},
+                update={"$set": {"value": count}},
+                upsert=True,
+            )
+            snapshot[name] = count
+
+        await self.db["CounterSnapshots"].insert_one(snapshot)
+        await self.db["CounterSnapshots"].delete_many({"_id": {"$lt": now - self.SNAPSHOT_RETENTION}})
+
+    async def _growth_rate(self, name: str, current: int, window: datetime.timedelta) -> float:
+        """
+        Measures how much a counter grew per window using the closest snapshot older than the window.
+
+        Parameters:
+            name (str): The counter name.
+            current (int): The current counter value.
+            window (datetime.timedelta): The rate unit and lookback.
+
+        Returns:
+            float: The growth per window, 0 if there is no usable snapshot.
+        """
+        now = datetime.datetime.now(tz=datetime.timezone.utc)
+        collection = self.db["CounterSnapshots"]
+
+        snapshot = await collection.find_one({"_id": {"$lte": now - window}}, sort=[("_id", -1)])
+        if not snapshot:
+            snapshot = await collection.find_one({}, sort=[("_id", 1)])
+        if not snapshot or name not in snapshot:
+            return 0
+
+        snapshot_time = snapshot["_id"].replace(tzinfo=datetime.timezone.utc)
+        elapsed = (now - snapshot_time) / window
+        return (current - snapshot[name]) / elapsed if elapsed > 0 else 0
+
+    async def stats(self) -> StatsModel:
+        """
+        Retrieves the number of links and users in the database and their growth rates.
+
+        Returns:
+            StatsModel: The current statistics.
+        """
+        counters = {
+            document["_id"]: document["value"]
+            async for document in self.db["Counters"].find({"_id": {"$in": list(self.COUNTED_COLLECTIONS)}})
+        }
+        links_count = counters.get("links", 0)
+        users_count = counters.get("users", 0)
+
+        return StatsModel(
+            links_count=links_count,
+            users_count=users_count,
+            links_per_day=await self._growth_rate("links", links_count, datetime.timedelta(days=1)),
+            users_per_hour=await self._growth_rate("users", users_count, datetime.timedelta(hours=1)),
+        )
@@ -0,0 +1,128 @@
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Iterable, Sequence
+from typing import Any, ClassVar
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+
+
+class FileRegistry:
+    """
+    Tracks the canonical backup channel message of every backed up file, keyed by file_unique_id, and how
+    many links refer to it, so a file forwarded again is reused instead of copied and its message is only
+    deleted with the last link using it.
+    """
+
+    db: AsyncIOMotorDatabase
+
+    REGISTRY_CONCURRENCY: ClassVar[int] = 16
+
+    async def _gather_bounded(self, updates: Iterable[Awaitable[Any]]) -> list[Any]:
+        """
+        Awaits registry updates with at most REGISTRY_CONCURRENCY of them in flight.
+
+        Parameters:
+            updates (Iterable[Awaitable[Any]]): The updates to await.
+
+        Returns:
+            list[Any]: The results in the order of updates.
+        """
+        semaphore = asyncio.Semaphore(self.REGISTRY_CONCURRENCY)
+
+        async def bounded(update: Awaitable[Any]) -> Any:  # noqa: ANN401
+            async with semaphore:
+                return await update
+
+        return await asyncio.gather(*(bounded(i) for i in updates))
+
+    async def claim_registered_files(self, file_unique_ids: Sequence[str]) -> dict[str, int]:
+        """
+        Adds one reference per entry to registered files, each with one atomic update and a bounded amount of
+        them in flight, so their backup messages can't be released before the link reusing them is stored.
+
+        Parameters:
+            file_unique_ids (Sequence[str]): The file_unique_id of each file.
+
+        Returns:
+            dict[str, int]: The backup message ID of each claimed file, unregistered files are not claimed.
+        """
+        registry = self.db["FileRegistry"]
+        claims = Counter(file_unique_ids)
+        documents = await self._gather_bounded(
+            registry.find_one_and_update(
+                {"_id": file_unique_id},
+                {"$inc": {"refs": count}},
+                projection={"message_id": 1},
+            )
+            for file_unique_id, count in claims.items()
+        )
+        return {document["_id"]: document["message_id"] for document in documents if document is not None}
+
+    async def retain_registered_files(self, files: Sequence[tuple[str, int]]) -> dict[str, int]:
+        """
+        Registers newly backed up messages and adds one reference per entry with one bulk write, then reads
+        which message each file is registered with.
+
+        Parameters:
+            files (Sequence[tuple[str, int]]): The file_unique_id and backup message ID of each file.
+
+        Returns:
+            dict[str, int]: The registered backup message ID of each file, which differs from the given one
+                if another backup registered the file first.
+        """
+        references = Counter(files)
+        if not references:
+            return {}
+
+        registry = self.db["FileRegistry"]
+        await registry.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": file_unique_id},
+                    {"$setOnInsert": {"message_id": message_id}, "$inc": {"refs": count}},
+                    upsert=True,
+                )
+                for (file_unique_id, message_id), count in references.items()
+            ],
+            ordered=False,
+        )
+        return {
+            document["_id"]: document["message_id"]
+            async for document in registry.find(
+                {"_id": {"$in": list({file_unique_id for file_unique_id, _ in references})}},
+                {"message_id": 1},
+            )
+        }
+
+    async def release_registered_messages(self, message_ids: Sequence[int]) -> list[int]:
+        """
+        Removes one reference per entry from registered backup messages, each with one atomic update and a
+        bounded amount of them in flight, and unregisters the messages left without references.
+
+        Parameters:
+            message_ids (Sequence[int]): The backup message IDs of the deleted link.
+
+        Returns:
+            list[int]: The message IDs no link refers to anymore, including unregistered ones, safe to delete.
+        """
+        releases = Counter(message_ids)
+        deletable = await self._gather_bounded(self._release_message(i, count) for i, count in releases.items())
+        return [i for i, can_delete in zip(releases, deletable, strict=True) if can_delete]
+
+    async def _release_message(self, message_id: int, count: int) -> bool:
+        registry = self.db["FileRegistry"]
+        document = await registry.find_one_and_update(
+            {"message_id": message_id},
+            {"$inc": {"refs": -count}},
+            projection={"refs": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if document is None:
+            return True
+        if document["refs"] > 0:
+            return False
+
+        # A claim between both updates keeps the message.
+        result = await registry.delete_one({"_id": document["_id"], "refs": {"$lte": 0}})
+        return result.deleted_count == 1
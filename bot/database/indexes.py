@@ -0,0 +1,181 @@
+import contextlib
+import datetime
+import logging
+from typing import Any, NamedTuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+INDEX_MANIFEST: dict[str, list[IndexModel]] = {
+    "Files": [
+        IndexModel([("file_origin", ASCENDING)], name="file_origin"),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at", sparse=True),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id"),
+        IndexModel([("search_text", TEXT)], name="search_text", default_language="none"),
+    ],
+    "FileChunks": [
+        IndexModel([("link", ASCENDING), ("index", ASCENDING)], name="link_index", unique=True),
+    ],
+    "FileRegistry": [
+        IndexModel([("message_id", ASCENDING)], name="message_id"),
+    ],
+    "LinkStats": [
+        IndexModel([("day", ASCENDING)], name="day"),
+    ],
+}
+
+# Indexes no query uses anymore, dropped by ensure_indexes.
+RETIRED_INDEXES: dict[str, list[str]] = {
+    "Users": ["banned", "channels"],
+    "Files": ["files_message_id"],
+}
+
+
+class QueryShape(NamedTuple):
+    """
+    A query issued by the database layer, filled with sample values for explain().
+
+    Parameters:
+        collection (str): The collection name.
+        filter (dict[str, Any]): The query filter.
+        sort (dict[str, int] | None): The sort specification.
+    """
+
+    collection: str
+    filter: dict[str, Any]
+    sort: dict[str, int] | None = None
+
+
+QUERY_SHAPES: list[QueryShape] = [
+    QueryShape("Users", {"_id": 1}),
+    QueryShape("Users", {"_id": {"$in": [1, 2]}}),
+    QueryShape("Users", {"_id": {"$type": "number"}}, {"_id": ASCENDING}),
+    QueryShape("users", {"_id": {"$in": [1, 2]}}),
+    QueryShape("users", {"_id": {"$type": "number"}}, {"_id": ASCENDING}),
+    QueryShape("users", {"_id": {"$type": "number", "$gt": 1}}, {"_id": ASCENDING}),
+    QueryShape("Files", {"_id": "link"}),
+    QueryShape("Files", {"file_origin": 1}),
+    QueryShape("Files", {"_id": {"$gt": "link"}}, {"_id": ASCENDING}),
+    QueryShape("Files", {}, {"_id": ASCENDING}),
+    QueryShape(
+        "Files",
+        {"expires_at": {"$lte": datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)}},
+        {"expires_at": ASCENDING},
+    ),
+    QueryShape("Files", {"created_at": {"$type": "date"}}, {"created_at": DESCENDING, "_id": DESCENDING}),
+    QueryShape(
+        "Files",
+        {
+            "created_at": {"$lte": datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)},
+            "$nor": [
+                {"created_at": datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc), "_id": {"$gte": "link"}},
+            ],
+        },
+        {"created_at": DESCENDING, "_id": DESCENDING},
+    ),
+    QueryShape(
+        "Files",
+        {"created_at": {"$type": "date"}, "$text": {"$search": '"term"'}},
+        {"created_at": DESCENDING, "_id": DESCENDING},
+    ),
+    QueryShape(
+        "Files",
+        {
+            "created_at": {"$lte": datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)},
+            "$nor": [
+                {"created_at": datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc), "_id": {"$gte": "link"}},
+            ],
+            "$text": {"$search": '"term"'},
+        },
+        {"created_at": DESCENDING, "_id": DESCENDING},
+    ),
+    QueryShape("FileChunks", {"link": "link"}, {"index": ASCENDING}),
+    QueryShape("FileChunks", {"link": {"$in": ["link"]}}),
+    QueryShape("FileChunks", {}, {"_id": ASCENDING}),
+    QueryShape("FileChunks", {"_id": {"$gt": ObjectId()}}, {"_id": ASCENDING}),
+    QueryShape("FileChunks", {"link": "link", "index": {"$gte": 0}}),
+    QueryShape("Counters", {"_id": {"$in": ["links", "users"]}}),
+    QueryShape(
+        "CounterSnapshots",
+        {"_id": {"$lte": datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)}},
+        {"_id": DESCENDING},
+    ),
+    QueryShape("CounterSnapshots", {}, {"_id": ASCENDING}),
+    QueryShape(
+        "CounterSnapshots",
+        {"_id": {"$lt": datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)}},
+    ),
+    QueryShape("BotSettings", {"_id": "MainOptions"}),
+    QueryShape("FileRegistry", {"_id": "unique_id"}),
+    QueryShape("FileRegistry", {"_id": {"$in": ["unique_id"]}}),
+    QueryShape("FileRegistry", {"message_id": 1}),
+    QueryShape("FileRegistry", {"_id": "unique_id", "refs": {"$lte": 0}}),
+    QueryShape("LinkStats", {"_id": "2000-01-01:link"}),
+    QueryShape("LinkStats", {"day": {"$gte": "2000-01-01"}}),
+    QueryShape("Migrations", {"_id": "link_schema_v2"}),
+    QueryShape("Migrations", {"_id": "codex_users_merge"}),
+]
+
+
+class QueryPlanError(Exception):
+    """
+    Raised when a query shape is executed with a collection scan.
+
+    Parameters:
+        shapes (list[QueryShape]): The query shapes that scan a whole collection.
+    """
+
+    def __init__(self, shapes: list[QueryShape]) -> None:
+        super().__init__("Queries without an index: " + ", ".join(f"{i.collection} {i.filter}" for i in shapes))
+
+
+def _has_stage(plan: Any, stage: str) -> bool:  # noqa: ANN401
+    if isinstance(plan, dict):
+        return plan.get("stage") == stage or any(_has_stage(i, stage) for i in plan.values())
+    if isinstance(plan, list):
+        return any(_has_stage(i, stage) for i in plan)
+    return False
+
+
+class Indexes:
+    db: AsyncIOMotorDatabase
+
+    logger = logging.getLogger(__name__)
+
+    async def ensure_indexes(self) -> None:
+        """
+        Creates every index of INDEX_MANIFEST and drops the ones of RETIRED_INDEXES, existing indexes are left
+        untouched. Conflicting index definitions are logged and skipped.
+        """
+        for collection, index_names in RETIRED_INDEXES.items():
+            for index_name in index_names:
+                with contextlib.suppress(OperationFailure):
+                    await self.db[collection].drop_index(index_name)
+
+        for collection, index_models in INDEX_MANIFEST.items():
+            try:
+                await self.db[collection].create_indexes(index_models)
+            except OperationFailure:  # noqa: PERF203
+                self.logger.exception("Couldn't create indexes for %s", collection)
+
+    async def verify_query_plans(self) -> None:
+        """
+        Runs explain() on every query shape of QUERY_SHAPES.
+
+        Raises:
+            QueryPlanError: If any query shape does a COLLSCAN.
+        """
+        collection_scans = []
+        for shape in QUERY_SHAPES:
+            command: dict[str, Any] = {"find": shape.collection, "filter": shape.filter}
+            if shape.sort:
+                command["sort"] = shape.sort
+
+            explain = await self.db.command("explain", command, verbosity="queryPlanner")
+            if _has_stage(explain.get("queryPlanner", {}).get("winningPlan"), "COLLSCAN"):
+                collection_scans.append(shape)
+
+        if collection_scans:
+            raise QueryPlanError(collection_scans)
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from collections.abc import Callable, Hashable, Iterable
+from typing import ClassVar
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+
+USER_NAMESPACE = "user"
+LINK_NAMESPACE = "link"
+
+CHANGE_STREAM_HISTORY_LOST = 286
+
+
+class InvalidationBus:
+    """
+    Spreads cache key invalidations from writers to the caches that hold those keys.
+
+    Writers publish invalidations locally after every write, and watch() turns change events of other
+    processes into the same invalidations, so cached readers can keep entries for hours.
+
+    Attributes:
+        COLLECTION_NAMESPACES (dict[str, str]): The namespace invalidated by changes of each collection.
+        live (bool): Whether watch() is streaming the changes of other processes without a gap.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    COLLECTION_NAMESPACES: ClassVar[dict[str, str]] = {"Users": USER_NAMESPACE, "Files": LINK_NAMESPACE}
+
+    def __init__(self) -> None:
+        self._subscribers: dict[str, list[Callable[[Hashable], object]]] = {}
+        self._reset_callbacks: list[Callable[[], object]] = []
+        self.live = False
+
+    def subscribe_reset(self, callback: Callable[[], object]) -> None:
+        """
+        Registers a callback run when watch() reopens the stream without a resume token, e.g. after the change
+        history was lost, once the new stream is open. Anything kept in sync through the bus must then be
+        cleared or reloaded.
+
+        Parameters:
+            callback (Callable[[], object]): Called without arguments.
+        """
+        self._reset_callbacks.append(callback)
+
+    def subscribe(self, namespace: str, callback: Callable[[Hashable], object]) -> None:
+        """
+        Registers a callback that receives every invalidated key of a namespace.
+
+        Parameters:
+            namespace (str): The namespace, e.g. USER_NAMESPACE.
+            callback (Callable[[Hashable], object]): Called with the invalidated key.
+        """
+        self._subscribers.setdefault(namespace, []).append(callback)
+
+    def publish(self, namespace: str, key: Hashable) -> None:
+        """
+        Invalidates a key in every cache subscribed to the namespace.
+
+        Parameters:
+            namespace (str): The namespace.
+            key (Hashable): The invalidated key.
+        """
+        for callback in self._subscribers.get(namespace, []):
+            callback(key)
+
+    def publish_many(self, namespace: str, keys: Iterable[Hashable]) -> None:
+        """
+        Invalidates many keys of a namespace in one pass.
+
+        Parameters:
+            namespace (str): The namespace.
+            keys (Iterable[Hashable]): The invalidated keys.
+        """
+        callbacks = self._subscribers.get(namespace, [])
+        for key in keys:
+            for callback in callbacks:
+                callback(key)
+
+    async def watch(self, db: AsyncIOMotorDatabase, retry_seconds: int = 30) -> None:
+        """
+        Publishes an invalidation for every document changed in a watched collection by any process.
+        Stops if the deployment does not support change streams, cache TTLs then bound staleness.
+
+        Parameters:
+            db (AsyncIOMotorDatabase): The database to watch.
+            retry_seconds (int): Seconds to wait before reconnecting an interrupted stream.
+        """
+        pipeline = [
+            {
+                "$match": {
+                    "ns.coll": {"$in": list(self.COLLECTION_NAMESPACES)},
+                    "operationType": {"$in": ["insert", "update", "replace", "delete"]},
+                },
+            },
+            {"$project": {"ns": 1, "documentKey": 1}},
+        ]
+        resume_token, opened = None, False
+
+        while True:
+            try:
+                async with db.watch(pipeline=pipeline, resume_after=resume_token) as stream:
+                    # Changes made while no stream was open can't be replayed without a resume token.
+                    if opened and resume_token is None:
+                        for callback in self._reset_callbacks:
+                            callback()
+                    opened, self.live = True, True
+
+                    # The token advances on idle batches too, so a reconnect resumes where the stream stopped.
+                    resume_token = stream.resume_token
+                    while stream.alive:
+                        change = await stream.try_next()
+                        resume_token = stream.resume_token
+                        if change is not None:
+                            namespace = self.COLLECTION_NAMESPACES[change["ns"]["coll"]]
+                            self.publish(namespace, change["documentKey"]["_id"])
+            except OperationFailure as e:  # noqa: PERF203
+                self.live = False
+                if e.code != CHANGE_STREAM_HISTORY_LOST:
+                    self.logger.warning("Change streams unavailable, cache invalidation is local only")
+                    return
+                self.logger.warning("Invalidation change stream history lost, restarting from now")
+                resume_token = None
+            except PyMongoError:
+                self.live = False
+                self.logger.exception("Invalidation change stream interrupted, reconnecting")
+                await asyncio.sleep(retry_seconds)
+
+
+invalidation_bus = InvalidationBus()
@@ -0,0 +1,131 @@
+import asyncio
+import datetime
+import logging
+import time
+from collections import Counter
+from typing import ClassVar
+
+from .backends import get_storage
+
+
+class LinkAccessCounter:
+    """
+    Counts link accesses per UTC day in process memory and flushes them to the storage backend in one batch,
+    so serving a link never waits on a stats write.
+
+    Only one early flush runs at a time and none is started for retry_delay seconds after a flush failed. While
+    the backend is unreachable, the oldest days are dropped to keep at most max_retained pairs, and once only
+    today is left new links are not counted.
+
+    Parameters:
+        max_pending (int): The amount of pending link and day pairs that triggers an early flush.
+        max_retained (int): The maximum amount of pending link and day pairs.
+        retry_delay (float): The seconds to wait after a failed flush before flushing early again.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    background_tasks: ClassVar[set[asyncio.Task]] = set()
+
+    def __init__(self, max_pending: int = 10000, max_retained: int = 100000, retry_delay: float = 60) -> None:
+        self.max_pending = max_pending
+        self.max_retained = max_retained
+        self.retry_delay = retry_delay
+        self._pending: Counter[tuple[str, str]] = Counter()
+        self._flush_task: asyncio.Task | None = None
+        self._retry_at = 0.0
+
+    @staticmethod
+    def day(days_ago: int = 0) -> str:
+        """
+        Returns a UTC day as 'YYYY-MM-DD'.
+
+        Parameters:
+            days_ago (int): How many days before today.
+
+        Returns:
+            str: The formatted day.
+        """
+        now = datetime.datetime.now(tz=datetime.timezone.utc) - datetime.timedelta(days=days_ago)
+        return now.strftime("%Y-%m-%d")
+
+    def record(self, link: str) -> None:
+        """
+        Counts one access of a link.
+
+        Parameters:
+            link (str): The base64 link.
+        """
+        key = (link, self.day())
+        if key not in self._pending and len(self._pending) >= self.max_retained and not self._drop_oldest_day():
+            return
+
+        self._pending[key] += 1
+        if len(self._pending) >= self.max_pending and self._flush_task is None and time.monotonic() >= self._retry_at:
+            self._flush_task = asyncio.create_task(self.flush())
+            self.background_tasks.add(self._flush_task)
+            self._flush_task.add_done_callback(self._early_flush_done)
+
+    def _early_flush_done(self, task: asyncio.Task) -> None:
+        self.background_tasks.discard(task)
+        self._flush_task = None
+
+    def _drop_oldest_day(self) -> bool:
+        days = {day for _, day in self._pending}
+        if len(days) < 2:  # noqa: PLR2004
+            return False
+
+        oldest = min(days)
+        dropped = [key for key in self._pending if key[1] == oldest]
+        for key in dropped:
+            del self._pending[key]
+        self.logger.warning("Dropped %d pending link access counts of %s", len(dropped), oldest)
+        return True
+
+    async def flush(self) -> None:
+        """
+        Writes the pending counts, they are kept for the next flush if the write fails, up to max_retained.
+        """
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, Counter()
+        try:
+            await get_storage().record_link_accesses(pending)
+        except Exception:
+            self._retry_at = time.monotonic() + self.retry_delay
+            self._pending.update(pending)
+            while len(self._pending) > self.max_retained and self._drop_oldest_day():
+                pass
+            self.logger.exception("Couldn't flush %d link access counts", len(pending))
+        else:
+            self._retry_at = 0.0
+
+    async def top_links(self, days: int, limit: int) -> list[tuple[str, int]]:
+        """
+        Flushes the pending counts, then retrieves the most accessed links of the last days.
+
+        Parameters:
+            days (int): The amount of days counted, today included.
+            limit (int): The maximum amount of links.
+
+        Returns:
+            list[tuple[str, int]]: The links and their access counts, most accessed first.
+        """
+        await self.flush()
+        return await get_storage().top_links(since_day=self.day(days - 1), limit=limit)
+
+    async def prewarm(self, days: int, limit: int) -> None:
+        """
+        Loads the most accessed links of the last days into the link cache.
+
+        Parameters:
+            days (int): The amount of days counted, today included.
+            limit (int): The maximum amount of links.
+        """
+        storage = get_storage()
+        for link, _ in await self.top_links(days=days, limit=limit):
+            await storage.get_link_document(base64_file_link=link)
+
+
+link_access_counter = LinkAccessCounter()
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+
+from .invalidation import CHANGE_STREAM_HISTORY_LOST
+from .sqlite_storage import SQLiteStorage
+
+
+class LinkMirror:
+    """
+    A local SQLite copy of the 'Files' collection, kept in sync from a change stream.
+
+    The first sync copies the whole collection, later syncs resume from the stored resume token so
+    only the changes made while the bot was offline are applied. Lookups are only served once the
+    mirror has caught up, misses should fall back to MongoDB. Chunked links are not mirrored.
+
+    Parameters:
+        path (str): The mirror database file path.
+        mmap_size (int): Bytes of the mirror file to memory-map for reads.
+        batch_size (int): The amount of documents written per transaction during a full copy.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    STATE_ID = "LinkMirror"
+
+    def __init__(self, path: str, mmap_size: int = 256 * 1024 * 1024, batch_size: int = 1000) -> None:
+        self.storage = SQLiteStorage(path=path, mmap_size=mmap_size)
+        self.batch_size = batch_size
+        self.ready = False
+
+    async def get_link_document(self, base64_file_link: str) -> dict | None:
+        """
+        Retrieves a link document from the mirror.
+
+        Parameters:
+            base64_file_link (str): The base64-encoded link to the file.
+
+        Returns:
+            dict | None: The mirrored document, or None if it is missing or the mirror has not caught up.
+        """
+        if not self.ready:
+            return None
+        return await self.storage.get_link_document(base64_file_link)
+
+    async def discard(self, base64_file_link: str) -> None:
+        """
+        Removes a link from the mirror after a local write, the change stream brings back its new version.
+
+        Parameters:
+            base64_file_link (str): The base64-encoded link to the file.
+        """
+        await self.storage.delete_link_document(base64_file_link)
+
+    async def _save_resume_token(self, resume_token: dict | None) -> None:
+        await self.storage.update_settings(self.STATE_ID, {"resume_token": resume_token})
+
+    async def _full_copy(self, db: AsyncIOMotorDatabase) -> None:
+        """
+        Replaces the mirror with every document of 'Files'.
+        """
+        self.logger.info("Copying Files to the local link mirror")
+        await self.storage.clear_files()
+
+        batch = []
+        async for document in db["Files"].find({"chunks": {"$exists": False}}, batch_size=self.batch_size):
+            batch.append(document)
+            if len(batch) >= self.batch_size:
+                await self.storage.add_files(batch)
+                batch = []
+        await self.storage.add_files(batch)
+
+    async def _apply_change(self, change: dict) -> None:
+        link = change["documentKey"]["_id"]
+        document = change.get("fullDocument")
+
+        if document is None or "chunks" in document:
+            await self.storage.delete_link_document(link)
+        else:
+            await self.storage.add_files([document])
+
+    async def sync(self, db: AsyncIOMotorDatabase, retry_seconds: int = 30) -> None:
+        """
+        Catches up with the changes since the stored resume token, then applies new changes as they happen.
+        Does a full copy on the first run or when the resume token has expired from the oplog.
+        Stops serving lookups if the deployment does not support change streams.
+
+        Parameters:
+            db (AsyncIOMotorDatabase): The database holding 'Files'.
+            retry_seconds (int): Seconds to wait before reconnecting an interrupted stream.
+        """
+        state = await self.storage.get_settings(self.STATE_ID) or {}
+        resume_token = state.get("resume_token")
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}}]
+
+        while True:
+            try:
+                async with db["Files"].watch(
+                    pipeline=pipeline,
+                    full_document="updateLookup",
+                    resume_after=resume_token,
+                ) as stream:
+                    if resume_token is None:
+                        resume_token = stream.resume_token
+                        await self._full_copy(db)
+                        await self._save_resume_token(resume_token)
+
+                    while stream.alive:
+                        change = await stream.try_next()
+                        if change is not None:
+                            await self._apply_change(change)
+
+                        if stream.resume_token != resume_token:
+                            resume_token = stream.resume_token
+                            await self._save_resume_token(resume_token)
+
+                        if change is None and not self.ready:
+                            self.ready = True
+                            self.logger.info("Local link mirror caught up")
+            except OperationFailure as e:  # noqa: PERF203
+                if e.code != CHANGE_STREAM_HISTORY_LOST:
+                    self.ready = False
+                    self.logger.warning("Change streams unavailable, local link mirror disabled")
+                    return
+                self.logger.warning("Link mirror resume token expired, copying Files again")
+                resume_token = None
+            except PyMongoError:
+                self.logger.exception("Link mirror change stream interrupted, reconnecting")
+                await asyncio.sleep(retry_seconds)
+
+    async def close(self) -> None:
+        """
+        Closes the mirror database.
+        """
+        await self.storage.close()
@@ -0,0 +1,171 @@
+import contextlib
+import logging
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from pyrogram.file_id import FileType
+
+from bot.utilities.helpers import DataEncoder, DataValidationError
+
+LINK_SCHEMA_VERSION = 2
+
+
+def _file_type_value(file: dict) -> int | None:
+    if file.get("file_type"):
+        return FileType[file["file_type"]].value
+
+    with contextlib.suppress(DataValidationError):
+        return DataEncoder.decode_file_type(file["file_id"]).value
+    return None
+
+
+def encode_files(files: list[dict]) -> dict[str, Any]:
+    """
+    Encodes file entries into the compact columnar layout.
+
+    Every field is stored as a parallel array under a one letter key. Captions and media group IDs are
+    omitted when all empty, consecutive message IDs are stored as their first ID and the file types are
+    stored as pyrogram FileType values so delivery doesn't have to decode the file IDs.
+
+    Parameters:
+        files (list[dict]): File entries with 'file_id', 'message_id' and optionally 'caption',
+            'media_group_id' and 'file_type'.
+
+    Returns:
+        dict[str, Any]: The encoded files.
+    """
+    message_ids = [file["message_id"] for file in files]
+    encoded: dict[str, Any] = {
+        "v": LINK_SCHEMA_VERSION,
+        "n": len(files),
+        "f": [file["file_id"] for file in files],
+        "t": [_file_type_value(file) for file in files],
+    }
+
+    if message_ids and message_ids == list(range(message_ids[0], message_ids[0] + len(message_ids))):
+        encoded["r"] = message_ids[0]
+    else:
+        encoded["m"] = message_ids
+
+    captions = [file.get("caption") for file in files]
+    if any(captions):
+        encoded["c"] = captions
+
+    media_group_ids = [file.get("media_group_id") for file in files]
+    if any(i is not None for i in media_group_ids):
+        encoded["g"] = media_group_ids
+
+    return encoded
+
+
+def decode_files(files: list[dict] | dict[str, Any]) -> list[dict]:
+    """
+    Decodes the 'files' field of a link or chunk document, accepting both the legacy list of entries
+    and the compact columnar layout.
+
+    Parameters:
+        files (list[dict] | dict[str, Any]): The stored files.
+
+    Returns:
+        list[dict]: File entries with 'caption', 'file_id', 'message_id', 'media_group_id' and 'file_type'.
+    """
+    if isinstance(files, list):
+        return files
+
+    count = files["n"]
+    message_ids = files["m"] if "m" in files else range(files["r"], files["r"] + count)
+    captions = files.get("c") or [None] * count
+    media_group_ids = files.get("g") or [None] * count
+
+    return [
+        {
+            "caption": caption,
+            "file_id": file_id,
+            "message_id": message_id,
+            "media_group_id": media_group_id,
+            "file_type": FileType(file_type).name if file_type is not None else None,
+        }
+        for file_id, message_id, caption, media_group_id, file_type in zip(
+            files["f"],
+            message_ids,
+            captions,
+            media_group_ids,
+            files["t"],
+            strict=True,
+        )
+    ]
+
+
+class LinkSchema:
+    """
+    Rewrites link documents stored in the legacy layout into the compact layout.
+    """
+
+    db: AsyncIOMotorDatabase
+
+    logger = logging.getLogger(__name__)
+
+    MIGRATION_ID = f"link_schema_v{LINK_SCHEMA_VERSION}"
+
+    async def _migrate_collection(self, collection: str, batch_size: int) -> None:
+        """
+        Rewrites legacy documents of a collection in `_id` order, saving progress after every batch.
+
+        Parameters:
+            collection (str): 'Files' or 'FileChunks'.
+            batch_size (int): The amount of documents read and written per batch.
+        """
+        progress = self.db["Migrations"]
+        state = await progress.find_one({"_id": self.MIGRATION_ID}) or {}
+        if state.get(f"{collection}_done"):
+            return
+
+        last_id = state.get(f"{collection}_last_id")
+        while True:
+            id_filter = {"_id": {"$gt": last_id}} if last_id is not None else {}
+            documents = await (
+                self.db[collection]
+                .find(id_filter, projection={"files": 1}, sort=[("_id", 1)], limit=batch_size)
+                .to_list(length=batch_size)
+            )
+            if not documents:
+                break
+
+            requests = [
+                UpdateOne(
+                    {"_id": document["_id"], "files": {"$type": "array"}},
+                    {"$set": {"files": encode_files(document["files"])}},
+                )
+                for document in documents
+                if isinstance(document.get("files"), list)
+            ]
+            if requests:
+                await self.db[collection].bulk_write(requests, ordered=False)
+
+            last_id = documents[-1]["_id"]
+            await progress.update_one(
+                {"_id": self.MIGRATION_ID},
+                {"$set": {f"{collection}_last_id": last_id}},
+                upsert=True,
+            )
+
+        await progress.update_one({"_id": self.MIGRATION_ID}, {"$set": {f"{collection}_done": True}}, upsert=True)
+        self.logger.info("Migrated %s to the compact link schema", collection)
+
+    async def migrate_link_documents(self, batch_size: int = 500) -> None:
+        """
+        Rewrites every legacy link and chunk document into the compact layout in the background.
+
+        At most batch_size documents are held in memory, and an interrupted migration resumes after the
+        last saved `_id`. Documents written concurrently in the compact layout are left untouched.
+
+        Parameters:
+            batch_size (int): The amount of documents read and written per batch.
+        """
+        try:
+            for collection in ("Files", "FileChunks"):
+                await self._migrate_collection(collection, batch_size)
+        except PyMongoError:
+            self.logger.exception("Link schema migration interrupted, it resumes on the next start")
@@ -0,0 +1,53 @@
+from collections.abc import Mapping
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+
+class LinkStats:
+    """
+    Stores per-link per-day access counts in the 'LinkStats' collection, one document per link and UTC day.
+    """
+
+    db: AsyncIOMotorDatabase
+
+    async def record_link_accesses(self, accesses: Mapping[tuple[str, str], int]) -> None:
+        """
+        Adds aggregated link access counts with one unordered bulk write.
+
+        Parameters:
+            accesses (Mapping[tuple[str, str], int]): The access count per link and UTC day ('YYYY-MM-DD').
+        """
+        if not accesses:
+            return
+
+        await self.db["LinkStats"].bulk_write(
+            [
+                UpdateOne(
+                    {"_id": f"{day}:{link}"},
+                    {"$inc": {"count": count}, "$setOnInsert": {"link": link, "day": day}},
+                    upsert=True,
+                )
+                for (link, day), count in accesses.items()
+            ],
+            ordered=False,
+        )
+
+    async def top_links(self, since_day: str, limit: int) -> list[tuple[str, int]]:
+        """
+        Retrieves the most accessed links since a day.
+
+        Parameters:
+            since_day (str): The first UTC day ('YYYY-MM-DD') counted.
+            limit (int): The maximum amount of links.
+
+        Returns:
+            list[tuple[str, int]]: The links and their access counts, most accessed first.
+        """
+        pipeline = [
+            {"$match": {"day": {"$gte": since_day}}},
+            {"$group": {"_id": "$link", "count": {"$sum": "$count"}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": limit},
+        ]
+        return [(document["_id"], document["count"]) async for document in self.db["LinkStats"].aggregate(pipeline)]
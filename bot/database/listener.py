@@ -1,35 +1,40 @@
-from async_lru import alru_cache
+from collections.abc import Awaitable, Callable
+
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from .invalidation import USER_NAMESPACE, invalidation_bus
+from .user_context import UserContext
+from .write_behind import WriteBehindQueue
+
 
 class Listener:
     db: AsyncIOMotorDatabase
+    user_writes: WriteBehindQueue
+    read_user_context: Callable[[int], Awaitable[UserContext | None]]
 
-    @alru_cache(maxsize=69, ttl=20)
-    async def user_join_request(self, user_id: int, channel_id: int) -> bool:
+    async def user_join_request(self, user_id: int, channel_id: int, access_hash: int | None = None) -> bool:
         """
-        Adds a private channel to the user's list of channels in the database.
+        Queues a private channel to be added to the user's list of channels in the database.
 
         Parameters:
             user_id (int): The ID of the user.
             channel_id (int): The ID of the channel to add.
+            access_hash (int | None): The user's access hash, stored when given.
 
         Returns:
-            bool: Whether the operation was successful.
+            bool: Whether the operation was queued successfully.
         """
-        collection = self.db["Users"]
-        result = await collection.update_one(
-            filter={"_id": user_id},
-            update={"$addToSet": {"channels": channel_id}},
-            upsert=True,
+        queued = await self.user_writes.upsert(
+            key=user_id,
+            set_fields={"access_hash": access_hash} if access_hash is not None else None,
+            add_to_set={"channels": [channel_id]},
         )
+        invalidation_bus.publish(USER_NAMESPACE, user_id)
+        return queued
 
-        return result.acknowledged
-
-    @alru_cache(maxsize=69, ttl=2)
     async def user_requested_channels(self, user_id: int) -> list:
         """
-        Fetches the list of channels for the user from the database.
+        Fetches the list of channels for the user, reading through the user cache.
 
         Parameters:
             user_id (int): The ID of the user.
@@ -37,6 +42,5 @@ class Listener:
         Returns:
             list: The list of private channel IDs the user is part of.
         """
-        collection = self.db["Users"]
-        user_data = await collection.find_one({"_id": user_id}, {"_id": 0, "channels": 1})
-        return user_data.get("channels", []) if user_data else []
+        user_context = await self.read_user_context(user_id)
+        return user_context.channels if user_context else self.user_writes.pending_values(user_id, "channels")
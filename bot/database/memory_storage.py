@@ -0,0 +1,239 @@
+import copy
+import datetime
+import time
+from array import array
+from collections import Counter
+from collections.abc import AsyncIterator, Mapping, Sequence
+
+from bot.utilities.helpers import LinkCursor
+
+from .counters import StatsModel
+from .moderation import ModerationResult
+from .recipients import USERS_SOURCE, RecipientBatch
+from .storage import StorageBackend
+from .user_context import UserContext
+
+HOUR_SECONDS = 3600
+DAY_SECONDS = 86400
+LISTING_FIELDS = ("created_at", "created_by", "search_text")
+
+
+class MemoryStorage(StorageBackend):
+    """
+    A storage backend that keeps everything in process memory, nothing survives a restart.
+    Meant for tests, benchmarks and throwaway deployments.
+    """
+
+    def __init__(self) -> None:
+        self.files: dict[str, dict] = {}
+        self.users: dict[int, dict] = {}
+        self.settings: dict[str, dict] = {}
+        self.registry: dict[str, dict] = {}
+        self.link_accesses: Counter[tuple[str, str]] = Counter()
+
+    async def add_file(  # noqa: PLR0913
+        self,
+        file_link: str,
+        file_origin: int,
+        file_data: list[dict[str, str | int]],
+        expires_at: datetime.datetime | None = None,
+        created_by: int | None = None,
+        search_text: str = "",
+    ) -> bool:
+        # Milliseconds, the precision of link cursors.
+        created_at = self.files.get(file_link, {}).get("created_at", round(time.time(), 3))
+        self.files[file_link] = {
+            "_id": file_link,
+            "file_origin": file_origin,
+            "files": copy.deepcopy(file_data),
+            "created_at": created_at,
+            "created_by": created_by,
+            "search_text": search_text,
+        }
+        if expires_at is not None:
+            self.files[file_link]["expires_at"] = expires_at
+        self._link_filter_add(file_link)
+        return True
+
+    @staticmethod
+    def _link_document(document: dict) -> dict:
+        return {k: copy.deepcopy(v) for k, v in document.items() if k not in LISTING_FIELDS}
+
+    async def get_link_document(self, base64_file_link: str) -> dict | None:
+        document = self.files.get(base64_file_link)
+        return self._link_document(document) if document is not None else None
+
+    async def delete_link_document(self, base64_file_link: str) -> bool:
+        if self.files.pop(base64_file_link, None) is None:
+            return False
+        self._link_filter_discard([base64_file_link])
+        return True
+
+    async def iter_link_ids(self, batch_size: int = 10000) -> AsyncIterator[str]:  # noqa: ARG002
+        for link in list(self.files):
+            yield link
+
+    async def iter_link_documents(self, file_origin: int, batch_size: int = 1000) -> AsyncIterator[dict]:  # noqa: ARG002
+        for document in list(self.files.values()):
+            if document["file_origin"] == file_origin:
+                yield self._link_document(document)
+
+    async def find_links(
+        self,
+        limit: int,
+        after: LinkCursor | None = None,
+        terms: Sequence[str] = (),
+    ) -> list[dict]:
+        documents = []
+        for document in sorted(self.files.values(), key=lambda i: (i["created_at"], i["_id"]), reverse=True):
+            cursor = LinkCursor(round(document["created_at"] * 1000), document["_id"])
+            if after is not None and cursor >= after:
+                continue
+            if not all(term in document["search_text"] for term in terms):
+                continue
+
+            documents.append(
+                {
+                    "_id": document["_id"],
+                    "created_at": cursor.created_at,
+                    "created_by": document["created_by"],
+                    "search_text": document["search_text"],
+                },
+            )
+            if len(documents) >= limit:
+                break
+        return documents
+
+    async def get_expired_links(self, now: datetime.datetime, limit: int) -> list[dict]:
+        expired = sorted(
+            (i for i in self.files.values() if self.link_expired(i, now=now)),
+            key=lambda i: i["expires_at"],
+        )
+        return [self._link_document(i) for i in expired[:limit]]
+
+    async def delete_link_documents(self, base64_file_links: Sequence[str]) -> list[str]:
+        deleted = [i for i in base64_file_links if self.files.pop(i, None) is not None]
+        self._link_filter_discard(deleted)
+        return deleted
+
+    async def claim_registered_files(self, file_unique_ids: Sequence[str]) -> dict[str, int]:
+        claimed = {}
+        for file_unique_id in file_unique_ids:
+            if file_unique_id in self.registry:
+                self.registry[file_unique_id]["refs"] += 1
+                claimed[file_unique_id] = self.registry[file_unique_id]["message_id"]
+        return claimed
+
+    async def retain_registered_files(self, files: Sequence[tuple[str, int]]) -> dict[str, int]:
+        registered = {}
+        for file_unique_id, message_id in files:
+            entry = self.registry.setdefault(file_unique_id, {"message_id": message_id, "refs": 0})
+            entry["refs"] += 1
+            registered[file_unique_id] = entry["message_id"]
+        return registered
+
+    async def release_registered_messages(self, message_ids: Sequence[int]) -> list[int]:
+        releases = Counter(message_ids)
+        for file_unique_id, entry in list(self.registry.items()):
+            if entry["message_id"] not in releases:
+                continue
+            entry["refs"] -= releases[entry["message_id"]]
+            if entry["refs"] > 0:
+                del releases[entry["message_id"]]
+            else:
+                del self.registry[file_unique_id]
+        return list(releases)
+
+    async def record_link_accesses(self, accesses: Mapping[tuple[str, str], int]) -> None:
+        self.link_accesses.update(accesses)
+
+    async def top_links(self, since_day: str, limit: int) -> list[tuple[str, int]]:
+        counts: Counter[str] = Counter()
+        for (link, day), count in self.link_accesses.items():
+            if day >= since_day:
+                counts[link] += count
+        return counts.most_common(limit)
+
+    async def add_user(self, user_id: int, access_hash: int | None = None) -> bool:
+        user_data = self.users.setdefault(user_id, {"banned": False, "channels": [], "created_at": time.time()})
+        if access_hash is not None:
+            user_data["access_hash"] = access_hash
+        return True
+
+    async def load_user_context(self, user_id: int, access_hash: int | None = None) -> UserContext:
+        is_new = user_id not in self.users
+        await self.add_user(user_id, access_hash)
+        user_data = self.users[user_id]
+        return UserContext(
+            user_id=user_id,
+            banned=user_data["banned"],
+            channels=list(user_data["channels"]),
+            is_new=is_new,
+        )
+
+    async def ban_user(self, user_id: int) -> bool:
+        if user_id not in self.users:
+            return False
+        self.users[user_id]["banned"] = True
+        return True
+
+    async def unban_user(self, user_id: int) -> bool:
+        if user_id not in self.users:
+            return False
+        self.users[user_id]["banned"] = False
+        return True
+
+    async def set_users_banned(self, user_ids: Sequence[int], banned: bool) -> ModerationResult:  # noqa: FBT001
+        result = ModerationResult(changed=[], unchanged=[], missing=[])
+        for user_id in user_ids:
+            if user_id not in self.users:
+                result.missing.append(user_id)
+            elif self.users[user_id]["banned"] == banned:
+                result.unchanged.append(user_id)
+            else:
+                self.users[user_id]["banned"] = banned
+                result.changed.append(user_id)
+        return result
+
+    async def is_user_banned(self, user_id: int) -> bool:
+        return self.users.get(user_id, {}).get("banned", False)
+
+    async def user_join_request(self, user_id: int, channel_id: int, access_hash: int | None = None) -> bool:
+        await self.add_user(user_id, access_hash)
+        channels = self.users[user_id]["channels"]
+        if channel_id not in channels:
+            channels.append(channel_id)
+        return True
+
+    async def user_requested_channels(self, user_id: int) -> list:
+        return list(self.users.get(user_id, {}).get("channels", []))
+
+    async def iter_user_ids(self, batch_size: int = 1000) -> AsyncIterator[RecipientBatch]:
+        user_ids = sorted(self.users)
+        for i in range(0, len(user_ids), batch_size):
+            batch = user_ids[i : i + batch_size]
+            yield RecipientBatch(
+                user_ids=array("q", batch),
+                sources=bytearray([USERS_SOURCE] * len(batch)),
+                access_hashes=array("q", (self.users[i].get("access_hash", 0) for i in batch)),
+            )
+
+    async def cleanup_users(self, unsuccessful_ids: Sequence[int], unsuccessful_ids_codex: Sequence[int]) -> None:  # noqa: ARG002
+        for user_id in unsuccessful_ids:
+            self.users.pop(user_id, None)
+
+    async def stats(self) -> StatsModel:
+        now = time.time()
+        return StatsModel(
+            links_count=len(self.files),
+            users_count=len(self.users),
+            links_per_day=sum(i["created_at"] >= now - DAY_SECONDS for i in self.files.values()),
+            users_per_hour=sum(i["created_at"] >= now - HOUR_SECONDS for i in self.users.values()),
+        )
+
+    async def get_settings(self, document_id: str) -> dict | None:
+        settings = self.settings.get(document_id)
+        return dict(settings) if settings is not None else None
+
+    async def update_settings(self, document_id: str, settings: dict) -> None:
+        self.settings.setdefault(document_id, {}).update(settings)
@@ -1,9 +1,75 @@
-from async_lru import alru_cache
+from collections.abc import Awaitable, Callable, Sequence
+from typing import NamedTuple
+
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from .invalidation import USER_NAMESPACE, invalidation_bus
+from .user_context import UserContext
+from .write_behind import WriteBehindQueue
+
+
+class ModerationResult(NamedTuple):
+    """
+    The per-user outcome of a bulk ban or unban.
+
+    Parameters:
+        changed (list[int]): Users whose ban status was changed.
+        unchanged (list[int]): Users who already had the requested ban status.
+        missing (list[int]): User IDs that are not in the database.
+    """
+
+    changed: list[int]
+    unchanged: list[int]
+    missing: list[int]
 
 
 class Moderation:
     db: AsyncIOMotorDatabase
+    user_writes: WriteBehindQueue
+    read_user_context: Callable[[int], Awaitable[UserContext | None]]
+
+    async def set_users_banned(
+        self,
+        user_ids: Sequence[int],
+        banned: bool,  # noqa: FBT001
+        batch_size: int = 1000,
+    ) -> ModerationResult:
+        """
+        Bans or unbans many users with unordered bulk writes and invalidates their cached contexts at once.
+
+        Parameters:
+            user_ids (Sequence[int]): The IDs of the users.
+            banned (bool): Whether to ban or unban the users.
+            batch_size (int): The amount of users looked up and written per round trip.
+
+        Returns:
+            ModerationResult: Which users were changed, unchanged or missing.
+        """
+        await self.user_writes.flush()
+        result = ModerationResult(changed=[], unchanged=[], missing=[])
+        collection = self.db["Users"]
+
+        for i in range(0, len(user_ids), batch_size):
+            batch = user_ids[i : i + batch_size]
+            statuses = {
+                document["_id"]: document.get("banned", False)
+                async for document in collection.find({"_id": {"$in": list(batch)}}, {"banned": 1})
+            }
+
+            changed = [user_id for user_id in batch if user_id in statuses and statuses[user_id] != banned]
+            if changed:
+                await collection.bulk_write(
+                    [UpdateOne({"_id": user_id}, {"$set": {"banned": banned}}) for user_id in changed],
+                    ordered=False,
+                )
+
+            result.changed.extend(changed)
+            result.unchanged.extend(user_id for user_id in batch if statuses.get(user_id, not banned) == banned)
+            result.missing.extend(user_id for user_id in batch if user_id not in statuses)
+
+        invalidation_bus.publish_many(USER_NAMESPACE, result.changed)
+        return result
 
     async def ban_user(self, user_id: int) -> bool:
         """
@@ -21,6 +87,7 @@ class Moderation:
             update={"$set": {"_id": user_id, "banned": True}},
             upsert=False,
         )
+        invalidation_bus.publish(USER_NAMESPACE, user_id)
 
         return bool(result.matched_count)
 
@@ -40,12 +107,12 @@ class Moderation:
             update={"$set": {"_id": user_id, "banned": False}},
             upsert=False,
         )
+        invalidation_bus.publish(USER_NAMESPACE, user_id)
         return bool(result.matched_count)
 
-    @alru_cache(maxsize=69, ttl=15)
     async def is_user_banned(self, user_id: int) -> bool:
         """
-        Checks if a user is banned in the database.
+        Checks if a user is banned, reading through the user cache.
 
         Parameters:
             user_id (int): The ID of the user to check.
@@ -53,7 +120,5 @@ class Moderation:
         Returns:
             bool: True if the user is banned, False otherwise.
         """
-        collection = self.db["Users"]
-        user = await collection.find_one({"_id": user_id}, {"_id": 0, "banned": 1})
-
-        return user.get("banned", False) if user else False
+        user_context = await self.read_user_context(user_id)
+        return user_context.banned if user_context else False
@@ -1,84 +1,209 @@
-import dns.resolver
-from async_lru import alru_cache
-from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import ConfigurationError
+import asyncio
+import datetime
+from collections.abc import AsyncIterator, Sequence
+from functools import partial
+from typing import Any, ClassVar
 
-from bot.config import config
+import bson
+from pymongo import ReplaceOne
 
+from bot.config import config
+from bot.utilities.helpers import LinkCursor, MemoryCache
+
+from .counters import Counters
+from .file_registry import FileRegistry
+from .indexes import Indexes
+from .invalidation import LINK_NAMESPACE, USER_NAMESPACE, invalidation_bus
+from .link_mirror import LinkMirror
+from .link_schema import LinkSchema, decode_files, encode_files
+from .link_stats import LinkStats
 from .listener import Listener
 from .moderation import Moderation
-
-
-class MongoDB(Moderation, Listener):
+from .recipients import Recipients
+from .registry import database_registry
+from .storage import StorageBackend
+from .user_context import UserContextLoader
+from .write_behind import WriteBehindQueue
+
+
+class MongoDB(
+    Moderation,
+    Listener,
+    Recipients,
+    Counters,
+    UserContextLoader,
+    Indexes,
+    LinkSchema,
+    FileRegistry,
+    LinkStats,
+    StorageBackend,
+):
     """
     A class representing a MongoDB database connection.
 
+    The client and database handles are shared process-wide through the database registry.
+
     Parameters:
         name (str | None): The name of the database to connect to. Defaults to config.MONGO_DB_NAME.
+
+    Attributes:
+        link_cache (ClassVar[MemoryCache]): A process-wide cache of link documents keyed by link.
+        user_cache (ClassVar[MemoryCache]): A process-wide cache of user contexts keyed by user ID.
+        link_mirror (ClassVar[LinkMirror | None]): The local copy of 'Files' if config.LINK_MIRROR is enabled.
+        user_writes (WriteBehindQueue): The process-wide write-behind queue of 'Users'.
+        _user_writes (ClassVar[WriteBehindQueue | None]): The queue behind user_writes, created by the first instance.
+        _link_filter_subscribed (ClassVar[bool]): Whether the link filter follows the invalidation bus.
+        _link_filter_tasks (ClassVar[set[asyncio.Task]]): Link filter rebuilds in progress.
     """
 
+    link_cache: ClassVar[MemoryCache] = MemoryCache(
+        name="links",
+        max_size=10000,
+        ttl=21600,
+        max_memory=64 * 1024 * 1024,
+        sizeof=lambda document: len(bson.encode(document)),
+    )
+    user_cache: ClassVar[MemoryCache] = MemoryCache(name="users", max_size=100000, ttl=21600)
+    link_mirror: ClassVar[LinkMirror | None] = LinkMirror(path=config.LINK_MIRROR_PATH) if config.LINK_MIRROR else None
+    _user_writes: ClassVar[WriteBehindQueue | None] = None
+    _link_filter_subscribed: ClassVar[bool] = False
+    _link_filter_tasks: ClassVar[set[asyncio.Task]] = set()
+
     def __init__(self, name: str | None = None) -> None:
         """
-        Initializes the MongoDB connection.
+        Initializes the MongoDB connection from the shared registry.
 
         Raises:
             ConfigurationError: If the MongoDB connection configuration is invalid.
         """
-        try:
-            self.client = AsyncIOMotorClient(host=str(config.MONGO_DB_URL))
-        except ConfigurationError:
-            dns.resolver.default_resolver = dns.resolver.Resolver(configure=False)
-            dns.resolver.default_resolver.nameservers = ["8.8.8.8"]
-            self.client = AsyncIOMotorClient(host=str(config.MONGO_DB_URL))
-        self.db = self.client[name if name else config.MONGO_DB_NAME]
-
-    @alru_cache(maxsize=10, ttl=10)
-    async def add_user(self, user_id: int) -> bool:
+        self.client = database_registry.client
+        self.db = database_registry.get_database(name)
+
+        if MongoDB._user_writes is None:
+            MongoDB._user_writes = WriteBehindQueue(
+                collection=self.db["Users"],
+                max_batch_size=config.WRITE_BEHIND_BATCH_SIZE,
+                flush_interval=config.WRITE_BEHIND_INTERVAL,
+                max_pending=config.WRITE_BEHIND_MAX_PENDING,
+                on_upserted=partial(self.increment_counter, "users"),
+            )
+        self.user_writes = MongoDB._user_writes
+
+    async def add_user(self, user_id: int, access_hash: int | None = None) -> bool:
         """
-        Adds a user to the database.
+        Queues a user to be added to the database.
 
         Parameters:
             user_id (int): The ID of the user to add.
+            access_hash (int | None): The user's access hash, stored when given.
 
         Returns:
-            bool: Whether the user was added successfully.
+            bool: Whether the user was queued successfully.
         """
-        collection = self.db["Users"]
-        result = await collection.update_one(
-            filter={"_id": user_id},
-            update={"$set": {"_id": user_id}},
-            upsert=True,
-        )
-        return result.acknowledged
-
-    async def add_file(self, file_link: str, file_origin: int, file_data: list[dict[str, str | int]]) -> bool:
+        set_fields: dict = {"_id": user_id}
+        if access_hash is not None:
+            set_fields["access_hash"] = access_hash
+        return await self.user_writes.upsert(key=user_id, set_fields=set_fields)
+
+    async def add_file(  # noqa: PLR0913
+        self,
+        file_link: str,
+        file_origin: int,
+        file_data: list[dict[str, str | int]],
+        expires_at: datetime.datetime | None = None,
+        created_by: int | None = None,
+        search_text: str = "",
+    ) -> bool:
         """
         Adds a file to the database.
 
+        Files are stored in the compact link schema. Links with more than config.LINK_CHUNK_SIZE files are
+        stored as a header document in 'Files' and fixed-size chunks in 'FileChunks', written before the
+        header so readers never see a partial link.
+
         Parameters:
             file_link (str): The link to the file.
             file_origin (int): The origin of the file.
             file_data (list[dict]): The data associated with the file.
+            expires_at (datetime.datetime | None): When the link expires, None to keep it forever.
+            created_by (int | None): The ID of the user that created the link.
+            search_text (str): The link's captions and file names normalized by SearchText.normalize.
 
         Returns:
             bool: Whether the file was added successfully.
         """
-        collection = self.db["Files"]
-        result = await collection.update_one(
-            filter={"_id": file_link},
-            update={
-                "$set": {
-                    "file_origin": file_origin,
-                    "files": file_data,
-                },
-            },
-            upsert=True,
-        )
+        chunk_size = config.LINK_CHUNK_SIZE
+        chunks = [file_data[i : i + chunk_size] for i in range(0, len(file_data), chunk_size)]
+        update: dict[str, dict[str, Any]]
+
+        if len(chunks) > 1:
+            await self.db["FileChunks"].bulk_write(
+                [
+                    ReplaceOne(
+                        {"link": file_link, "index": index},
+                        {"link": file_link, "index": index, "files": encode_files(files)},
+                        upsert=True,
+                    )
+                    for index, files in enumerate(chunks)
+                ],
+            )
+            update = {
+                "$set": {"file_origin": file_origin, "files_count": len(file_data), "chunks": len(chunks)},
+                "$unset": {"files": ""},
+            }
+        else:
+            update = {
+                "$set": {"file_origin": file_origin, "files": encode_files(file_data)},
+                "$unset": {"files_count": "", "chunks": ""},
+            }
+
+        if expires_at is not None:
+            update["$set"]["expires_at"] = expires_at
+        else:
+            update["$unset"]["expires_at"] = ""
+        update["$set"].update(created_by=created_by, search_text=search_text)
+        update["$setOnInsert"] = {"created_at": datetime.datetime.now(tz=datetime.timezone.utc)}
+
+        result = await self.db["Files"].update_one(filter={"_id": file_link}, update=update, upsert=True)
+        if result.upserted_id is None:
+            # Drop chunks left over from a longer version of the link
+            stale_chunks = len(chunks) if len(chunks) > 1 else 0
+            await self.db["FileChunks"].delete_many({"link": file_link, "index": {"$gte": stale_chunks}})
+
+        invalidation_bus.publish(LINK_NAMESPACE, file_link)
+        if self.link_mirror:
+            await self.link_mirror.discard(file_link)
+        if result.upserted_id is not None:
+            await self.increment_counter("links")
         return result.acknowledged
 
+    async def iter_link_files(self, link_document: dict) -> AsyncIterator[list[dict]]:
+        """
+        Streams the file entries of a link document, reading chunked links one chunk per round trip.
+
+        Parameters:
+            link_document (dict): A document returned by get_link_document.
+
+        Yields:
+            list[dict]: The next chunk of file entries.
+        """
+        if "chunks" not in link_document:
+            if link_document.get("files"):
+                yield decode_files(link_document["files"])
+            return
+
+        cursor = self.db["FileChunks"].find(
+            filter={"link": link_document["_id"]},
+            projection={"_id": 0, "files": 1},
+            sort=[("index", 1)],
+            batch_size=1,
+        )
+        async for chunk in cursor:
+            yield decode_files(chunk["files"])
+
     async def delete_link_document(self, base64_file_link: str) -> bool:
         """
-        Deletes a link document from the database.
+        Deletes a link document and its chunks from the database.
 
         Parameters:
             base64_file_link (str): The base64-encoded link to the file.
@@ -86,76 +211,248 @@ class MongoDB(Moderation, Listener):
         Returns:
             bool: Whether the document was deleted successfully.
         """
-        collection = self.db["Files"]
-        result = await collection.delete_one(
+        result = await self.db["Files"].delete_one(
             filter={"_id": base64_file_link},
         )
+        await self.db["FileChunks"].delete_many({"link": base64_file_link})
+        invalidation_bus.publish(LINK_NAMESPACE, base64_file_link)
+        if self.link_mirror:
+            await self.link_mirror.discard(base64_file_link)
+        await self.increment_counter("links", -result.deleted_count)
         return result.deleted_count > 0
 
-    async def get_link_document(self, base64_file_link: str) -> dict | None:
+    async def iter_link_ids(self, batch_size: int = 10000) -> AsyncIterator[str]:
         """
-        Retrieves a link document from the database.
+        Streams the ID of every link, read from the _id index only.
 
         Parameters:
-            base64_file_link (str): The base64-encoded link to the file.
+            batch_size (int): The cursor batch size.
+
+        Yields:
+            str: A link ID.
+        """
+        cursor = self.db["Files"].find({}, {"_id": 1}, sort=[("_id", 1)], batch_size=batch_size)
+        async for document in cursor:
+            yield document["_id"]
+
+    async def count_links(self) -> int:
+        """
+        Estimates the stored links from the collection metadata, the counters may not be reconciled yet.
 
         Returns:
-            dict | None: The document associated with the link, or None if not found.
+            int: The estimated amount of links.
         """
-        collection = self.db["Files"]
-        pipeline = [{"$match": {"_id": base64_file_link}}]
+        return await self.db["Files"].estimated_document_count()
 
-        result = await collection.aggregate(pipeline).to_list(length=None)
-        return result[0] if result else None
+    async def build_link_filter(self, min_capacity: int, error_rate: float = 0.01) -> None:
+        """
+        Streams every link ID into a new counting Bloom filter, then answers link_may_exist with it.
 
-    async def get_user_ids(self) -> tuple[list[int], list[int]]:
+        Links are added from the invalidation bus, which carries the link writes of this and, through change
+        streams, every other process. Deletes are published there too, so deleted links stay present until
+        the filter is built again. The filter is rebuilt when the change stream history was lost.
+
+        Parameters:
+            min_capacity (int): The least amount of links the filter is sized for.
+            error_rate (float): The false positive rate at capacity.
         """
-        Retrieves the IDs of all users in the database.
+        if not self._link_filter_subscribed:
+            MongoDB._link_filter_subscribed = True
+            invalidation_bus.subscribe(LINK_NAMESPACE, lambda key: self._link_filter_add(str(key)))
+            invalidation_bus.subscribe_reset(lambda: self._rebuild_link_filter(min_capacity, error_rate))
+        await super().build_link_filter(min_capacity=min_capacity, error_rate=error_rate)
+
+    def _rebuild_link_filter(self, min_capacity: int, error_rate: float) -> None:
+        # Links written while events were lost are missing, so lookups go to the database until rebuilt.
+        self.link_filter = None
+        task = asyncio.create_task(self.build_link_filter(min_capacity=min_capacity, error_rate=error_rate))
+        self._link_filter_tasks.add(task)
+        task.add_done_callback(self._link_filter_tasks.discard)
+
+    def link_may_exist(self, base64_file_link: str) -> bool:
+        """
+        Checks the link filter without touching the database, only while the invalidation bus streams the
+        link writes of other processes.
+
+        Parameters:
+            base64_file_link (str): The base64-encoded link.
 
         Returns:
-            tuple[list[int], list[int]]: A tuple containing two lists of user IDs.
+            bool: False if the link is surely not stored.
         """
-        pipeline = [
-            {"$project": {"_id": 1}},
-            {"$group": {"_id": None, "user_ids": {"$addToSet": "$_id"}}},
-            {"$project": {"_id": 0, "user_ids": 1}},
-        ]
+        return not invalidation_bus.live or super().link_may_exist(base64_file_link)
+
+    async def iter_link_documents(self, file_origin: int, batch_size: int = 1000) -> AsyncIterator[dict]:
+        """
+        Streams every link document of an origin.
+
+        Parameters:
+            file_origin (int): The chat ID the files are stored in.
+            batch_size (int): The cursor batch size.
+
+        Yields:
+            dict: A link document, chunked links only hold their header.
+        """
+        cursor = self.db["Files"].find(filter={"file_origin": file_origin}, batch_size=batch_size)
+        async for document in cursor:
+            yield document
+
+    async def find_links(
+        self,
+        limit: int,
+        after: LinkCursor | None = None,
+        terms: Sequence[str] = (),
+    ) -> list[dict]:
+        """
+        Lists links newest first with keyset pagination on the created_at and _id index, links created
+        before creation times were stored are skipped.
 
-        users_collection = self.db["Users"]
-        users_codex_collection = self.db["users"]
+        Parameters:
+            limit (int): The maximum amount of links.
+            after (LinkCursor | None): The cursor of the last link of the previous page.
+            terms (Sequence[str]): Terms from SearchText.terms, matched as phrases of the text index so
+                every term is required.
 
-        user_ids_cursor = users_collection.aggregate(pipeline)
-        user_ids = await user_ids_cursor.to_list(length=None)
+        Returns:
+            list[dict]: Documents with '_id', 'created_at', 'created_by' and 'search_text'.
+        """
+        if after is None:
+            query: dict = {"created_at": {"$type": "date"}}
+        else:
+            query = {
+                "created_at": {"$lte": after.created_at},
+                "$nor": [{"created_at": after.created_at, "_id": {"$gte": after.link}}],
+            }
+        if terms:
+            query["$text"] = {"$search": " ".join(f'"{term}"' for term in terms)}
+
+        cursor = self.db["Files"].find(
+            filter=query,
+            projection={"created_at": 1, "created_by": 1, "search_text": 1},
+            sort=[("created_at", -1), ("_id", -1)],
+            limit=limit,
+        )
+        return await cursor.to_list(length=limit)
 
-        user_ids_codex_cursor = users_codex_collection.aggregate(pipeline)
-        user_ids_codex = await user_ids_codex_cursor.to_list(length=None)
+    async def get_expired_links(self, now: datetime.datetime, limit: int) -> list[dict]:
+        """
+        Retrieves the link documents that expired at or before now, soonest expiry first.
 
-        main_ids = user_ids[0]["user_ids"] if user_ids else []
-        codex_ids = user_ids_codex[0]["user_ids"] if user_ids_codex else []
+        Parameters:
+            now (datetime.datetime): The timezone-aware current time.
+            limit (int): The maximum amount of documents.
 
-        return (main_ids, codex_ids)
+        Returns:
+            list[dict]: The expired link documents.
+        """
+        cursor = self.db["Files"].find(
+            filter={"expires_at": {"$lte": now}},
+            sort=[("expires_at", 1)],
+            limit=limit,
+        )
+        return await cursor.to_list(length=limit)
 
-    async def stats(self) -> tuple[int, int]:
+    async def delete_link_documents(self, base64_file_links: Sequence[str]) -> list[str]:
         """
-        Retrieves the number of links and users in the database.
+        Deletes many link documents with one find_one_and_delete each, so concurrent callers never both
+        report the same link, then their chunks with one delete_many.
+
+        Parameters:
+            base64_file_links (Sequence[str]): The base64-encoded links.
 
         Returns:
-            tuple[int, int]: A tuple containing the number of links and users.
+            list[str]: The links deleted by this call.
+        """
+        deleted = [
+            link
+            for link in base64_file_links
+            if await self.db["Files"].find_one_and_delete({"_id": link}, projection={"_id": 1}) is not None
+        ]
+        if not deleted:
+            return []
+
+        await self.db["FileChunks"].delete_many({"link": {"$in": deleted}})
+        invalidation_bus.publish_many(LINK_NAMESPACE, deleted)
+        if self.link_mirror:
+            for link in deleted:
+                await self.link_mirror.discard(link)
+        await self.increment_counter("links", -len(deleted))
+        return deleted
+
+    async def get_link_document(self, base64_file_link: str) -> dict | None:
         """
-        link_count = await self.db["Files"].count_documents({})
-        users_count = await self.db["Users"].count_documents({})
-        return (link_count, users_count)
+        Retrieves a link document from the cache, the local link mirror or the database.
 
-    async def cleanup_users(self, unsuccessful_ids: list, unsuccessful_ids_codex: list) -> None:
+        Parameters:
+            base64_file_link (str): The base64-encoded link to the file.
+
+        Returns:
+            dict | None: The document associated with the link, or None if not found.
+        """
+        cached_document = self.link_cache.get(base64_file_link)
+        if cached_document is not None:
+            return cached_document
+
+        document = await self.link_mirror.get_link_document(base64_file_link) if self.link_mirror else None
+        if document is None:
+            document = await self.db["Files"].find_one({"_id": base64_file_link}, {"search_text": 0})
+        if document is not None:
+            self.link_cache.set(base64_file_link, document)
+        return document
+
+    async def cleanup_users(self, unsuccessful_ids: Sequence[int], unsuccessful_ids_codex: Sequence[int]) -> None:
         """
         Cleans up users from the database based on their IDs.
 
         Parameters:
-            unsuccessful_ids (list): List of user IDs to delete from the database.
-            unsuccessful_ids_codex (list): List of user IDs to delete from the CodeXbotz database.
+            unsuccessful_ids (Sequence[int]): User IDs to delete from the database.
+            unsuccessful_ids_codex (Sequence[int]): User IDs to delete from the CodeXbotz database.
         """
         if unsuccessful_ids:
-            await self.db["Users"].delete_many({"_id": {"$in": unsuccessful_ids}})
+            result = await self.db["Users"].delete_many({"_id": {"$in": list(unsuccessful_ids)}})
+            await self.increment_counter("users", -result.deleted_count)
+            invalidation_bus.publish_many(USER_NAMESPACE, unsuccessful_ids)
 
         if unsuccessful_ids_codex:
-            await self.db["users"].delete_many({"_id": {"$in": unsuccessful_ids_codex}})
+            await self.db["users"].delete_many({"_id": {"$in": list(unsuccessful_ids_codex)}})
+
+    async def get_settings(self, document_id: str) -> dict | None:
+        """
+        Retrieves a settings document from the 'BotSettings' collection.
+
+        Parameters:
+            document_id (str): The ID of the settings document.
+
+        Returns:
+            dict | None: The stored settings, or None if there are none.
+        """
+        return await self.db["BotSettings"].find_one({"_id": document_id}, {"_id": 0})
+
+    async def update_settings(self, document_id: str, settings: dict) -> None:
+        """
+        Creates a settings document or updates some of its fields.
+
+        Parameters:
+            document_id (str): The ID of the settings document.
+            settings (dict): The fields to set.
+        """
+        await self.db["BotSettings"].update_one(
+            filter={"_id": document_id},
+            update={"$set": settings},
+            upsert=True,
+        )
+
+    async def close(self) -> None:
+        """
+        Flushes queued user writes, closes the link mirror and the shared client.
+        """
+        await self.user_writes.close()
+        if self.link_mirror:
+            await self.link_mirror.close()
+        database_registry.close()
+
+
+invalidation_bus.subscribe(LINK_NAMESPACE, MongoDB.link_cache.pop)
+invalidation_bus.subscribe(USER_NAMESPACE, MongoDB.user_cache.pop)
+invalidation_bus.subscribe_reset(MongoDB.link_cache.clear)
+invalidation_bus.subscribe_reset(MongoDB.user_cache.clear)
@@ -0,0 +1,223 @@
+import logging
+from array import array
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import ClassVar, NamedTuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+USERS_SOURCE = 1
+CODEX_SOURCE = 2
+
+
+class RecipientBatch(NamedTuple):
+    """
+    A batch of unique user IDs in ascending order.
+
+    Parameters:
+        user_ids (array): The user IDs as signed 64-bit integers.
+        sources (bytearray): Parallel source flags, USERS_SOURCE and/or CODEX_SOURCE.
+        access_hashes (array): Parallel stored access hashes, 0 when unknown.
+    """
+
+    user_ids: array
+    sources: bytearray
+    access_hashes: array
+
+    @classmethod
+    def empty(cls) -> "RecipientBatch":
+        return cls(user_ids=array("q"), sources=bytearray(), access_hashes=array("q"))
+
+    def append(self, user_id: int, source: int, access_hash: int | None) -> None:
+        self.user_ids.append(user_id)
+        self.sources.append(source)
+        self.access_hashes.append(access_hash or 0)
+
+
+class Recipients:
+    """
+    Streams broadcast recipients from 'Users'.
+
+    Users of the legacy CodeXbotz 'users' collection are merged into 'Users' by merge_codex_users,
+    keeping where they came from in the 'source' bit flags, missing means USERS_SOURCE. Until the merge
+    has finished both collections are read and merged on the fly.
+
+    Attributes:
+        _codex_users_merged (ClassVar[bool]): Whether the merge has finished, checked once per process.
+    """
+
+    db: AsyncIOMotorDatabase
+    increment_counter: Callable[..., Awaitable[None]]
+
+    logger = logging.getLogger(__name__)
+
+    MIGRATION_ID = "codex_users_merge"
+    _codex_users_merged: ClassVar[bool] = False
+
+    async def has_codex_users(self) -> bool:
+        """
+        Checks whether the CodeXbotz 'users' collection has users or had some merged into 'Users'.
+
+        Returns:
+            bool: Whether CodeXbotz users exist or were merged.
+        """
+        if await self.db["users"].estimated_document_count():
+            return True
+
+        state = await self.db["Migrations"].find_one({"_id": self.MIGRATION_ID}, {"last_id": 1}) or {}
+        return state.get("last_id") is not None
+
+    async def merge_codex_users(self, batch_size: int = 1000) -> None:
+        """
+        Merges the CodeXbotz 'users' collection into 'Users' in `_id` order with bounded memory.
+
+        Progress is saved after every batch so an interrupted merge resumes where it stopped, and replayed
+        batches leave the same result.
+
+        Parameters:
+            batch_size (int): The amount of users read and written per batch.
+        """
+        progress = self.db["Migrations"]
+        state = await progress.find_one({"_id": self.MIGRATION_ID}) or {}
+        if state.get("done"):
+            Recipients._codex_users_merged = True
+            return
+
+        last_id = state.get("last_id")
+        try:
+            while True:
+                id_filter = {"$type": "number", "$gt": last_id} if last_id is not None else {"$type": "number"}
+                codex_ids = [
+                    document["_id"]
+                    async for document in self.db["users"].find(
+                        {"_id": id_filter},
+                        projection={"_id": 1},
+                        sort=[("_id", 1)],
+                        limit=batch_size,
+                    )
+                ]
+                if not codex_ids:
+                    break
+
+                sources = {
+                    document["_id"]: document.get("source", USERS_SOURCE)
+                    async for document in self.db["Users"].find({"_id": {"$in": codex_ids}}, {"source": 1})
+                }
+                requests = [
+                    UpdateOne({"_id": user_id}, {"$set": {"source": sources[user_id] | CODEX_SOURCE}})
+                    if user_id in sources
+                    else UpdateOne({"_id": user_id}, {"$setOnInsert": {"source": CODEX_SOURCE}}, upsert=True)
+                    for user_id in codex_ids
+                ]
+                result = await self.db["Users"].bulk_write(requests, ordered=False)
+                await self.increment_counter("users", result.upserted_count)
+
+                last_id = codex_ids[-1]
+                await progress.update_one({"_id": self.MIGRATION_ID}, {"$set": {"last_id": last_id}}, upsert=True)
+        except PyMongoError:
+            self.logger.exception("CodeXbotz users merge interrupted, it resumes on the next start")
+            return
+
+        await progress.update_one({"_id": self.MIGRATION_ID}, {"$set": {"done": True}}, upsert=True)
+        Recipients._codex_users_merged = True
+        self.logger.info("Merged the CodeXbotz users collection into Users")
+
+    async def _iter_sorted_user_ids(self, collection: str, batch_size: int) -> AsyncIterator[tuple[int, int | None]]:
+        """
+        Streams the user IDs and access hashes of a collection in ascending order.
+
+        Parameters:
+            collection (str): The name of the collection.
+            batch_size (int): The cursor batch size.
+
+        Yields:
+            tuple[int, int | None]: A user ID and its stored access hash.
+        """
+        cursor = self.db[collection].find(
+            filter={"_id": {"$type": "number"}},
+            projection={"access_hash": 1},
+            sort=[("_id", 1)],
+            batch_size=batch_size,
+        )
+        async for document in cursor:
+            yield int(document["_id"]), document.get("access_hash")
+
+    async def _iter_merged_user_ids(self, batch_size: int) -> AsyncIterator[RecipientBatch]:
+        """
+        Streams the IDs and sources of every user from 'Users' alone.
+
+        Parameters:
+            batch_size (int): The amount of user IDs per batch.
+
+        Yields:
+            RecipientBatch: A batch of user IDs and where they came from.
+        """
+        cursor = self.db["Users"].find(
+            filter={"_id": {"$type": "number"}},
+            projection={"source": 1, "access_hash": 1},
+            sort=[("_id", 1)],
+            batch_size=batch_size,
+        )
+        batch = RecipientBatch.empty()
+
+        async for document in cursor:
+            batch.append(
+                user_id=int(document["_id"]),
+                source=document.get("source", USERS_SOURCE) | USERS_SOURCE,
+                access_hash=document.get("access_hash"),
+            )
+
+            if len(batch.user_ids) >= batch_size:
+                yield batch
+                batch = RecipientBatch.empty()
+
+        if batch.user_ids:
+            yield batch
+
+    async def iter_user_ids(self, batch_size: int = 1000) -> AsyncIterator[RecipientBatch]:
+        """
+        Streams the IDs of all users in ascending order.
+
+        Once the CodeXbotz users are merged only 'Users' is read. Until then both collections are read
+        in `_id` order and merged, so duplicates are dropped without holding every ID in memory at once.
+
+        Parameters:
+            batch_size (int): The amount of user IDs per batch.
+
+        Yields:
+            RecipientBatch: A batch of unique user IDs and where they were found.
+        """
+        if Recipients._codex_users_merged:
+            async for batch in self._iter_merged_user_ids(batch_size):
+                yield batch
+            return
+
+        main_ids = self._iter_sorted_user_ids("Users", batch_size)
+        codex_ids = self._iter_sorted_user_ids("users", batch_size)
+
+        main_user = await anext(main_ids, None)
+        codex_user = await anext(codex_ids, None)
+        batch = RecipientBatch.empty()
+
+        while True:
+            if main_user is not None and (codex_user is None or main_user[0] <= codex_user[0]):
+                (user_id, access_hash), source = main_user, USERS_SOURCE
+                if codex_user is not None and codex_user[0] == user_id:
+                    source |= CODEX_SOURCE
+                    codex_user = await anext(codex_ids, None)
+                main_user = await anext(main_ids, None)
+            elif codex_user is not None:
+                (user_id, access_hash), source = codex_user, CODEX_SOURCE
+                codex_user = await anext(codex_ids, None)
+            else:
+                break
+
+            batch.append(user_id=user_id, source=source, access_hash=access_hash)
+
+            if len(batch.user_ids) >= batch_size:
+                yield batch
+                batch = RecipientBatch.empty()
+
+        if batch.user_ids:
+            yield batch
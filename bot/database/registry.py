@@ -0,0 +1,93 @@
+from typing import Any
+
+import dns.resolver
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.errors import ConfigurationError
+
+from bot.config import config
+
+
+class DatabaseRegistry:
+    """
+    A process-wide registry that hands out a single MongoDB client and its databases.
+
+    Every MongoDB/Options instance shares the same client, so the whole process only pays for
+    one SRV lookup, one set of monitor threads and one connection pool.
+
+    Attributes:
+        _client (AsyncIOMotorClient | None): The shared client, created on first access.
+        _databases (dict[str, AsyncIOMotorDatabase]): Databases handed out by name.
+    """
+
+    def __init__(self) -> None:
+        self._client: AsyncIOMotorClient | None = None
+        self._databases: dict[str, AsyncIOMotorDatabase] = {}
+
+    @staticmethod
+    def _create_client() -> AsyncIOMotorClient:
+        """
+        Creates the client using the pool, timeout and compression settings from config.
+
+        The client is created with connect=False so sockets are only opened by the first operation.
+
+        Returns:
+            AsyncIOMotorClient: The configured client.
+        """
+        client_options: dict[str, Any] = {
+            "host": str(config.MONGO_DB_URL),
+            "connect": False,
+            "maxPoolSize": config.MONGO_MAX_POOL_SIZE,
+            "minPoolSize": config.MONGO_MIN_POOL_SIZE,
+            "maxIdleTimeMS": config.MONGO_MAX_IDLE_TIME_MS,
+            "connectTimeoutMS": config.MONGO_CONNECT_TIMEOUT_MS,
+            "serverSelectionTimeoutMS": config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            "socketTimeoutMS": config.MONGO_SOCKET_TIMEOUT_MS,
+        }
+        if config.MONGO_COMPRESSORS:
+            client_options["compressors"] = config.MONGO_COMPRESSORS
+
+        try:
+            return AsyncIOMotorClient(**client_options)
+        except ConfigurationError:
+            dns.resolver.default_resolver = dns.resolver.Resolver(configure=False)
+            dns.resolver.default_resolver.nameservers = ["8.8.8.8"]
+            return AsyncIOMotorClient(**client_options)
+
+    @property
+    def client(self) -> AsyncIOMotorClient:
+        """
+        The shared client, created lazily on first access.
+
+        Raises:
+            ConfigurationError: If the MongoDB connection configuration is invalid.
+        """
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    def get_database(self, name: str | None = None) -> AsyncIOMotorDatabase:
+        """
+        Returns the shared database handle for the given name.
+
+        Parameters:
+            name (str | None): The name of the database. Defaults to config.MONGO_DB_NAME.
+
+        Returns:
+            AsyncIOMotorDatabase: The database handle.
+        """
+        db_name = name if name else config.MONGO_DB_NAME
+        if db_name not in self._databases:
+            self._databases[db_name] = self.client[db_name]
+        return self._databases[db_name]
+
+    def close(self) -> None:
+        """
+        Closes the shared client and forgets every database handle.
+        """
+        if self._client is not None:
+            self._client.close()
+        self._client = None
+        self._databases.clear()
+
+
+database_registry = DatabaseRegistry()
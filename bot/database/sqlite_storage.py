@@ -0,0 +1,533 @@
+import asyncio
+import datetime
+import json
+import sqlite3
+import time
+from array import array
+from collections import Counter
+from collections.abc import AsyncIterator, Callable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from bot.utilities.helpers import LinkCursor
+
+from .counters import StatsModel
+from .memory_storage import DAY_SECONDS, HOUR_SECONDS
+from .moderation import ModerationResult
+from .recipients import USERS_SOURCE, RecipientBatch
+from .storage import StorageBackend
+from .user_context import UserContext
+
+T = TypeVar("T")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    link TEXT PRIMARY KEY,
+    file_origin INTEGER NOT NULL,
+    files TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL,
+    created_by INTEGER,
+    search_text TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS files_created_at_link ON files (created_at, link);
+CREATE INDEX IF NOT EXISTS files_file_origin ON files (file_origin, link);
+CREATE INDEX IF NOT EXISTS files_expires_at ON files (expires_at) WHERE expires_at IS NOT NULL;
+CREATE TABLE IF NOT EXISTS file_registry (
+    file_unique_id TEXT PRIMARY KEY,
+    message_id INTEGER NOT NULL,
+    refs INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS file_registry_message_id ON file_registry (message_id);
+CREATE TABLE IF NOT EXISTS link_stats (
+    day TEXT NOT NULL,
+    link TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, link)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    banned INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    access_hash INTEGER
+);
+CREATE INDEX IF NOT EXISTS users_created_at ON users (created_at);
+CREATE TABLE IF NOT EXISTS user_channels (
+    user_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    PRIMARY KEY (user_id, channel_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS settings (
+    document_id TEXT PRIMARY KEY,
+    document TEXT NOT NULL
+);
+"""
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    A storage backend on a local SQLite database, for single-node deployments.
+
+    Queries run on one dedicated thread that owns the connection, so the event loop never blocks on disk
+    and no async driver is needed.
+
+    Parameters:
+        path (str): The database file path, ':memory:' for a private in-memory database.
+        mmap_size (int): Bytes of the database file to memory-map for reads, 0 to disable.
+    """
+
+    def __init__(self, path: str, mmap_size: int = 0) -> None:
+        self.path = path
+        self.mmap_size = mmap_size
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._connection: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    async def _run(self, func: Callable[[sqlite3.Connection], T]) -> T:
+        """
+        Runs a function with the connection on the database thread, writes should commit with 'with connection'.
+
+        Parameters:
+            func (Callable[[sqlite3.Connection], T]): The function to run.
+
+        Returns:
+            T: The function's result.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(self._connect()))
+
+    async def _execute(self, sql: str, parameters: Sequence[Any] = ()) -> sqlite3.Cursor:
+        def execute(connection: sqlite3.Connection) -> sqlite3.Cursor:
+            with connection:
+                return connection.execute(sql, parameters)
+
+        return await self._run(execute)
+
+    async def _fetchone(self, sql: str, parameters: Sequence[Any] = ()) -> tuple | None:
+        return await self._run(lambda connection: connection.execute(sql, parameters).fetchone())
+
+    async def _fetchall(self, sql: str, parameters: Sequence[Any] = ()) -> list[tuple]:
+        return await self._run(lambda connection: connection.execute(sql, parameters).fetchall())
+
+    @staticmethod
+    def _timestamp(value: datetime.datetime | None) -> float | None:
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return value.timestamp()
+
+    @staticmethod
+    def _link_document(link: str, file_origin: int, files: str, expires_at: float | None) -> dict:
+        document = {"_id": link, "file_origin": file_origin, "files": json.loads(files)}
+        if expires_at is not None:
+            document["expires_at"] = datetime.datetime.fromtimestamp(expires_at, tz=datetime.timezone.utc)
+        return document
+
+    async def add_file(  # noqa: PLR0913
+        self,
+        file_link: str,
+        file_origin: int,
+        file_data: list[dict[str, str | int]],
+        expires_at: datetime.datetime | None = None,
+        created_by: int | None = None,
+        search_text: str = "",
+    ) -> bool:
+        # Milliseconds, the precision of link cursors.
+        created_at = round(time.time(), 3)
+        await self._execute(
+            "INSERT INTO files (link, file_origin, files, created_at, expires_at, created_by, search_text) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (link) DO UPDATE SET file_origin = excluded.file_origin, files = excluded.files, "
+            "expires_at = excluded.expires_at, created_by = excluded.created_by, search_text = excluded.search_text",
+            (
+                file_link,
+                file_origin,
+                json.dumps(file_data),
+                created_at,
+                self._timestamp(expires_at),
+                created_by,
+                search_text,
+            ),
+        )
+        self._link_filter_add(file_link)
+        return True
+
+    async def add_files(self, documents: Sequence[dict]) -> None:
+        """
+        Adds or replaces many link documents in one transaction.
+
+        Parameters:
+            documents (Sequence[dict]): Link documents with '_id', 'file_origin', 'files' and optionally
+                'expires_at'.
+        """
+
+        def add_files(connection: sqlite3.Connection) -> None:
+            created_at = time.time()
+            with connection:
+                connection.executemany(
+                    "INSERT INTO files (link, file_origin, files, created_at, expires_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (link) DO UPDATE SET file_origin = excluded.file_origin, files = excluded.files, "
+                    "expires_at = excluded.expires_at",
+                    [
+                        (
+                            i["_id"],
+                            i["file_origin"],
+                            json.dumps(i["files"]),
+                            created_at,
+                            self._timestamp(i.get("expires_at")),
+                        )
+                        for i in documents
+                    ],
+                )
+
+        if documents:
+            await self._run(add_files)
+
+    async def clear_files(self) -> None:
+        """
+        Deletes every link document.
+        """
+        await self._execute("DELETE FROM files")
+
+    async def get_link_document(self, base64_file_link: str) -> dict | None:
+        row = await self._fetchone(
+            "SELECT link, file_origin, files, expires_at FROM files WHERE link = ?",
+            (base64_file_link,),
+        )
+        return self._link_document(*row) if row else None
+
+    async def delete_link_document(self, base64_file_link: str) -> bool:
+        cursor = await self._execute("DELETE FROM files WHERE link = ?", (base64_file_link,))
+        if cursor.rowcount <= 0:
+            return False
+        self._link_filter_discard([base64_file_link])
+        return True
+
+    async def iter_link_ids(self, batch_size: int = 10000) -> AsyncIterator[str]:
+        last_link = ""
+        while rows := await self._fetchall(
+            "SELECT link FROM files WHERE link > ? ORDER BY link LIMIT ?",
+            (last_link, batch_size),
+        ):
+            last_link = rows[-1][0]
+            for (link,) in rows:
+                yield link
+
+    async def iter_link_documents(self, file_origin: int, batch_size: int = 1000) -> AsyncIterator[dict]:
+        last_link = ""
+        while True:
+            rows = await self._fetchall(
+                "SELECT link, file_origin, files, expires_at FROM files "
+                "WHERE file_origin = ? AND link > ? ORDER BY link LIMIT ?",
+                (file_origin, last_link, batch_size),
+            )
+            if not rows:
+                return
+
+            last_link = rows[-1][0]
+            for row in rows:
+                yield self._link_document(*row)
+
+    async def find_links(
+        self,
+        limit: int,
+        after: LinkCursor | None = None,
+        terms: Sequence[str] = (),
+    ) -> list[dict]:
+        conditions, parameters = [], []
+        if after is not None:
+            conditions.append("(created_at, link) < (?, ?)")
+            parameters += [after.created_at_ms / 1000, after.link]
+        for term in terms:
+            # Terms are normalized words, they hold no LIKE wildcards.
+            conditions.append("search_text LIKE ?")
+            parameters.append(f"%{term}%")
+
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        rows = await self._fetchall(
+            f"SELECT link, created_at, created_by, search_text FROM files {where}"  # noqa: S608
+            "ORDER BY created_at DESC, link DESC LIMIT ?",
+            (*parameters, limit),
+        )
+        return [
+            {
+                "_id": link,
+                "created_at": LinkCursor(round(created_at * 1000), link).created_at,
+                "created_by": created_by,
+                "search_text": search_text,
+            }
+            for link, created_at, created_by, search_text in rows
+        ]
+
+    async def get_expired_links(self, now: datetime.datetime, limit: int) -> list[dict]:
+        rows = await self._fetchall(
+            "SELECT link, file_origin, files, expires_at FROM files "
+            "WHERE expires_at IS NOT NULL AND expires_at <= ? ORDER BY expires_at LIMIT ?",
+            (now.timestamp(), limit),
+        )
+        return [self._link_document(*row) for row in rows]
+
+    async def delete_link_documents(self, base64_file_links: Sequence[str]) -> list[str]:
+        def delete(connection: sqlite3.Connection) -> list[str]:
+            deleted = []
+            with connection:
+                for i in range(0, len(base64_file_links), 500):
+                    batch = list(base64_file_links[i : i + 500])
+                    placeholders = ", ".join("?" * len(batch))
+                    cursor = connection.execute(
+                        f"DELETE FROM files WHERE link IN ({placeholders}) RETURNING link",  # noqa: S608
+                        batch,
+                    )
+                    deleted += [link for (link,) in cursor]
+            return deleted
+
+        deleted = await self._run(delete) if base64_file_links else []
+        self._link_filter_discard(deleted)
+        return deleted
+
+    async def claim_registered_files(self, file_unique_ids: Sequence[str]) -> dict[str, int]:
+        def claim(connection: sqlite3.Connection) -> dict[str, int]:
+            claimed = {}
+            with connection:
+                for file_unique_id, count in Counter(file_unique_ids).items():
+                    row = connection.execute(
+                        "UPDATE file_registry SET refs = refs + ? WHERE file_unique_id = ? RETURNING message_id",
+                        (count, file_unique_id),
+                    ).fetchone()
+                    if row is not None:
+                        claimed[file_unique_id] = row[0]
+            return claimed
+
+        return await self._run(claim) if file_unique_ids else {}
+
+    async def retain_registered_files(self, files: Sequence[tuple[str, int]]) -> dict[str, int]:
+        def retain(connection: sqlite3.Connection) -> dict[str, int]:
+            registered = {}
+            with connection:
+                for file_unique_id, message_id in files:
+                    row = connection.execute(
+                        "INSERT INTO file_registry (file_unique_id, message_id, refs) VALUES (?, ?, 1) "
+                        "ON CONFLICT (file_unique_id) DO UPDATE SET refs = refs + 1 RETURNING message_id",
+                        (file_unique_id, message_id),
+                    ).fetchone()
+                    registered[file_unique_id] = row[0]
+            return registered
+
+        return await self._run(retain) if files else {}
+
+    async def release_registered_messages(self, message_ids: Sequence[int]) -> list[int]:
+        def release(connection: sqlite3.Connection) -> list[int]:
+            releases = Counter(message_ids)
+            with connection:
+                for message_id, count in list(releases.items()):
+                    connection.execute(
+                        "UPDATE file_registry SET refs = refs - ? WHERE message_id = ?",
+                        (count, message_id),
+                    )
+                    row = connection.execute(
+                        "SELECT MAX(refs) FROM file_registry WHERE message_id = ?",
+                        (message_id,),
+                    ).fetchone()
+                    if row[0] is not None and row[0] > 0:
+                        del releases[message_id]
+                    else:
+                        connection.execute("DELETE FROM file_registry WHERE message_id = ?", (message_id,))
+            return list(releases)
+
+        return await self._run(release)
+
+    async def record_link_accesses(self, accesses: Mapping[tuple[str, str], int]) -> None:
+        def record(connection: sqlite3.Connection) -> None:
+            with connection:
+                connection.executemany(
+                    "INSERT INTO link_stats (day, link, count) VALUES (?, ?, ?) "
+                    "ON CONFLICT (day, link) DO UPDATE SET count = count + excluded.count",
+                    [(day, link, count) for (link, day), count in accesses.items()],
+                )
+
+        if accesses:
+            await self._run(record)
+
+    async def top_links(self, since_day: str, limit: int) -> list[tuple[str, int]]:
+        rows = await self._fetchall(
+            "SELECT link, SUM(count) AS total FROM link_stats WHERE day >= ? "
+            "GROUP BY link ORDER BY total DESC, link LIMIT ?",
+            (since_day, limit),
+        )
+        return [(str(link), int(total)) for link, total in rows]
+
+    @staticmethod
+    def _upsert_user(connection: sqlite3.Connection, user_id: int, access_hash: int | None) -> bool:
+        cursor = connection.execute(
+            "INSERT OR IGNORE INTO users (user_id, created_at, access_hash) VALUES (?, ?, ?)",
+            (user_id, time.time(), access_hash),
+        )
+        if not cursor.rowcount and access_hash is not None:
+            connection.execute("UPDATE users SET access_hash = ? WHERE user_id = ?", (access_hash, user_id))
+        return cursor.rowcount > 0
+
+    async def add_user(self, user_id: int, access_hash: int | None = None) -> bool:
+        def add(connection: sqlite3.Connection) -> None:
+            with connection:
+                self._upsert_user(connection, user_id, access_hash)
+
+        await self._run(add)
+        return True
+
+    async def load_user_context(self, user_id: int, access_hash: int | None = None) -> UserContext:
+        def load(connection: sqlite3.Connection) -> UserContext:
+            with connection:
+                is_new = self._upsert_user(connection, user_id, access_hash)
+            banned = connection.execute("SELECT banned FROM users WHERE user_id = ?", (user_id,)).fetchone()[0]
+            channels = connection.execute("SELECT channel_id FROM user_channels WHERE user_id = ?", (user_id,))
+            return UserContext(
+                user_id=user_id,
+                banned=bool(banned),
+                channels=[i[0] for i in channels],
+                is_new=is_new,
+            )
+
+        return await self._run(load)
+
+    async def _set_banned(self, user_id: int, banned: bool) -> bool:  # noqa: FBT001
+        cursor = await self._execute("UPDATE users SET banned = ? WHERE user_id = ?", (int(banned), user_id))
+        return cursor.rowcount > 0
+
+    async def ban_user(self, user_id: int) -> bool:
+        return await self._set_banned(user_id, banned=True)
+
+    async def unban_user(self, user_id: int) -> bool:
+        return await self._set_banned(user_id, banned=False)
+
+    async def set_users_banned(self, user_ids: Sequence[int], banned: bool) -> ModerationResult:  # noqa: FBT001
+        def set_banned(connection: sqlite3.Connection) -> ModerationResult:
+            result = ModerationResult(changed=[], unchanged=[], missing=[])
+            with connection:
+                for i in range(0, len(user_ids), 500):
+                    batch = list(user_ids[i : i + 500])
+                    placeholders = ", ".join("?" * len(batch))
+                    statuses = dict(
+                        connection.execute(
+                            f"SELECT user_id, banned FROM users WHERE user_id IN ({placeholders})",  # noqa: S608
+                            batch,
+                        ),
+                    )
+                    for user_id in batch:
+                        if user_id not in statuses:
+                            result.missing.append(user_id)
+                        elif bool(statuses[user_id]) == banned:
+                            result.unchanged.append(user_id)
+                        else:
+                            result.changed.append(user_id)
+                            connection.execute(
+                                "UPDATE users SET banned = ? WHERE user_id = ?",
+                                (int(banned), user_id),
+                            )
+            return result
+
+        return await self._run(set_banned)
+
+    async def is_user_banned(self, user_id: int) -> bool:
+        row = await self._fetchone("SELECT banned FROM users WHERE user_id = ?", (user_id,))
+        return bool(row and row[0])
+
+    async def user_join_request(self, user_id: int, channel_id: int, access_hash: int | None = None) -> bool:
+        def join_request(connection: sqlite3.Connection) -> None:
+            with connection:
+                self._upsert_user(connection, user_id, access_hash)
+                connection.execute(
+                    "INSERT OR IGNORE INTO user_channels (user_id, channel_id) VALUES (?, ?)",
+                    (user_id, channel_id),
+                )
+
+        await self._run(join_request)
+        return True
+
+    async def user_requested_channels(self, user_id: int) -> list:
+        rows = await self._fetchall("SELECT channel_id FROM user_channels WHERE user_id = ?", (user_id,))
+        return [i[0] for i in rows]
+
+    async def iter_user_ids(self, batch_size: int = 1000) -> AsyncIterator[RecipientBatch]:
+        last_id = None
+        while True:
+            if last_id is None:
+                rows = await self._fetchall(
+                    "SELECT user_id, access_hash FROM users ORDER BY user_id LIMIT ?",
+                    (batch_size,),
+                )
+            else:
+                rows = await self._fetchall(
+                    "SELECT user_id, access_hash FROM users WHERE user_id > ? ORDER BY user_id LIMIT ?",
+                    (last_id, batch_size),
+                )
+            if not rows:
+                return
+
+            last_id = rows[-1][0]
+            yield RecipientBatch(
+                user_ids=array("q", (i[0] for i in rows)),
+                sources=bytearray([USERS_SOURCE] * len(rows)),
+                access_hashes=array("q", (i[1] or 0 for i in rows)),
+            )
+
+    async def cleanup_users(self, unsuccessful_ids: Sequence[int], unsuccessful_ids_codex: Sequence[int]) -> None:  # noqa: ARG002
+        def cleanup(connection: sqlite3.Connection) -> None:
+            parameters = [(i,) for i in unsuccessful_ids]
+            with connection:
+                connection.executemany("DELETE FROM users WHERE user_id = ?", parameters)
+                connection.executemany("DELETE FROM user_channels WHERE user_id = ?", parameters)
+
+        if unsuccessful_ids:
+            await self._run(cleanup)
+
+    async def stats(self) -> StatsModel:
+        now = time.time()
+        row = await self._fetchone(
+            "SELECT (SELECT COUNT(*) FROM files), (SELECT COUNT(*) FROM users), "
+            "(SELECT COUNT(*) FROM files WHERE created_at >= ?), (SELECT COUNT(*) FROM users WHERE created_at >= ?)",
+            (now - DAY_SECONDS, now - HOUR_SECONDS),
+        )
+        links_count, users_count, links_per_day, users_per_hour = row or (0, 0, 0, 0)
+        return StatsModel(
+            links_count=links_count,
+            users_count=users_count,
+            links_per_day=links_per_day,
+            users_per_hour=users_per_hour,
+        )
+
+    async def get_settings(self, document_id: str) -> dict | None:
+        row = await self._fetchone("SELECT document FROM settings WHERE document_id = ?", (document_id,))
+        return json.loads(row[0]) if row else None
+
+    async def update_settings(self, document_id: str, settings: dict) -> None:
+        def update(connection: sqlite3.Connection) -> None:
+            with connection:
+                row = connection.execute(
+                    "SELECT document FROM settings WHERE document_id = ?",
+                    (document_id,),
+                ).fetchone()
+                document = {**(json.loads(row[0]) if row else {}), **settings}
+                connection.execute(
+                    "INSERT OR REPLACE INTO settings (document_id, document) VALUES (?, ?)",
+                    (document_id, json.dumps(document)),
+                )
+
+        await self._run(update)
+
+    async def close(self) -> None:
+        def close(connection: sqlite3.Connection) -> None:
+            connection.close()
+            self._connection = None
+
+        if self._connection is not None:
+            await self._run(close)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,468 @@
+import datetime
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Iterable, Mapping, Sequence
+
+from bot.utilities.helpers import CountingBloomFilter, LinkCursor
+
+from .counters import StatsModel
+from .link_schema import decode_files
+from .moderation import ModerationResult
+from .recipients import RecipientBatch
+from .user_context import UserContext
+
+
+class StorageBackend(ABC):
+    """
+    The persistence operations used by the bot, implemented by MongoDB, SQLiteStorage and MemoryStorage.
+
+    Use get_storage() to get the process-wide backend selected by config.STORAGE_BACKEND.
+
+    Attributes:
+        link_filter (CountingBloomFilter | None): The IDs of every stored link once build_link_filter is done.
+    """
+
+    link_filter: CountingBloomFilter | None = None
+    _building_link_filter: CountingBloomFilter | None = None
+    _link_filter_generation: int = 0
+
+    @abstractmethod
+    async def add_file(  # noqa: PLR0913
+        self,
+        file_link: str,
+        file_origin: int,
+        file_data: list[dict[str, str | int]],
+        expires_at: datetime.datetime | None = None,
+        created_by: int | None = None,
+        search_text: str = "",
+    ) -> bool:
+        """
+        Adds or replaces a link document, the creation time is kept when a link is replaced.
+
+        Parameters:
+            file_link (str): The link to the file.
+            file_origin (int): The origin of the file.
+            file_data (list[dict]): The data associated with the file.
+            expires_at (datetime.datetime | None): When the link expires, None to keep it forever.
+            created_by (int | None): The ID of the user that created the link.
+            search_text (str): The link's captions and file names normalized by SearchText.normalize.
+
+        Returns:
+            bool: Whether the file was added successfully.
+        """
+
+    @abstractmethod
+    async def get_link_document(self, base64_file_link: str) -> dict | None:
+        """
+        Retrieves a link document.
+
+        Parameters:
+            base64_file_link (str): The base64-encoded link to the file.
+
+        Returns:
+            dict | None: The document with '_id', 'file_origin', 'files' and 'expires_at' if the link expires,
+                or None if not found.
+        """
+
+    @abstractmethod
+    def iter_link_ids(self, batch_size: int = 10000) -> AsyncIterator[str]:
+        """
+        Streams the ID of every link.
+
+        Parameters:
+            batch_size (int): The cursor batch size.
+
+        Returns:
+            AsyncIterator[str]: The link IDs.
+        """
+
+    async def count_links(self) -> int:
+        """
+        Counts the stored links.
+
+        Returns:
+            int: The amount of links.
+        """
+        return (await self.stats()).links_count
+
+    async def build_link_filter(self, min_capacity: int, error_rate: float = 0.01) -> None:
+        """
+        Streams every link ID into a new counting Bloom filter, then answers link_may_exist with it.
+
+        The filter is sized for twice the current link count, links added while it is being built are added
+        to it too and links removed meanwhile stay present. A build started later replaces this one.
+
+        Parameters:
+            min_capacity (int): The least amount of links the filter is sized for.
+            error_rate (float): The false positive rate at capacity.
+        """
+        self._link_filter_generation += 1
+        generation = self._link_filter_generation
+
+        capacity = max(min_capacity, 2 * await self.count_links())
+        link_filter = CountingBloomFilter(capacity=capacity, error_rate=error_rate)
+        self._building_link_filter = link_filter
+        try:
+            async for link in self.iter_link_ids():
+                link_filter.add(link)
+        finally:
+            if self._building_link_filter is link_filter:
+                self._building_link_filter = None
+
+        if generation == self._link_filter_generation:
+            self.link_filter = link_filter
+
+    def link_may_exist(self, base64_file_link: str) -> bool:
+        """
+        Checks the link filter without touching the database.
+
+        Parameters:
+            base64_file_link (str): The base64-encoded link.
+
+        Returns:
+            bool: False if the link is surely not stored, always True until the link filter is built.
+        """
+        return self.link_filter is None or base64_file_link in self.link_filter
+
+    def _link_filter_add(self, base64_file_link: str) -> None:
+        for link_filter in (self.link_filter, self._building_link_filter):
+            if link_filter is not None:
+                link_filter.add(base64_file_link)
+
+    def _link_filter_discard(self, base64_file_links: Iterable[str]) -> None:
+        if self.link_filter is not None:
+            for link in base64_file_links:
+                self.link_filter.discard(link)
+
+    @staticmethod
+    def link_expired(link_document: dict, now: datetime.datetime | None = None) -> bool:
+        """
+        Checks whether a link document has expired but has not been swept yet.
+
+        Parameters:
+            link_document (dict): A document returned by get_link_document.
+            now (datetime.datetime | None): The time to compare with, defaults to the current time.
+
+        Returns:
+            bool: True if the link has expired.
+        """
+        expires_at = link_document.get("expires_at")
+        if expires_at is None:
+            return False
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=datetime.timezone.utc)
+        return expires_at <= (now or datetime.datetime.now(tz=datetime.timezone.utc))
+
+    async def iter_link_files(self, link_document: dict) -> AsyncIterator[list[dict]]:
+        """
+        Streams the file entries of a link document in order, one chunk at a time.
+
+        Parameters:
+            link_document (dict): A document returned by get_link_document.
+
+        Yields:
+            list[dict]: The next chunk of file entries.
+        """
+        if link_document.get("files"):
+            yield decode_files(link_document["files"])
+
+    @abstractmethod
+    async def delete_link_document(self, base64_file_link: str) -> bool:
+        """
+        Deletes a link document.
+
+        Parameters:
+            base64_file_link (str): The base64-encoded link to the file.
+
+        Returns:
+            bool: Whether the document was deleted successfully.
+        """
+
+    @abstractmethod
+    def iter_link_documents(self, file_origin: int, batch_size: int = 1000) -> AsyncIterator[dict]:
+        """
+        Streams every link document of an origin.
+
+        Parameters:
+            file_origin (int): The chat ID the files are stored in.
+            batch_size (int): The cursor batch size.
+
+        Returns:
+            AsyncIterator[dict]: Link documents in the get_link_document format.
+        """
+
+    @abstractmethod
+    async def find_links(
+        self,
+        limit: int,
+        after: LinkCursor | None = None,
+        terms: Sequence[str] = (),
+    ) -> list[dict]:
+        """
+        Lists links newest first with keyset pagination, links created without a creation time are skipped.
+
+        Parameters:
+            limit (int): The maximum amount of links.
+            after (LinkCursor | None): The cursor of the last link of the previous page.
+            terms (Sequence[str]): Terms from SearchText.terms the search text must all contain.
+
+        Returns:
+            list[dict]: Documents with '_id', 'created_at', 'created_by' and 'search_text'.
+        """
+
+    @abstractmethod
+    async def get_expired_links(self, now: datetime.datetime, limit: int) -> list[dict]:
+        """
+        Retrieves the link documents that expired at or before now, soonest expiry first.
+
+        Parameters:
+            now (datetime.datetime): The timezone-aware current time.
+            limit (int): The maximum amount of documents.
+
+        Returns:
+            list[dict]: Link documents in the get_link_document format.
+        """
+
+    @abstractmethod
+    async def delete_link_documents(self, base64_file_links: Sequence[str]) -> list[str]:
+        """
+        Deletes many link documents at once.
+
+        Parameters:
+            base64_file_links (Sequence[str]): The base64-encoded links.
+
+        Returns:
+            list[str]: The links deleted by this call, links that were missing or deleted concurrently are left
+                out.
+        """
+
+    @abstractmethod
+    async def claim_registered_files(self, file_unique_ids: Sequence[str]) -> dict[str, int]:
+        """
+        Adds one reference per entry to the backup channel copies of registered files, call before a link reuses
+        them so they can't be released in the meantime.
+
+        Parameters:
+            file_unique_ids (Sequence[str]): The file_unique_id of each file.
+
+        Returns:
+            dict[str, int]: The backup message ID of each claimed file, unregistered files are not claimed and
+                have to be backed up again.
+        """
+
+    @abstractmethod
+    async def retain_registered_files(self, files: Sequence[tuple[str, int]]) -> dict[str, int]:
+        """
+        Registers newly backed up messages and adds one reference per entry, call before a link using them is
+        stored.
+
+        Parameters:
+            files (Sequence[tuple[str, int]]): The file_unique_id and backup message ID of each file.
+
+        Returns:
+            dict[str, int]: The registered backup message ID of each file, the link has to point at it instead
+                of a copy that another backup registered first.
+        """
+
+    @abstractmethod
+    async def release_registered_messages(self, message_ids: Sequence[int]) -> list[int]:
+        """
+        Removes one reference per entry from registered backup messages, call once a link using them is deleted.
+
+        Parameters:
+            message_ids (Sequence[int]): The backup message IDs of the deleted link.
+
+        Returns:
+            list[int]: The message IDs no link refers to anymore, including unregistered ones, safe to delete.
+        """
+
+    @abstractmethod
+    async def record_link_accesses(self, accesses: Mapping[tuple[str, str], int]) -> None:
+        """
+        Adds aggregated link access counts.
+
+        Parameters:
+            accesses (Mapping[tuple[str, str], int]): The access count per link and UTC day ('YYYY-MM-DD').
+        """
+
+    @abstractmethod
+    async def top_links(self, since_day: str, limit: int) -> list[tuple[str, int]]:
+        """
+        Retrieves the most accessed links since a day.
+
+        Parameters:
+            since_day (str): The first UTC day ('YYYY-MM-DD') counted.
+            limit (int): The maximum amount of links.
+
+        Returns:
+            list[tuple[str, int]]: The links and their access counts, most accessed first.
+        """
+
+    @abstractmethod
+    async def add_user(self, user_id: int, access_hash: int | None = None) -> bool:
+        """
+        Adds a user if they don't exist yet.
+
+        Parameters:
+            user_id (int): The ID of the user to add.
+            access_hash (int | None): The user's access hash, stored when given.
+
+        Returns:
+            bool: Whether the user was added or queued successfully.
+        """
+
+    @abstractmethod
+    async def load_user_context(self, user_id: int, access_hash: int | None = None) -> UserContext:
+        """
+        Adds a user if they don't exist yet and returns their ban status and requested channels.
+
+        Parameters:
+            user_id (int): The ID of the user.
+            access_hash (int | None): The user's access hash, stored when given.
+
+        Returns:
+            UserContext: The user's context.
+        """
+
+    @abstractmethod
+    async def ban_user(self, user_id: int) -> bool:
+        """
+        Bans an existing user.
+
+        Parameters:
+            user_id (int): The ID of the user to ban.
+
+        Returns:
+            bool: Whether the user exists.
+        """
+
+    @abstractmethod
+    async def unban_user(self, user_id: int) -> bool:
+        """
+        Unbans an existing user.
+
+        Parameters:
+            user_id (int): The ID of the user to unban.
+
+        Returns:
+            bool: Whether the user exists.
+        """
+
+    @abstractmethod
+    async def set_users_banned(self, user_ids: Sequence[int], banned: bool) -> ModerationResult:  # noqa: FBT001
+        """
+        Bans or unbans many users at once.
+
+        Parameters:
+            user_ids (Sequence[int]): The IDs of the users.
+            banned (bool): Whether to ban or unban the users.
+
+        Returns:
+            ModerationResult: Which users were changed, unchanged or missing.
+        """
+
+    @abstractmethod
+    async def is_user_banned(self, user_id: int) -> bool:
+        """
+        Checks if a user is banned.
+
+        Parameters:
+            user_id (int): The ID of the user to check.
+
+        Returns:
+            bool: True if the user is banned, False otherwise.
+        """
+
+    @abstractmethod
+    async def user_join_request(self, user_id: int, channel_id: int, access_hash: int | None = None) -> bool:
+        """
+        Adds a private channel to the user's list of requested channels.
+
+        Parameters:
+            user_id (int): The ID of the user.
+            channel_id (int): The ID of the channel to add.
+            access_hash (int | None): The user's access hash, stored when given.
+
+        Returns:
+            bool: Whether the operation was successful.
+        """
+
+    @abstractmethod
+    async def user_requested_channels(self, user_id: int) -> list:
+        """
+        Fetches the list of channels the user requested to join.
+
+        Parameters:
+            user_id (int): The ID of the user.
+
+        Returns:
+            list: The list of private channel IDs.
+        """
+
+    @abstractmethod
+    def iter_user_ids(self, batch_size: int = 1000) -> AsyncIterator[RecipientBatch]:
+        """
+        Streams the IDs of all users in ascending order.
+
+        Parameters:
+            batch_size (int): The amount of user IDs per batch.
+
+        Returns:
+            AsyncIterator[RecipientBatch]: Batches of unique user IDs, where they were found and their
+                stored access hashes.
+        """
+
+    async def has_codex_users(self) -> bool:
+        """
+        Checks whether users of a CodeXbotz database were ever found, the backup messages of their links are not
+        stored in the database.
+
+        Returns:
+            bool: Whether CodeXbotz users exist or were merged.
+        """
+        return False
+
+    @abstractmethod
+    async def cleanup_users(self, unsuccessful_ids: Sequence[int], unsuccessful_ids_codex: Sequence[int]) -> None:
+        """
+        Deletes users by ID.
+
+        Parameters:
+            unsuccessful_ids (Sequence[int]): User IDs to delete.
+            unsuccessful_ids_codex (Sequence[int]): User IDs to delete from the CodeXbotz users.
+        """
+
+    @abstractmethod
+    async def stats(self) -> StatsModel:
+        """
+        Retrieves the number of links and users and their growth rates.
+
+        Returns:
+            StatsModel: The current statistics.
+        """
+
+    @abstractmethod
+    async def get_settings(self, document_id: str) -> dict | None:
+        """
+        Retrieves a settings document.
+
+        Parameters:
+            document_id (str): The ID of the settings document.
+
+        Returns:
+            dict | None: The stored settings, or None if there are none.
+        """
+
+    @abstractmethod
+    async def update_settings(self, document_id: str, settings: dict) -> None:
+        """
+        Creates a settings document or updates some of its fields.
+
+        Parameters:
+            document_id (str): The ID of the settings document.
+            settings (dict): The fields to set.
+        """
+
+    async def close(self) -> None:  # noqa: B027
+        """
+        Flushes pending writes and releases connections, should be called on shutdown.
+        """
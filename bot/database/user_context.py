@@ -0,0 +1,91 @@
+from typing import ClassVar
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import BaseModel
+
+from bot.utilities.helpers import MemoryCache
+
+from .write_behind import WriteBehindQueue
+
+
+class UserContext(BaseModel):
+    """
+    Everything the /start path needs to know about a user, loaded in a single round trip.
+
+    Parameters:
+        user_id (int): The ID of the user.
+        banned (bool): Whether the user is banned.
+        channels (list[int]): The private channel IDs the user requested to join.
+        is_new (bool): Whether the user was inserted by this load.
+    """
+
+    user_id: int
+    banned: bool = False
+    channels: list[int] = []
+    is_new: bool = False
+
+
+class UserContextLoader:
+    db: AsyncIOMotorDatabase
+    user_cache: ClassVar[MemoryCache]
+    user_writes: WriteBehindQueue
+
+    def _build_user_context(self, user_id: int, user_data: dict, is_new: bool) -> UserContext:  # noqa: FBT001
+        channels = user_data.get("channels", [])
+        channels += [i for i in self.user_writes.pending_values(user_id, "channels") if i not in channels]
+
+        user_context = UserContext(
+            user_id=user_id,
+            banned=user_data.get("banned", False),
+            channels=channels,
+        )
+        self.user_cache.set(user_id, user_context)
+        return user_context.model_copy(update={"is_new": is_new}) if is_new else user_context
+
+    async def read_user_context(self, user_id: int) -> UserContext | None:
+        """
+        Returns a user's context from the user cache or the database without upserting the user.
+
+        Parameters:
+            user_id (int): The ID of the user.
+
+        Returns:
+            UserContext | None: The user's context, or None if the user does not exist.
+        """
+        user_context = self.user_cache.get(user_id)
+        if user_context is not None:
+            return user_context
+
+        user_data = await self.db["Users"].find_one({"_id": user_id}, {"_id": 0, "banned": 1, "channels": 1})
+        if user_data is None:
+            return None
+        return self._build_user_context(user_id=user_id, user_data=user_data, is_new=False)
+
+    async def load_user_context(self, user_id: int, access_hash: int | None = None) -> UserContext:
+        """
+        Returns a user's context from the user cache, otherwise reads the user's ban status and requested
+        channels and queues the user's upsert on the write-behind queue.
+
+        The upsert is batched instead of sent as a find_one_and_update, so concurrent first loads of the same
+        user may both report is_new; the users counter is still incremented once per inserted document by the
+        queue.
+
+        Parameters:
+            user_id (int): The ID of the user.
+            access_hash (int | None): The user's access hash, stored when given.
+
+        Returns:
+            UserContext: The user's context.
+        """
+        user_context = self.user_cache.get(user_id)
+        if user_context is not None:
+            return user_context
+
+        user_data = await self.db["Users"].find_one({"_id": user_id}, {"_id": 0, "banned": 1, "channels": 1})
+        is_new = user_data is None
+        if is_new or access_hash is not None:
+            set_fields: dict[str, int] = {"_id": user_id}
+            if access_hash is not None:
+                set_fields["access_hash"] = access_hash
+            await self.user_writes.upsert(key=user_id, set_fields=set_fields)
+        return self._build_user_context(user_id=user_id, user_data=user_data or {}, is_new=is_new)
@@ -0,0 +1,228 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+
+class PendingWrite:
+    """
+    A coalesced upsert waiting to be flushed.
+
+    Parameters:
+        set_fields (dict[str, Any]): Fields for '$set', later values win.
+        add_to_set (dict[str, list]): Values for '$addToSet', merged without duplicates.
+        attempts (int): The amount of times the server rejected the write.
+    """
+
+    __slots__ = ("add_to_set", "attempts", "set_fields")
+
+    def __init__(self) -> None:
+        self.set_fields: dict[str, Any] = {}
+        self.add_to_set: dict[str, list] = {}
+        self.attempts = 0
+
+    def merge(self, set_fields: dict[str, Any] | None, add_to_set: dict[str, list] | None) -> None:
+        if set_fields:
+            self.set_fields.update(set_fields)
+        for field, values in (add_to_set or {}).items():
+            field_values = self.add_to_set.setdefault(field, [])
+            field_values.extend(i for i in values if i not in field_values)
+
+    def to_update(self) -> dict[str, dict]:
+        update: dict[str, dict] = {}
+        if self.set_fields:
+            update["$set"] = self.set_fields
+        if self.add_to_set:
+            update["$addToSet"] = {field: {"$each": values} for field, values in self.add_to_set.items()}
+        return update
+
+
+class WriteBehindQueue:
+    """
+    An asynchronous write-behind queue that coalesces upserts by document ID.
+
+    Writes are flushed as unordered bulk_write batches once max_batch_size documents are pending or every
+    flush_interval seconds. When max_pending documents are waiting, a write to a new document waits for a
+    flush, or is rejected if the last flush failed less than retry_delay seconds ago or left the queue full.
+
+    Parameters:
+        collection (AsyncIOMotorCollection): The collection to write to.
+        max_batch_size (int): The amount of pending documents that triggers a flush and the bulk size.
+        flush_interval (float): The maximum seconds a write waits before being flushed.
+        max_pending (int): The maximum amount of pending documents.
+        on_upserted (Callable[[int], Awaitable[None]] | None): Called with the amount of inserted documents.
+        retry_delay (float): The seconds new documents are rejected without flushing after a failed flush.
+    """
+
+    logger = logging.getLogger(__name__)
+    max_attempts = 3
+
+    def __init__(  # noqa: PLR0913
+        self,
+        collection: AsyncIOMotorCollection,
+        max_batch_size: int,
+        flush_interval: float,
+        max_pending: int,
+        on_upserted: Callable[[int], Awaitable[None]] | None = None,
+        retry_delay: float = 30,
+    ) -> None:
+        self.collection = collection
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.on_upserted = on_upserted
+        self.retry_delay = retry_delay
+
+        self._pending: dict[Hashable, PendingWrite] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_event = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+        self._retry_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _merge(self, key: Hashable, set_fields: dict[str, Any] | None, add_to_set: dict[str, list] | None) -> None:
+        self._pending.setdefault(key, PendingWrite()).merge(set_fields=set_fields, add_to_set=add_to_set)
+
+    def _requeue(self, key: Hashable, write: PendingWrite) -> None:
+        newer = self._pending.get(key)
+        self._pending[key] = write
+        if newer is not None:
+            write.merge(set_fields=newer.set_fields, add_to_set=newer.add_to_set)
+
+    async def upsert(
+        self,
+        key: Hashable,
+        set_fields: dict[str, Any] | None = None,
+        add_to_set: dict[str, list] | None = None,
+    ) -> bool:
+        """
+        Queues an upsert of the document with the given ID.
+
+        Parameters:
+            key (Hashable): The document ID.
+            set_fields (dict[str, Any] | None): Fields to '$set'.
+            add_to_set (dict[str, list] | None): Values to '$addToSet' per field.
+
+        Returns:
+            bool: Whether the upsert was queued, False if the queue is full and can't be flushed.
+        """
+        if not self._closed and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+        if key not in self._pending and len(self._pending) >= self.max_pending:
+            if time.monotonic() >= self._retry_at:
+                await self.flush()
+            if len(self._pending) >= self.max_pending:
+                self.logger.warning("Rejected a write to %s, %d writes are pending", self.collection.name, len(self))
+                return False
+
+        self._merge(key=key, set_fields=set_fields, add_to_set=add_to_set)
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush_event.set()
+        return True
+
+    def pending_values(self, key: Hashable, field: str) -> list:
+        """
+        Returns the '$addToSet' values of a document that have not been flushed yet.
+
+        Parameters:
+            key (Hashable): The document ID.
+            field (str): The field name.
+
+        Returns:
+            list: The pending values.
+        """
+        pending = self._pending.get(key)
+        return list(pending.add_to_set.get(field, [])) if pending else []
+
+    async def flush(self) -> None:
+        """
+        Writes every pending upsert. Failed batches and the batches after them are requeued, writes the server
+        rejected are retried up to max_attempts times.
+        """
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            items = list(pending.items())
+
+            for i in range(0, len(items), self.max_batch_size):
+                batch = items[i : i + self.max_batch_size]
+                requests = [UpdateOne({"_id": key}, write.to_update(), upsert=True) for key, write in batch]
+
+                try:
+                    result = await self.collection.bulk_write(requests, ordered=False)
+                except BulkWriteError as e:
+                    await self._handle_rejected(batch=batch, details=e.details)
+                    continue
+                except PyMongoError:
+                    self.logger.exception("Requeued %d writes to %s", len(items) - i, self.collection.name)
+                    for key, write in items[i:]:
+                        self._requeue(key=key, write=write)
+                    self._retry_at = time.monotonic() + self.retry_delay
+                    return
+
+                if self.on_upserted and result.upserted_count:
+                    await self.on_upserted(result.upserted_count)
+
+            self._retry_at = 0.0
+
+    async def _handle_rejected(self, batch: list[tuple[Hashable, PendingWrite]], details: dict[str, Any]) -> None:
+        """
+        Counts the upserts of a partially rejected batch and requeues the rejected writes until they were
+        rejected max_attempts times, e.g. duplicate key errors of concurrent upserts succeed when retried.
+
+        Parameters:
+            batch (list[tuple[Hashable, PendingWrite]]): The batch that was written.
+            details (dict[str, Any]): The details of the BulkWriteError.
+        """
+        if self.on_upserted and details.get("nUpserted"):
+            await self.on_upserted(details["nUpserted"])
+
+        dropped = 0
+        for error in details.get("writeErrors", []):
+            key, write = batch[error["index"]]
+            write.attempts += 1
+            if write.attempts < self.max_attempts:
+                self._requeue(key=key, write=write)
+                continue
+
+            dropped += 1
+            self.logger.error("Dropped write %r to %s: %s", key, self.collection.name, error.get("errmsg"))
+
+        self.logger.warning(
+            "%d writes to %s were rejected, %d were dropped",
+            len(details.get("writeErrors", [])),
+            self.collection.name,
+            dropped,
+        )
+
+    async def _run(self) -> None:
+        while not self._closed:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+            self._flush_event.clear()
+
+            if self._pending:
+                await self.flush()
+
+    async def close(self) -> None:
+        """
+        Stops the flush loop and writes every pending upsert, should be called on shutdown.
+        """
+        self._closed = True
+        self._flush_event.set()
+
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+        await self.flush()
@@ -1,7 +1,6 @@
 import asyncio
 import logging
 import sys
-import threading
 
 from pyrogram.client import Client
 from pyrogram.errors import ChannelInvalid, ChatAdminRequired
@@ -10,9 +9,11 @@ from rich.logging import RichHandler
 from rich.traceback import install
 
 from bot.config import config
+from bot.database import MongoDB, QueryPlanError, get_storage, invalidation_bus, link_access_counter
 from bot.options import options
 from bot.utilities.helpers import NoInviteLinkError, PyroHelper, RateLimiter
 from bot.utilities.http_server import HTTPServer
+from bot.utilities.pyrotools import LinkSweeper
 from bot.utilities.schedule_manager import schedule_manager
 
 install(show_locals=True)
@@ -33,6 +34,43 @@ except ImportError:
     logging.warning("UVLoop not installed. Falling back to asyncio")
 
 background_tasks = set()
+database = get_storage()
+
+
+async def start_mongo_tasks(mongo_db: MongoDB) -> None:
+    """
+    Starts the change stream watchers, the link schema and CodeXbotz users migrations, the link mirror
+    sync and the link cache pre-warming, then creates or verifies the indexes of a MongoDB backend.
+
+    Parameters:
+        mongo_db (MongoDB): The MongoDB storage backend.
+    """
+    watchers = [
+        options.watch_settings(),
+        invalidation_bus.watch(mongo_db.db),
+        mongo_db.migrate_link_documents(),
+        mongo_db.merge_codex_users(),
+    ]
+    if config.LINK_PREWARM_COUNT:
+        watchers.append(link_access_counter.prewarm(days=7, limit=config.LINK_PREWARM_COUNT))
+    if mongo_db.link_mirror:
+        watchers.append(mongo_db.link_mirror.sync(mongo_db.db))
+
+    for watcher in watchers:
+        watch_task = asyncio.create_task(watcher)
+        background_tasks.add(watch_task)
+        watch_task.add_done_callback(background_tasks.discard)
+
+    if config.VERIFY_QUERY_PLANS:
+        await mongo_db.ensure_indexes()
+        try:
+            await mongo_db.verify_query_plans()
+        except QueryPlanError as e:
+            sys.exit(f"Query plan verification failed:\n{e}")
+    else:
+        index_task = asyncio.create_task(mongo_db.ensure_indexes())
+        background_tasks.add(index_task)
+        index_task.add_done_callback(background_tasks.discard)
 
 
 async def main() -> None:
@@ -48,6 +86,13 @@ async def main() -> None:
 
     # Load database settings
     await options.load_settings()
+    if isinstance(database, MongoDB):
+        await start_mongo_tasks(mongo_db=database)
+    if config.LINK_FILTER_CAPACITY:
+        filter_task = asyncio.create_task(database.build_link_filter(min_capacity=config.LINK_FILTER_CAPACITY))
+        background_tasks.add(filter_task)
+        filter_task.add_done_callback(background_tasks.discard)
+
     await bot_client.start()
     # Bot setup
 
@@ -61,6 +106,19 @@ async def main() -> None:
         sys.exit(f"Please add and give me permission in FORCE_SUB_CHANNELS and BACKUP_CHANNEL:\n{e}")
 
     await schedule_manager.start()
+    if isinstance(database, MongoDB):
+        await schedule_manager.schedule_interval(
+            func=database.reconcile_counters,
+            interval_seconds=config.STATS_RECONCILE_SECONDS,
+        )
+    await schedule_manager.schedule_interval(
+        func=LinkSweeper(client=bot_client, database=database).sweep,
+        interval_seconds=config.LINK_SWEEP_SECONDS,
+    )
+    await schedule_manager.schedule_interval(
+        func=link_access_counter.flush,
+        interval_seconds=config.LINK_STATS_FLUSH_SECONDS,
+    )
 
     task = None
     if config.HTTP_SERVER:
@@ -68,9 +126,9 @@ async def main() -> None:
         task = asyncio.create_task(http_server.run_server())
         background_tasks.add(task)
     if config.RATE_LIMITER:
-        thread = threading.Thread(target=RateLimiter.cooldown_limiter)
-        thread.daemon = True
-        thread.start()
+        cooldown_task = asyncio.create_task(RateLimiter.cooldown_limiter())
+        background_tasks.add(cooldown_task)
+        cooldown_task.add_done_callback(background_tasks.discard)
 
     await idle()
 
@@ -78,6 +136,8 @@ async def main() -> None:
         task.add_done_callback(background_tasks.discard)
 
     await bot_client.stop()
+    await link_access_counter.flush()
+    await database.close()
 
 
 asyncio.run(main())
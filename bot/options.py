@@ -1,6 +1,11 @@
+import asyncio
+import logging
+
 from pydantic import BaseModel
+from pymongo.errors import OperationFailure, PyMongoError
 
-from bot.database import MongoDB
+from bot.config import config
+from bot.database import CHANGE_STREAM_HISTORY_LOST, MongoDB, get_storage
 
 
 class SettingsModel(BaseModel):
@@ -48,56 +53,53 @@ class InvalidValueError(Exception):
         super().__init__(f"Value for key '{key}' must have the same type as the existing value.")
 
 
-class Options(MongoDB):
+class Options:
     """
     A class representing the bot's options.
 
+    Settings are replaced as whole snapshots rather than mutated, so reads of self.settings never need a lock.
+
     Parameters:
         self.settings (SettingsModel): The bot's settings.
+        self.storage (StorageBackend): The storage backend holding the settings document.
         self.collection (str): The name of the collection.
         self.document_id (str): The ID of the document to retrieve/update settings.
     """
 
+    logger = logging.getLogger(__name__)
+
     def __init__(self) -> None:
-        super().__init__()
         self.settings = SettingsModel()
+        self.storage = get_storage()
         self.collection = "BotSettings"
         self.document_id = "MainOptions"
 
     async def load_settings(self) -> None:
         """
-        Load settings from the MongoDB collection.
+        Load settings from the storage backend.
 
         Example:
             await self.load_settings()
         """
-        pipeline = [{"$match": {"_id": self.document_id}}]
-        cursor = self.db[self.collection].aggregate(pipeline)
-        settings_doc = await cursor.to_list(length=None)
+        settings_doc = await self.storage.get_settings(self.document_id)
 
         if settings_doc:
-            self.settings = SettingsModel(**settings_doc[0])
+            self.settings = SettingsModel(**settings_doc)
         else:
             self.settings = SettingsModel()
 
-        update = {"$set": self.settings.model_dump()}
-        db_filter = {"_id": self.document_id}
-        await self.db[self.collection].update_one(
-            filter=db_filter,
-            update=update,
-            upsert=True,
-        )
+        await self.storage.update_settings(self.document_id, self.settings.model_dump())
 
     async def update_settings(self, key: str, value: str | int) -> SettingsModel:
         """
-        Update the settings and save them to the MongoDB collection.
+        Update the settings and save them to the storage backend.
 
         Parameters:
             key (str): The key/field name in the SettingsModel to update.
             value (str | int): The new value to set for the specified key.
 
         Returns:
-            The updated SettingsModel instance from 'elf.settings'.
+            The updated SettingsModel instance from 'self.settings'.
 
         Raises:
             KeyError:
@@ -115,19 +117,75 @@ class Options(MongoDB):
         if annotation is not None and not isinstance(value, annotation):
             raise InvalidValueError(key)
 
-        setattr(self.settings, key, value)
-        self.settings = SettingsModel(**self.settings.model_dump())
-
-        model_key, model_value = key, getattr(self.settings, key)
-        db_filter = {"_id": self.document_id}
-        update = {"$set": {model_key: model_value}}
-        await self.db[self.collection].update_one(
-            filter=db_filter,
-            update=update,
-            upsert=True,
-        )
+        self.settings = SettingsModel.model_validate({**self.settings.model_dump(), key: value})
+
+        await self.storage.update_settings(self.document_id, {key: getattr(self.settings, key)})
         return self.settings
 
+    async def refresh_settings(self) -> None:
+        """
+        Swaps in the stored settings if they differ from the current snapshot.
+        """
+        settings_doc = await self.storage.get_settings(self.document_id)
+        if settings_doc:
+            settings = SettingsModel(**settings_doc)
+            if settings != self.settings:
+                self.settings = settings
+
+    async def poll_settings(self) -> None:
+        """
+        Reloads the settings document every config.OPTIONS_POLL_INTERVAL seconds.
+        Used when change streams are unavailable.
+        """
+        while True:
+            await asyncio.sleep(config.OPTIONS_POLL_INTERVAL)
+            try:
+                await self.refresh_settings()
+            except PyMongoError:
+                self.logger.exception("Couldn't poll settings")
+
+    async def watch_settings(self) -> None:
+        """
+        Swaps in a new settings snapshot whenever the settings document changes in any process.
+        Falls back to polling if the deployment does not support change streams.
+        Returns immediately for local storage backends, which are only written by this process.
+
+        Example:
+            asyncio.create_task(options.watch_settings())
+        """
+        if not isinstance(self.storage, MongoDB):
+            return None
+
+        pipeline = [{"$match": {"documentKey._id": self.document_id}}]
+        resume_token, opened = None, False
+
+        while True:
+            try:
+                async with self.storage.db[self.collection].watch(
+                    pipeline=pipeline,
+                    full_document="updateLookup",
+                    resume_after=resume_token,
+                ) as stream:
+                    # Changes made while no stream was open are read once the new stream is open.
+                    resume_token = stream.resume_token
+                    if opened:
+                        await self.refresh_settings()
+                    opened = True
+
+                    while stream.alive:
+                        change = await stream.try_next()
+                        resume_token = stream.resume_token
+                        if change is not None and change.get("fullDocument"):
+                            self.settings = SettingsModel(**change["fullDocument"])
+            except OperationFailure as e:  # noqa: PERF203
+                if e.code != CHANGE_STREAM_HISTORY_LOST:
+                    self.logger.warning("Change streams unavailable, polling settings instead")
+                    return await self.poll_settings()
+                resume_token = None
+            except PyMongoError:
+                self.logger.exception("Settings change stream interrupted, reconnecting")
+                await asyncio.sleep(config.OPTIONS_POLL_INTERVAL)
+
 
 # create an instance
 options = Options()
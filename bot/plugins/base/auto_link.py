@@ -1,5 +1,4 @@
 import asyncio
-import uuid
 from typing import ClassVar
 
 from pyrogram import filters
@@ -7,17 +6,17 @@ from pyrogram.client import Client
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
 
 from bot.config import config
-from bot.database import MongoDB
+from bot.database import get_storage
 from bot.options import options
-from bot.utilities.helpers import DataEncoder, RateLimiter
+from bot.utilities.helpers import DataEncoder, ExpiryParser, MemoryCache, RateLimiter, SearchText
 from bot.utilities.pyrofilters import ConvoMessage, PyroFilters
-from bot.utilities.pyrotools import FileResolverModel
+from bot.utilities.pyrotools import FileBackup, FileResolverModel
 
 
 class AutoLinkGen:
-    database = MongoDB()
+    database = get_storage()
     background_tasks: ClassVar[set[asyncio.Task]] = set()
-    files_cache: ClassVar[dict[int, dict[int, list[FileResolverModel]]]] = {}
+    files_cache: ClassVar[MemoryCache] = MemoryCache(name="auto_link_files", max_size=1000, ttl=60)
 
     @classmethod
     async def process_files(
@@ -28,12 +27,19 @@ class AutoLinkGen:
     ) -> Message:
         "Handles file backups"
 
-        unique_link = f"{uuid.uuid4().int}"
-        file_link = DataEncoder.encode_data(unique_link)
+        file_link = DataEncoder.generate_link_id()
         file_origin = config.BACKUP_CHANNEL if options.settings.BACKUP_FILES else message.chat.id
         file_datas = [i.model_dump() for i in file_data]
-
-        add_file = await cls.database.add_file(file_link=file_link, file_origin=file_origin, file_data=file_datas)
+        expires_at, _ = ExpiryParser.from_args([])
+
+        add_file = await cls.database.add_file(
+            file_link=file_link,
+            file_origin=file_origin,
+            file_data=file_datas,
+            expires_at=expires_at,
+            created_by=message.from_user.id,
+            search_text=SearchText.normalize(*(v for i in file_data for v in (i.file_name, i.caption))),
+        )
 
         if add_file:
             link = f"https://t.me/{client.me.username}?start={file_link}"  # type: ignore[reportOptionalMemberAccess]
@@ -54,29 +60,17 @@ class AutoLinkGen:
     async def media_group_handler(cls, client: Client, message: Message) -> None:
         "backup"
         await asyncio.sleep(3)
-        file_datas = [i.model_dump() for i in cls.files_cache[message.from_user.id][message.media_group_id]]
+        media_group = cls.files_cache.pop((message.from_user.id, message.media_group_id), [])
 
         if options.settings.BACKUP_FILES:
-            forwarded_messages = await client.forward_messages(
-                chat_id=config.BACKUP_CHANNEL,
+            await FileBackup.backup(
+                client=client,
+                database=cls.database,
                 from_chat_id=message.chat.id,
-                message_ids=[i["message_id"] for i in file_datas],
-                hide_sender_name=True,
+                files=media_group,
             )
-            file_datas = [
-                FileResolverModel(
-                    caption=msg.caption.markdown if msg.caption else None,
-                    file_id=(msg.document or msg.video or msg.photo or msg.audio or msg.sticker).file_id,
-                    message_id=msg.id,
-                    media_group_id=msg.media_group_id,
-                )
-                for msg in (forwarded_messages if isinstance(forwarded_messages, list) else [forwarded_messages])
-            ]
-        else:
-            file_datas = [FileResolverModel(**d) for d in file_datas]
 
-        del cls.files_cache[message.from_user.id][message.media_group_id]
-        await cls.process_files(client=client, message=message, file_data=file_datas)
+        await cls.process_files(client=client, message=message, file_data=media_group)
 
     @classmethod
     async def handle_files(cls, client: Client, message: Message) -> None:
@@ -88,21 +82,28 @@ class AutoLinkGen:
             caption=message.caption.markdown if message.caption else None,
             file_id=file_type.file_id,
             message_id=message_id,
+            file_unique_id=file_type.file_unique_id,
+            file_name=getattr(file_type, "file_name", None),
         )
 
         if message.media_group_id:
-            if not cls.files_cache.get(user_id, {}).get(message.media_group_id):
-                cls.files_cache[user_id] = {message.media_group_id: []}
+            media_group_key = (user_id, message.media_group_id)
+            if media_group_key not in cls.files_cache:
+                cls.files_cache[media_group_key] = []
                 task = asyncio.create_task(cls.media_group_handler(client=client, message=message))
                 cls.background_tasks.add(task)
                 task.add_done_callback(cls.background_tasks.discard)
 
             resolve_file.media_group_id = message.media_group_id
-            cls.files_cache[user_id][message.media_group_id].append(resolve_file)
+            cls.files_cache.setdefault(media_group_key, []).append(resolve_file)
         else:
             if options.settings.BACKUP_FILES:
-                backup_file = await message.copy(chat_id=config.BACKUP_CHANNEL)
-                resolve_file.message_id = backup_file[0].id if isinstance(backup_file, list) else backup_file.id
+                await FileBackup.backup(
+                    client=client,
+                    database=cls.database,
+                    from_chat_id=message.chat.id,
+                    files=[resolve_file],
+                )
 
             await cls.process_files(client=client, message=message, file_data=[resolve_file])
 
@@ -5,12 +5,12 @@ from pyrogram.client import Client
 from pyrogram.types import Message
 
 from bot.config import config
-from bot.database import MongoDB
+from bot.database import get_storage
 from bot.utilities.helpers import RateLimiter
 from bot.utilities.pyrofilters import PyroFilters
-from bot.utilities.pyrotools import FileResolverModel, HelpCmd
+from bot.utilities.pyrotools import FileResolverModel, HelpCmd, LinkSweeper
 
-database = MongoDB()
+database = get_storage()
 
 
 @Client.on_message(
@@ -36,13 +36,16 @@ async def delete_link(client: Client, message: Message) -> Message:
         )
 
     file_origin = file_document["file_origin"]
-    file_data = [FileResolverModel(**file) for file in file_document["files"]]
+    message_ids = [
+        FileResolverModel(**file).message_id
+        async for files in database.iter_link_files(file_document)
+        for file in files
+    ]
 
     delete_link_document = await database.delete_link_document(base64_file_link=base64_file_link)
 
     if file_origin == config.BACKUP_CHANNEL and delete_link_document:
-        message_ids = [i.message_id for i in file_data]
-        await client.delete_messages(chat_id=file_origin, message_ids=message_ids)
+        await LinkSweeper.release_backup_messages(client=client, database=database, message_ids=message_ids)
 
     return await message.reply(text=f">**Successfully Deleted:**\n `{base64_file_link}`", quote=True)
 
@@ -1,5 +1,4 @@
 import asyncio
-import uuid
 from typing import Any, ClassVar, TypedDict
 
 from pyrogram import filters
@@ -7,11 +6,11 @@ from pyrogram.client import Client
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
 
 from bot.config import config
-from bot.database import MongoDB
+from bot.database import get_storage
 from bot.options import options
-from bot.utilities.helpers import DataEncoder, RateLimiter
+from bot.utilities.helpers import DataEncoder, ExpiryParser, MemoryCache, RateLimiter, SearchText
 from bot.utilities.pyrofilters import ConvoMessage, PyroFilters
-from bot.utilities.pyrotools import HelpCmd
+from bot.utilities.pyrotools import FileBackup, FileResolverModel, HelpCmd
 
 
 class CacheEntry(TypedDict):
@@ -24,8 +23,8 @@ class CacheEntry(TypedDict):
 class MakeFilesCommand:
     """Make files command class."""
 
-    database = MongoDB()
-    files_cache: ClassVar[dict[int, CacheEntry]] = {}
+    database = get_storage()
+    files_cache: ClassVar[MemoryCache] = MemoryCache(name="make_files", max_size=1000, ttl=86400)
 
     @staticmethod
     @RateLimiter.hybrid_limiter(func_count=1)
@@ -83,23 +82,25 @@ class MakeFilesCommand:
                 quote=True,
             )
 
-        cls.files_cache[unique_id]["counter"] += 1
-        cls.files_cache[unique_id]["files"].append(
+        cache_entry: CacheEntry = cls.files_cache.setdefault(unique_id, {"files": [], "counter": 0})
+        cache_entry["counter"] += 1
+        cache_entry["files"].append(
             {
                 "caption": message.caption.markdown if message.caption else None,
                 "file_id": file_type.file_id,
-                "file_name": getattr(file_type, "file_name", file_type.file_unique_id) or file_type.file_unique_id,
+                "file_name": getattr(file_type, "file_name", None),
                 "message_id": message.id,
                 "media_group_id": message.media_group_id,
+                "file_unique_id": file_type.file_unique_id,
             },
         )
 
-        current_files_count = cls.files_cache[unique_id]["counter"]
+        current_files_count = cache_entry["counter"]
         await asyncio.sleep(0.1)
-        if cls.files_cache[unique_id]["counter"] != current_files_count:
+        if cache_entry["counter"] != current_files_count:
             return None
 
-        file_names = "\n".join(i["file_name"] for i in cls.files_cache[unique_id]["files"])
+        file_names = "\n".join(i["file_name"] or i["file_unique_id"] for i in cache_entry["files"])
         extra_message = ">File list truncated.\n- Send more files to continue.\n- Use /make_link for a shareable link."
         return await cls.message_reply(
             client=client,
@@ -115,7 +116,7 @@ class MakeFilesCommand:
 
         This finalizes the conversation by:
         - Checking if any files were uploaded.
-        - Optionally forwarding files to a backup channel.
+        - Optionally forwarding files to a backup channel, reusing files already backed up.
         - Storing file information in a database.
         - Generating and sending a link to access the files.
 
@@ -126,15 +127,10 @@ class MakeFilesCommand:
         Returns:
             Message: The replied message.
         """
-        forward_limit_size = 100
         unique_id = message.chat.id + message.from_user.id
-        user_cache_chunk = [
-            [file["message_id"] for file in cls.files_cache[unique_id]["files"][i : i + forward_limit_size]]
-            for i in range(0, len(cls.files_cache[unique_id]["files"]), forward_limit_size)
-        ]
+        cache_entry: CacheEntry = cls.files_cache.pop(unique_id, None) or {"files": [], "counter": 0}
 
-        if not user_cache_chunk:
-            cls.files_cache.pop(unique_id)
+        if not cache_entry["files"]:
             return await cls.message_reply(
                 client=client,
                 message=message,
@@ -142,39 +138,24 @@ class MakeFilesCommand:
                 quote=True,
             )
 
-        files_to_store = []
+        # 'file_name' and 'file_unique_id' are kept out of the link.
+        files = [FileResolverModel(**i) for i in cache_entry["files"]]
         if options.settings.BACKUP_FILES:
-            for user_cache in user_cache_chunk:
-                forwarded_messages = await client.forward_messages(
-                    chat_id=config.BACKUP_CHANNEL,
-                    from_chat_id=message.chat.id,
-                    message_ids=user_cache,
-                    hide_sender_name=True,
-                )
-
-                for msg in forwarded_messages if isinstance(forwarded_messages, list) else [forwarded_messages]:
-                    file_type = msg.document or msg.video or msg.photo or msg.audio or msg.sticker
-                    files_to_store.append(
-                        {
-                            "caption": msg.caption.markdown if msg.caption else None,
-                            "file_id": file_type.file_id,
-                            "message_id": msg.id,
-                            "media_group_id": message.media_group_id,
-                        },
-                    )
-        else:
-            # Create a copy of the files cache, excluding the 'file_name' field from each file CacheEntry.
-            files_to_store = [
-                {k: v for k, v in i.items() if k != "file_name"} for i in cls.files_cache[unique_id]["files"]
-            ]
-
-        unique_link = f"{uuid.uuid4().int}"
-        file_link = DataEncoder.encode_data(unique_link)
-        file_origin = config.BACKUP_CHANNEL if options.settings.BACKUP_FILES else message.chat.id
-
-        add_file = await cls.database.add_file(file_link=file_link, file_origin=file_origin, file_data=files_to_store)
+            await FileBackup.backup(client=client, database=cls.database, from_chat_id=message.chat.id, files=files)
+        files_to_store = [i.model_dump() for i in files]
 
-        cls.files_cache.pop(unique_id)
+        file_link = DataEncoder.generate_link_id()
+        file_origin = config.BACKUP_CHANNEL if options.settings.BACKUP_FILES else message.chat.id
+        expires_at, _ = ExpiryParser.from_args(message.text.split()[1:])
+
+        add_file = await cls.database.add_file(
+            file_link=file_link,
+            file_origin=file_origin,
+            file_data=files_to_store,
+            expires_at=expires_at,
+            created_by=message.from_user.id,
+            search_text=SearchText.normalize(*(v for i in files for v in (i.file_name, i.caption))),
+        )
 
         if add_file:
             link = f"https://t.me/{client.me.username}?start={file_link}"  # type: ignore[reportOptionalMemberAccess]
@@ -208,6 +189,7 @@ async def make_files_command_handler(client: Client, message: ConvoMessage) -> M
     **Usage:**
         /make_files: initiate a conversation then send your files.
         /make_link: wraps the conversation and generates a link.
+        /make_link 7d: generates a link that expires, e.g. `12h`, `7d`, `2w` or `2025-12-31`.
     """
     if message.convo_start:
         return await MakeFilesCommand.handle_convo_start(client=client, message=message)
@@ -1,4 +1,3 @@
-import uuid
 from inspect import cleandoc
 
 from pyrogram import filters
@@ -6,12 +5,12 @@ from pyrogram.client import Client
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
 
 from bot.config import config
-from bot.database import MongoDB
-from bot.utilities.helpers import DataEncoder, RateLimiter
+from bot.database import get_storage
+from bot.utilities.helpers import DataEncoder, ExpiryParser, RateLimiter, SearchText
 from bot.utilities.pyrofilters import ConvoMessage, PyroFilters
 from bot.utilities.pyrotools import HelpCmd
 
-database = MongoDB()
+database = get_storage()
 
 
 @Client.on_message(
@@ -22,13 +21,16 @@ async def range_files(client: Client, message: ConvoMessage) -> Message | None:
     """>**Fetch files directly from backup channel to create a sharable link of ranged file ids.**
 
     **Usage:**
-        /range_files [start link] [end link] [(optional) exclude id]
+        /range_files [start link] [end link] [(optional) exclude id] [(optional) expiry]
 
         /range_files https://t.me/c/-100/9 https://t.me/c/-100/100
 
         /range_files https://t.me/c/-100/9 https://t.me/c/-100/100 69 70 80 90
 
+        /range_files https://t.me/c/-100/9 https://t.me/c/-100/100 7d
+
     >This fetch files from database started with file id 9 to 100 and excludes 69, 79, 80 and 90
+    >An expiry like `12h`, `7d`, `2w` or `2025-12-31` deletes the link and its files once it passes
     """
 
     if not message.command[2:]:
@@ -40,7 +42,8 @@ async def range_files(client: Client, message: ConvoMessage) -> Message | None:
         return await message.reply(text="Only send a file link from your current database channel", quote=True)
 
     end_file_link = message.command[2].split("/")
-    exclude_file_ids = set(map(int, message.command[3:]))
+    expires_at, exclude_args = ExpiryParser.from_args(message.command[3:])
+    exclude_file_ids = set(map(int, exclude_args))
 
     file_ids_range = [
         num for num in range(int(start_file_link[-1]), int(end_file_link[-1]) + 1) if num not in exclude_file_ids
@@ -49,7 +52,7 @@ async def range_files(client: Client, message: ConvoMessage) -> Message | None:
     fetch_files = await client.get_messages(chat_id=config.BACKUP_CHANNEL, message_ids=file_ids_range)
     fetch_files = [fetch_files] if not isinstance(fetch_files, list) else fetch_files
 
-    files_to_store = []
+    files_to_store, registry_files, search_values = [], [], []
     for file in fetch_files:
         file_type = file.document or file.video or file.photo or file.audio or file.sticker
 
@@ -63,15 +66,28 @@ async def range_files(client: Client, message: ConvoMessage) -> Message | None:
                 "message_id": file.id,
             },
         )
+        registry_files.append((file_type.file_unique_id, file.id))
+        search_values += [getattr(file_type, "file_name", None), file.caption]
 
     if not files_to_store:
         return await message.reply(text="Couldn't fetch any files from given range.", quote=True)
 
-    unique_link = f"{uuid.uuid4().int}"
-    file_link = DataEncoder.encode_data(unique_link)
+    file_link = DataEncoder.generate_link_id()
     file_origin = config.BACKUP_CHANNEL
 
-    add_file = await database.add_file(file_link=file_link, file_origin=file_origin, file_data=files_to_store)
+    # Files registered with another backup message point at it instead.
+    registered = await database.retain_registered_files(registry_files)
+    for file_data, (file_unique_id, _) in zip(files_to_store, registry_files, strict=True):
+        file_data["message_id"] = registered[file_unique_id]
+
+    add_file = await database.add_file(
+        file_link=file_link,
+        file_origin=file_origin,
+        file_data=files_to_store,
+        expires_at=expires_at,
+        created_by=message.from_user.id,
+        search_text=SearchText.normalize(*search_values),
+    )
 
     if add_file:
         link = f"https://t.me/{client.me.username}?start={file_link}"  # type: ignore[reportOptionalMemberAccess]
@@ -1,16 +1,18 @@
+import asyncio
+
 from pyrogram import filters
 from pyrogram.client import Client
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
 
 from bot.config import config
-from bot.database import MongoDB
+from bot.database import get_storage, link_access_counter
 from bot.options import options
 from bot.utilities.helpers import DataEncoder, DataValidationError, PyroHelper, RateLimiter
 from bot.utilities.pyrofilters import PyroFilters, SubscriptionMessage
 from bot.utilities.pyrotools import FileResolverModel, HelpCmd, Pyrotools
 from bot.utilities.schedule_manager import schedule_manager
 
-database = MongoDB()
+database = get_storage()
 
 
 class FileSender:
@@ -112,11 +114,24 @@ async def file_start(
         await PyroHelper.option_message(client=client, message=message, option_key=options.settings.START_MESSAGE)
         return message.stop_propagation()
 
-    # shouldn't overwrite existing id it already exists
-    await database.add_user(user_id=message.from_user.id)
+    # Upserts the user, reuses the context already loaded by the subscription filter.
+    await PyroFilters.get_user_context(client, message)
 
     base64_file_link = message.text.split(maxsplit=1)[1]
-    file_document = await database.get_link_document(base64_file_link=base64_file_link)
+    # Links missing from the link filter are not stored, CodeXbotz links are decoded below without a lookup.
+    file_document = (
+        await database.get_link_document(base64_file_link=base64_file_link)
+        if database.link_may_exist(base64_file_link)
+        else None
+    )
+
+    if file_document and database.link_expired(file_document):
+        await PyroHelper.option_message(
+            client=client,
+            message=message,
+            option_key=options.settings.FILE_DOES_NOT_EXIST,
+        )
+        return message.stop_propagation()
 
     if not file_document:
         try:
@@ -147,16 +162,25 @@ async def file_start(
             )
             return message.stop_propagation()
     else:
+        link_access_counter.record(base64_file_link)
         file_origin = file_document["file_origin"]
-        file_data = [FileResolverModel(**file) for file in file_document["files"]]
+        send_files = []
 
-        send_files = await FileSender.teleshare(
-            client=client,
-            chat_id=message.chat.id,
-            file_data=file_data,
-            file_origin=file_origin,
-            protect_content=config.PROTECT_CONTENT,
-        )
+        # Chunked links are streamed, the next chunk is loaded by a task while the current one is sent.
+        chunks = database.iter_link_files(file_document)
+        next_chunk = asyncio.ensure_future(anext(chunks, None))
+        try:
+            while (files := await next_chunk) is not None:
+                next_chunk = asyncio.ensure_future(anext(chunks, None))
+                send_files += await FileSender.teleshare(
+                    client=client,
+                    chat_id=message.chat.id,
+                    file_data=[FileResolverModel(**file) for file in files],
+                    file_origin=file_origin,
+                    protect_content=config.PROTECT_CONTENT,
+                )
+        finally:
+            next_chunk.cancel()
 
     delete_n_seconds = options.settings.AUTO_DELETE_SECONDS
 
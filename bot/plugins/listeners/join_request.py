@@ -2,16 +2,19 @@ from pyrogram.client import Client
 from pyrogram.types import ChatJoinRequest
 
 from bot.config import config
-from bot.database import MongoDB
+from bot.database import get_storage
+from bot.utilities.helpers import PyroHelper
 
-database = MongoDB()
+database = get_storage()
 
 
 @Client.on_chat_join_request()
-async def join_request(client: Client, chat_join_request: ChatJoinRequest) -> bool | None:  # noqa: ARG001
+async def join_request(client: Client, chat_join_request: ChatJoinRequest) -> bool | None:
     if config.PRIVATE_REQUEST:
+        user_id = chat_join_request.from_user.id
         return await database.user_join_request(
-            user_id=chat_join_request.from_user.id,
+            user_id=user_id,
             channel_id=chat_join_request.chat.id,
+            access_hash=await PyroHelper.get_access_hash(client=client, user_id=user_id),
         )
     return None
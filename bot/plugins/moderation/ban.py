@@ -2,36 +2,82 @@ from pyrogram import filters
 from pyrogram.client import Client
 from pyrogram.types import Message
 
-from bot.database import MongoDB
-from bot.utilities.helpers import RateLimiter
+from bot.database import get_storage
+from bot.utilities.helpers import RateLimiter, TooManyUserIdsError, UserIdParser
 from bot.utilities.pyrofilters import ConvoMessage, PyroFilters
 from bot.utilities.pyrotools import HelpCmd
 
-database = MongoDB()
+database = get_storage()
+
+# The ModerationResult fields per command, in order.
+OUTCOMES = {
+    True: ("Banned", "Already banned", "Not found"),
+    False: ("Unbanned", "Not banned", "Not found"),
+}
+
+
+async def set_banned(client: Client, message: ConvoMessage, banned: bool) -> Message:  # noqa: FBT001
+    """
+    Bans or unbans the users a command lists and replies with each user's outcome and the invalid tokens.
+
+    Parameters:
+        client (Client): The client instance.
+        message (ConvoMessage): The command message.
+        banned (bool): Whether to ban or unban the users.
+
+    Returns:
+        Message: The replied message.
+    """
+    try:
+        user_ids, invalid = await UserIdParser.from_message(client=client, message=message)
+    except TooManyUserIdsError as e:
+        return await message.reply(text=str(e), quote=True)
+
+    if not user_ids and not invalid:
+        return await message.reply(text="Please input valid user ids", quote=True)
+
+    results: dict[str, list[int] | list[str]] = {}
+    if user_ids:
+        result = await database.set_users_banned(user_ids, banned=banned)
+        results.update(zip(OUTCOMES[banned], result, strict=True))
+    if invalid:
+        results["Invalid"] = invalid
+
+    return await UserIdParser.reply_results(message=message, results=results)
 
 
 @Client.on_message(
     filters.private & PyroFilters.admin() & filters.command("ban"),
 )
 @RateLimiter.hybrid_limiter(func_count=1)
-async def ban_user(client: Client, message: ConvoMessage) -> Message | None:  # noqa: ARG001
-    """Ban a user from using the bot
+async def ban_user(client: Client, message: ConvoMessage) -> Message:
+    """Ban users from using the bot, accepts user IDs, ranges and replied-to messages or text files of IDs.
 
     **Usage:**
-        /ban [user id]
+        /ban [user ids or ranges]
+
+        /ban 123 456 1000-1050
+
+        Reply to a message or a text file of user IDs with /ban
     """
-    user_id = None
+    return await set_banned(client=client, message=message, banned=True)
 
-    if len(message.command) >= 2:  # noqa: PLR2004
-        user_id = int(message.command[1]) if message.command[1].isdigit() else None
 
-    if user_id:
-        ban_user = await database.ban_user(user_id)
+@Client.on_message(
+    filters.private & PyroFilters.admin() & filters.command("unban"),
+)
+@RateLimiter.hybrid_limiter(func_count=1)
+async def unban_user(client: Client, message: ConvoMessage) -> Message:
+    """Unban users from using the bot, accepts user IDs, ranges and replied-to messages or text files of IDs.
 
-        if ban_user:
-            return await message.reply(text=f"User: `{user_id}` has been banned", quote=True)
-        return await message.reply(f"Cannot find: `{user_id}`", quote=True)
-    return await message.reply(text=f"Please input a valid user id: `{user_id}`", quote=True)
+    **Usage:**
+        /unban [user ids or ranges]
+
+        /unban 123 456 1000-1050
+
+        Reply to a message or a text file of user IDs with /unban
+    """
+    return await set_banned(client=client, message=message, banned=False)
 
 
 HelpCmd.set_help(
@@ -40,3 +86,9 @@ HelpCmd.set_help(
     allow_global=False,
     allow_non_admin=False,
 )
+HelpCmd.set_help(
+    command="unban",
+    description=unban_user.__doc__,
+    allow_global=False,
+    allow_non_admin=False,
+)
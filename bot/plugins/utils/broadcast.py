@@ -1,37 +1,75 @@
 import asyncio
+from array import array
 from typing import cast
 
 from pydantic import BaseModel
-from pyrogram import filters
+from pyrogram import filters, raw
 from pyrogram.client import Client
 from pyrogram.errors import FloodWait, InputUserDeactivated, PeerIdInvalid, UserIsBlocked, UserIsBot
 from pyrogram.types import Message
 
-from bot.database import MongoDB
+from bot.database import CODEX_SOURCE, USERS_SOURCE, get_storage
 from bot.utilities.helpers import RateLimiter
 from bot.utilities.pyrofilters import PyroFilters
 from bot.utilities.pyrotools import HelpCmd
 
-database = MongoDB()
+database = get_storage()
+
+# The peers resolve_peer returns for chat IDs, raw.base.InputPeer is a placeholder class for type checkers.
+InputPeer = raw.types.InputPeerUser | raw.types.InputPeerChat | raw.types.InputPeerChannel | raw.types.InputPeerSelf
 
 
 class BroadcastConfig(BaseModel):
-    user_ids: list[int]
-    user_ids_codex: list[int]
     pin: bool
+    batch_size: int = 1000
 
 
 class BroadcastHandler:
     """A handler class for broadcasting messages to multiple users."""
 
+    @staticmethod
+    async def forward_to_peer(
+        client: Client,
+        from_peer: InputPeer,
+        message_id: int,
+        peer: raw.types.InputPeerUser,
+        pin: bool,  # noqa: FBT001
+    ) -> None:
+        """
+        Copy a message to a peer built from a stored access hash, without resolving the peer first.
+
+        Parameters:
+            client (Client): The Pyrogram client instance.
+            from_peer (InputPeer): The peer of the chat holding the message.
+            message_id (int): The ID of the message to copy.
+            peer (raw.types.InputPeerUser): The peer to copy the message to.
+            pin (bool): Whether to pin the copied message.
+        """
+        to_peer = cast("raw.base.InputPeer", peer)
+        updates = await client.invoke(
+            raw.functions.messages.ForwardMessages(
+                from_peer=cast("raw.base.InputPeer", from_peer),
+                id=[message_id],
+                random_id=[client.rnd_id()],
+                to_peer=to_peer,
+                drop_author=True,
+            ),
+        )
+        if pin:
+            for update in getattr(updates, "updates", []):
+                if isinstance(update, raw.types.UpdateNewMessage) and isinstance(update.message, raw.types.Message):
+                    await client.invoke(raw.functions.messages.UpdatePinnedMessage(peer=to_peer, id=update.message.id))
+
     @staticmethod
     @RateLimiter.hybrid_limiter(func_count=1)
-    async def message_copy_wrapper(
-        client: Client,  # noqa: ARG004
+    async def message_copy_wrapper(  # noqa: PLR0913
+        client: Client,
         message: Message,
         chat_id: int,
         pin: bool,  # noqa: FBT001
-    ) -> Message | list[Message]:
+        from_peer: InputPeer | None = None,
+        access_hash: int = 0,
+    ) -> Message | list[Message] | None:
         """
         Copy a message to a specified chat ID, handling rate limits and optional pinning.
 
@@ -40,12 +78,19 @@ class BroadcastHandler:
             message (Message): The message object to be copied.
             chat_id (int): The ID of the chat to copy the message to.
             pin (bool): Whether to pin the copied message.
+            from_peer (InputPeer | None): The peer of the chat holding the replied-to message.
+            access_hash (int): The recipient's stored access hash, 0 to resolve the chat ID through the session.
 
         Returns:
-            Message | list[Message]: The copied message(s).
+            Message | list[Message] | None: The copied message(s), None when sent to a stored access hash.
         """
 
-        async def copy_and_pin() -> Message | list[Message]:
+        async def copy_and_pin() -> Message | list[Message] | None:
+            if access_hash and from_peer is not None:
+                peer = raw.types.InputPeerUser(user_id=chat_id, access_hash=access_hash)
+                await BroadcastHandler.forward_to_peer(client, from_peer, message.reply_to_message.id, peer, pin)
+                return None
+
             broadcast_message = await message.reply_to_message.copy(chat_id)
             if pin:
                 if isinstance(broadcast_message, list):
@@ -64,36 +109,55 @@ class BroadcastHandler:
     @classmethod
     async def broadcast_sender(cls, client: Client, message: Message, broadcast_config: BroadcastConfig) -> dict:
         """
-        Sends a message to multiple users and handles success and failure counts.
+        Sends a message to every user streamed from the database and handles success and failure counts.
+
+        Users with a stored access hash are sent to directly, so they are not mistaken for unreachable users when
+        the session has not seen them. Unreachable users are removed from the database every batch_size failures
+        to keep memory bounded.
 
         Parameters:
             client (Client): The Pyrogram client instance.
             message (Message): The message object to be broadcasted.
-            user_ids (list): List of user IDs to send the message to from teleshare.
-            user_ids_codex (list): List of user IDs to send the message to from CodeXbotz.
+            broadcast_config (BroadcastConfig): Pin and batching options.
 
         Returns:
             dict: Dictionary containing successful and unsuccessful message counts.
         """
-        successful, unsuccessful_ids, unsuccessful_ids_codex = 0, [], []
-        for user_id in list(set(broadcast_config.user_ids + broadcast_config.user_ids_codex)):
-            try:
-                # Required so rate limiter from message_copy_wrapper() can properly handle it.
-                message.chat.id = user_id
-                await cls.message_copy_wrapper(
-                    client=client,
-                    message=message,
-                    chat_id=user_id,
-                    pin=broadcast_config.pin,
+        successful, unsuccessful = 0, 0
+        unsuccessful_ids, unsuccessful_ids_codex = array("q"), array("q")
+        resolved_peer = await client.resolve_peer(message.reply_to_message.chat.id)
+        from_peer = resolved_peer if isinstance(resolved_peer, InputPeer) else None
+
+        async for batch in database.iter_user_ids(batch_size=broadcast_config.batch_size):
+            for user_id, source, access_hash in zip(batch.user_ids, batch.sources, batch.access_hashes, strict=True):
+                try:
+                    # Required so rate limiter from message_copy_wrapper() can properly handle it.
+                    message.chat.id = user_id
+                    await cls.message_copy_wrapper(
+                        client=client,
+                        message=message,
+                        chat_id=user_id,
+                        pin=broadcast_config.pin,
+                        from_peer=from_peer,
+                        access_hash=access_hash,
+                    )
+                    successful += 1
+                except (UserIsBlocked, InputUserDeactivated, PeerIdInvalid, UserIsBot):  # noqa: PERF203
+                    unsuccessful += 1
+                    if source & USERS_SOURCE:
+                        unsuccessful_ids.append(user_id)
+                    if source & CODEX_SOURCE:
+                        unsuccessful_ids_codex.append(user_id)
+
+            if len(unsuccessful_ids) + len(unsuccessful_ids_codex) >= broadcast_config.batch_size:
+                await database.cleanup_users(
+                    unsuccessful_ids=unsuccessful_ids,
+                    unsuccessful_ids_codex=unsuccessful_ids_codex,
                 )
-                successful += 1
-            except (UserIsBlocked, InputUserDeactivated, PeerIdInvalid, UserIsBot):  # noqa: PERF203
-                unsuccessful_ids.append(
-                    user_id,
-                ) if user_id in broadcast_config.user_ids else unsuccessful_ids_codex.append(user_id)
+                unsuccessful_ids, unsuccessful_ids_codex = array("q"), array("q")
 
         await database.cleanup_users(unsuccessful_ids=unsuccessful_ids, unsuccessful_ids_codex=unsuccessful_ids_codex)
-        return {"successful": successful, "unsuccessful": len(unsuccessful_ids + unsuccessful_ids_codex)}
+        return {"successful": successful, "unsuccessful": unsuccessful}
 
 
 @Client.on_message(
@@ -114,14 +178,12 @@ async def broadcast(client: Client, message: Message) -> Message:
 
     pin_arg = bool((message.command[1]).lower() == "pin") if message.command[1:] else False
 
-    user_ids, user_ids_codex = await database.get_user_ids()
-
     notice_message = await message.reply(text="Currently broadcasting... This may take a while.", quote=True)
 
     result = await BroadcastHandler.broadcast_sender(
         client=client,
         message=message,
-        broadcast_config=BroadcastConfig(user_ids=user_ids, user_ids_codex=user_ids_codex, pin=pin_arg),
+        broadcast_config=BroadcastConfig(pin=pin_arg),
     )
 
     successful = result["successful"]
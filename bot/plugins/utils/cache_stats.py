@@ -0,0 +1,39 @@
+from pyrogram import filters
+from pyrogram.client import Client
+from pyrogram.types import Message
+
+from bot.utilities.helpers import MemoryCache, RateLimiter
+from bot.utilities.pyrofilters import PyroFilters
+from bot.utilities.pyrotools import HelpCmd
+
+
+@Client.on_message(
+    filters.private & PyroFilters.admin() & filters.command("cache_stats"),
+)
+@RateLimiter.hybrid_limiter(func_count=1)
+async def cache_stats(_: Client, message: Message) -> Message:
+    """A command to display the size, hit ratio and evictions of every cache.:
+
+    **Usage:**
+        /cache_stats
+    """
+
+    lines = []
+    for cache in MemoryCache.instances.values():
+        stats = cache.stats()
+        lines.append(
+            f"**{stats.name}:** `{stats.size}/{stats.max_size or '∞'}` entries, "
+            f"`{stats.hit_ratio:.1%}` hits of `{stats.hits + stats.misses}`, "
+            f"`{stats.evictions}` evicted, `{stats.expirations}` expired"
+            + (f", `{stats.memory_usage / 1024 / 1024:.1f}` MiB" if stats.memory_usage else ""),
+        )
+
+    return await message.reply(">CACHE STATS:\n" + "\n".join(lines))
+
+
+HelpCmd.set_help(
+    command="cache_stats",
+    description=cache_stats.__doc__,
+    allow_global=False,
+    allow_non_admin=False,
+)
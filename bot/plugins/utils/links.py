@@ -0,0 +1,135 @@
+from inspect import cleandoc
+
+from pyrogram import filters
+from pyrogram.client import Client
+from pyrogram.types import Message
+
+from bot.database import get_storage
+from bot.utilities.helpers import InvalidLinkCursorError, LinkCursor, RateLimiter, SearchText
+from bot.utilities.pyrofilters import PyroFilters
+from bot.utilities.pyrotools import HelpCmd
+
+database = get_storage()
+
+PAGE_SIZE = 20
+PREVIEW_LENGTH = 60
+
+
+def parse_cursor(args: list[str]) -> tuple[LinkCursor | None, list[str]]:
+    """
+    Takes the '+cursor' argument of the next page command out of the arguments.
+
+    Parameters:
+        args (list[str]): The command arguments.
+
+    Returns:
+        tuple[LinkCursor | None, list[str]]: The cursor, or None for the first page, and the remaining arguments.
+
+    Raises:
+        InvalidLinkCursorError: If a '+' argument is not a cursor.
+    """
+    if args and args[0].startswith("+"):
+        return LinkCursor.decode(args[0][1:]), args[1:]
+    return None, args
+
+
+async def reply_page(
+    client: Client,
+    message: Message,
+    documents: list[dict],
+    command: str,
+    query: str = "",
+) -> Message:
+    """
+    Replies with a page of links and the command that lists the next page.
+
+    Parameters:
+        client (Client): The Pyrogram client instance.
+        message (Message): The command message.
+        documents (list[dict]): The links returned by StorageBackend.find_links.
+        command (str): The command that lists the links.
+        query (str): The search query repeated in the next page command.
+
+    Returns:
+        Message: The replied message.
+    """
+    if not documents:
+        return await message.reply(text="No links found.", quote=True)
+
+    lines = []
+    for document in documents:
+        link = f"https://t.me/{client.me.username}?start={document['_id']}"  # type: ignore[reportOptionalMemberAccess]
+        created = document["created_at"].strftime("%Y-%m-%d %H:%M")
+        preview = document["search_text"][:PREVIEW_LENGTH]
+        lines.append(f"• {link}\n`{created}` by `{document['created_by']}` {preview}")
+
+    text = "\n".join(lines)
+    if len(documents) >= PAGE_SIZE:
+        cursor = LinkCursor.from_document(documents[-1]).encode()
+        text += f"\n\n**Next page:** `{' '.join(filter(None, [command, f'+{cursor}', query]))}`"
+    return await message.reply(text=text, quote=True, disable_web_page_preview=True)
+
+
+@Client.on_message(
+    filters.private & PyroFilters.admin() & filters.command("links"),
+)
+@RateLimiter.hybrid_limiter(func_count=1)
+async def links(client: Client, message: Message) -> Message:
+    """List the stored links, newest first.
+
+    **Usage:**
+        /links: the newest links.
+        /links +[cursor]: the next page, sent below each page.
+    """
+    try:
+        after, args = parse_cursor(message.command[1:])
+    except InvalidLinkCursorError:
+        after, args = None, message.command
+    if args:
+        return await message.reply(text=cleandoc(links.__doc__ or ""), quote=True)
+
+    documents = await database.find_links(limit=PAGE_SIZE, after=after)
+    return await reply_page(client=client, message=message, documents=documents, command="/links")
+
+
+@Client.on_message(
+    filters.private & PyroFilters.admin() & filters.command("search"),
+)
+@RateLimiter.hybrid_limiter(func_count=1)
+async def search(client: Client, message: Message) -> Message:
+    """Search the stored links by caption and file name, newest first.
+
+    **Usage:**
+        /search [words]: the newest links whose captions or file names contain every word.
+        /search +[cursor] [words]: the next page, sent below each page.
+    """
+    try:
+        after, args = parse_cursor(message.command[1:])
+    except InvalidLinkCursorError:
+        after, args = None, []
+    terms = SearchText.terms(" ".join(args))
+    if not terms:
+        return await message.reply(text=cleandoc(search.__doc__ or ""), quote=True)
+
+    documents = await database.find_links(limit=PAGE_SIZE, after=after, terms=terms)
+    return await reply_page(
+        client=client,
+        message=message,
+        documents=documents,
+        command="/search",
+        query=" ".join(terms),
+    )
+
+
+HelpCmd.set_help(
+    command="links",
+    description=links.__doc__,
+    allow_global=False,
+    allow_non_admin=False,
+)
+HelpCmd.set_help(
+    command="search",
+    description=search.__doc__,
+    allow_global=False,
+    allow_non_admin=False,
+)
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from inspect import cleandoc
+from io import BytesIO
+
+from pyrogram import filters
+from pyrogram.client import Client
+from pyrogram.types import Message
+
+from bot.database import get_storage
+from bot.utilities.helpers import RateLimiter
+from bot.utilities.pyrofilters import PyroFilters
+from bot.utilities.pyrotools import HelpCmd, OrphanCollector, OrphanReport
+
+database = get_storage()
+logger = logging.getLogger(__name__)
+background_tasks: set[asyncio.Task] = set()
+
+
+async def reply_report(message: Message, report: OrphanReport) -> Message:
+    """
+    Replies with an orphan collection report, the orphan IDs are sent as a text file.
+
+    Parameters:
+        message (Message): The command message.
+        report (OrphanReport): The report to send.
+
+    Returns:
+        Message: The replied message.
+    """
+    action = "Deleted" if report.deleted else "Found"
+    text = (
+        f">**Orphaned Backup Messages:**\n"
+        f"Scanned: `{report.scanned}` messages from `{report.start_id}` to `{report.last_id}`\n"
+        f"{action}: `{len(report.orphans)}` orphans"
+    )
+    if not report.orphans:
+        return await message.reply(text=text, quote=True)
+
+    document = BytesIO("\n".join(map(str, report.orphans)).encode())
+    document.name = "orphans.txt"
+    return await message.reply_document(document=document, caption=text, quote=True)
+
+
+async def run_collector(client: Client, message: Message, delete: bool, start_id: int | None) -> None:  # noqa: FBT001
+    try:
+        report = await OrphanCollector(client=client, database=database).collect(delete=delete, start_id=start_id)
+    except Exception as e:
+        logger.exception("Orphan collection failed")
+        await message.reply(text=f"Orphan collection failed: `{e!r}`", quote=True)
+        return
+    await reply_report(message=message, report=report)
+
+
+@Client.on_message(
+    filters.private & PyroFilters.admin() & filters.command("orphans"),
+)
+@RateLimiter.hybrid_limiter(func_count=1)
+async def orphans(client: Client, message: Message) -> Message:
+    """Find backup channel messages that no link refers to.
+
+    **Usage:**
+        /orphans: report the orphaned messages.
+        /orphans delete: delete the orphaned messages.
+        /orphans [delete] [start id]: start from a message ID instead of where the last run stopped.
+
+    >Messages used by CodeXbotz links are not stored in the database, a start ID after them is required to
+    delete while CodeXbotz users exist.
+    """
+    args = message.command[1:]
+    delete = "delete" in args
+    start_ids = [int(i) for i in args if i.isdigit()]
+
+    if OrphanCollector.lock.locked():
+        return await message.reply(text="Orphan collection is already running.", quote=True)
+    if any(i != "delete" and not i.isdigit() for i in args):
+        return await message.reply(text=cleandoc(orphans.__doc__ or ""), quote=True)
+    if delete and not start_ids and await database.has_codex_users():
+        return await message.reply(
+            text="CodeXbotz links may use any backup message, use `/orphans delete [start id]` with the first "
+            "message ID after them.",
+            quote=True,
+        )
+
+    task = asyncio.create_task(
+        run_collector(client=client, message=message, delete=delete, start_id=start_ids[0] if start_ids else None),
+    )
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+    return await message.reply(text="Scanning the backup channel... This may take a while.", quote=True)
+
+
+HelpCmd.set_help(
+    command="orphans",
+    description=orphans.__doc__,
+    allow_global=False,
+    allow_non_admin=False,
+)
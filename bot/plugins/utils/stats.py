@@ -2,12 +2,12 @@ from pyrogram import filters
 from pyrogram.client import Client
 from pyrogram.types import Message
 
-from bot.database import MongoDB
+from bot.database import get_storage
 from bot.utilities.helpers import RateLimiter
 from bot.utilities.pyrofilters import PyroFilters
 from bot.utilities.pyrotools import HelpCmd
 
-database = MongoDB()
+database = get_storage()
 
 
 @Client.on_message(
@@ -15,15 +15,18 @@ database = MongoDB()
 )
 @RateLimiter.hybrid_limiter(func_count=1)
 async def stats(_: Client, message: Message) -> Message:
-    """A command to display links and users count.:
+    """A command to display links and users count and their growth rates.:
 
     **Usage:**
         /stats
     """
 
-    link_count, users_count = await database.stats()
+    bot_stats = await database.stats()
 
-    return await message.reply(f">STATS:\n**Users Count:** `{users_count}`\n**Links Count:** `{link_count}`")
+    return await message.reply(
+        f">STATS:\n**Users Count:** `{bot_stats.users_count}`\n**Links Count:** `{bot_stats.links_count}`\n"
+        f"**New Users/Hour:** `{bot_stats.users_per_hour:.1f}`\n**New Links/Day:** `{bot_stats.links_per_day:.1f}`",
+    )
 
 
 HelpCmd.set_help(
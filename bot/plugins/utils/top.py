@@ -0,0 +1,49 @@
+from inspect import cleandoc
+
+from pyrogram import filters
+from pyrogram.client import Client
+from pyrogram.types import Message
+
+from bot.database import link_access_counter
+from bot.utilities.helpers import RateLimiter
+from bot.utilities.pyrofilters import PyroFilters
+from bot.utilities.pyrotools import HelpCmd
+
+
+@Client.on_message(
+    filters.private & PyroFilters.admin() & filters.command("top"),
+)
+@RateLimiter.hybrid_limiter(func_count=1)
+async def top(client: Client, message: Message) -> Message:
+    """List the most accessed links.
+
+    **Usage:**
+        /top: the 10 most accessed links of the last 7 days.
+        /top [days] [limit]: the limit most accessed links of the last days.
+    """
+    args = message.command[1:]
+    if len(args) > 2 or not all(i.isdigit() and int(i) > 0 for i in args):  # noqa: PLR2004
+        return await message.reply(text=cleandoc(top.__doc__ or ""), quote=True)
+
+    days, limit = [int(i) for i in args] + [7, 10][len(args) :]
+    top_links = await link_access_counter.top_links(days=days, limit=limit)
+    if not top_links:
+        return await message.reply(text=f"No link was accessed in the last {days} days.", quote=True)
+
+    lines = [
+        f"{i}. `{count}` - https://t.me/{client.me.username}?start={link}"  # type: ignore[reportOptionalMemberAccess]
+        for i, (link, count) in enumerate(top_links, start=1)
+    ]
+    return await message.reply(
+        text=f">**Top Links, Last {days} Days:**\n" + "\n".join(lines),
+        quote=True,
+        disable_web_page_preview=True,
+    )
+
+
+HelpCmd.set_help(
+    command="top",
+    description=top.__doc__,
+    allow_global=False,
+    allow_non_admin=False,
+)
@@ -0,0 +1,13 @@
+from .transfer import (
+    DEFAULT_COLLECTIONS,
+    CollectionExporter,
+    CollectionImporter,
+    ZstandardMissingError,
+)
+
+__all__ = [
+    "DEFAULT_COLLECTIONS",
+    "CollectionExporter",
+    "CollectionImporter",
+    "ZstandardMissingError",
+]
@@ -0,0 +1,69 @@
+"""
+Moves the bot's collections between MongoDB deployments.
+
+    python -m bot.tools export backup/ --zstd
+    python -m bot.tools import backup/ --concurrency 8
+
+Both commands connect with MONGO_DB_URL and MONGO_DB_NAME unless --database is given.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+from bot.database import MongoDB, database_registry
+
+from .transfer import DEFAULT_COLLECTIONS, CollectionExporter, CollectionImporter, ZstandardMissingError
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m bot.tools", description="Export or import the bot's collections.")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("directory", type=Path, help="the directory holding the NDJSON files and the manifest")
+    parser.add_argument("--database", help="the database name, defaults to MONGO_DB_NAME")
+    parser.add_argument(
+        "--collections",
+        nargs="+",
+        default=list(DEFAULT_COLLECTIONS),
+        help=f"the collections to move, defaults to {' '.join(DEFAULT_COLLECTIONS)}",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000, help="documents per batch, defaults to 1000")
+    parser.add_argument("--concurrency", type=int, default=4, help="import bulk writes in flight, defaults to 4")
+    parser.add_argument("--zstd", action="store_true", help="zstd-compress the exported files")
+    parser.add_argument("--restart", action="store_true", help="ignore the progress of an interrupted run")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    database = MongoDB(name=args.database)
+
+    try:
+        if args.command == "export":
+            exporter = CollectionExporter(
+                db=database.db,
+                directory=args.directory,
+                compress=args.zstd,
+                batch_size=args.batch_size,
+            )
+            await exporter.export_collections(args.collections, restart=args.restart)
+        else:
+            importer = CollectionImporter(
+                db=database.db,
+                directory=args.directory,
+                batch_size=args.batch_size,
+                concurrency=args.concurrency,
+            )
+            await importer.import_collections(args.collections, restart=args.restart)
+            await database.ensure_indexes()
+            await database.reconcile_counters()
+    except ZstandardMissingError as e:
+        sys.exit(str(e))
+    finally:
+        database_registry.close()
+
+
+logging.basicConfig(level="INFO", format="%(asctime)s %(levelname)s %(message)s")
+asyncio.run(main())
@@ -0,0 +1,314 @@
+import asyncio
+import io
+import json
+import logging
+import os
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import IO, Any
+
+from bson import json_util
+from bson.json_util import RELAXED_JSON_OPTIONS
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne
+
+try:
+    import zstandard  # type: ignore[reportMissingImports]
+except ImportError:
+    zstandard = None
+
+# FileChunks holds the files of chunked links and FileRegistry the references that keep shared backup
+# messages alive, both are moved with the links.
+DEFAULT_COLLECTIONS = ("Files", "FileChunks", "FileRegistry", "Users", "BotSettings")
+MANIFEST_NAME = "manifest.json"
+
+
+class ZstandardMissingError(Exception):
+    """
+    Raised when a compressed export is written or read without the zstandard package installed.
+    """
+
+    def __init__(self) -> None:
+        super().__init__("Compressed exports need the zstandard package: pip install zstandard")
+
+
+def export_path(directory: Path, collection: str, compress: bool) -> Path:  # noqa: FBT001
+    """
+    Returns the export file of a collection.
+
+    Parameters:
+        directory (Path): The export directory.
+        collection (str): The collection name.
+        compress (bool): Whether the file is zstd-compressed.
+
+    Returns:
+        Path: '<collection>.ndjson', or '<collection>.ndjson.zst' if compressed.
+    """
+    return directory / (f"{collection}.ndjson.zst" if compress else f"{collection}.ndjson")
+
+
+class CollectionExporter:
+    """
+    Streams collections in _id order to NDJSON files, one relaxed Extended JSON document per line.
+
+    Every batch is appended as a whole, as its own zstd frame if compressed, then the file offset and
+    last _id are saved to the directory's manifest. An interrupted export truncates the file back to the
+    saved offset and resumes after the saved _id, so memory use stays at one batch.
+
+    Parameters:
+        db (AsyncIOMotorDatabase): The source database.
+        directory (Path): The export directory, created if missing.
+        compress (bool): Whether to zstd-compress the files.
+        batch_size (int): The amount of documents per batch.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, db: AsyncIOMotorDatabase, directory: Path, compress: bool, batch_size: int = 1000) -> None:  # noqa: FBT001
+        if compress and zstandard is None:
+            raise ZstandardMissingError
+        self.db = db
+        self.directory = directory
+        self.compress = compress
+        self.batch_size = batch_size
+        self.manifest_path = directory / MANIFEST_NAME
+
+    def load_manifest(self) -> dict[str, dict[str, Any]]:
+        """
+        Reads the export progress of every collection.
+
+        Returns:
+            dict[str, dict[str, Any]]: The 'offset', 'last_id', 'count' and 'done' state of each collection.
+        """
+        if not self.manifest_path.exists():
+            return {}
+        return json.loads(self.manifest_path.read_text())
+
+    def save_manifest(self, manifest: dict[str, dict[str, Any]]) -> None:
+        """
+        Atomically replaces the manifest.
+
+        Parameters:
+            manifest (dict[str, dict[str, Any]]): The export progress of every collection.
+        """
+        temporary_path = self.manifest_path.with_suffix(".tmp")
+        temporary_path.write_text(json.dumps(manifest, indent=2))
+        temporary_path.replace(self.manifest_path)
+
+    def _write_batch(self, file: IO[bytes], documents: list[dict]) -> None:
+        data = "".join(json_util.dumps(i, json_options=RELAXED_JSON_OPTIONS) + "\n" for i in documents).encode()
+        if self.compress:
+            data = zstandard.ZstdCompressor().compress(data)  # type: ignore[reportOptionalMemberAccess]
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+
+    async def export_collection(self, collection: str, manifest: dict[str, dict[str, Any]]) -> int:
+        """
+        Exports one collection, resuming from its manifest entry.
+
+        Parameters:
+            collection (str): The collection name.
+            manifest (dict[str, dict[str, Any]]): The export progress, updated and saved after every batch.
+
+        Returns:
+            int: The amount of documents in the export file.
+        """
+        state = manifest.setdefault(collection, {"offset": 0, "count": 0, "done": False})
+        if state["done"]:
+            return state["count"]
+
+        query = {"_id": {"$gt": json_util.loads(state["last_id"])}} if "last_id" in state else {}
+        path = export_path(self.directory, collection, self.compress)
+        with path.open("r+b" if path.exists() else "wb") as file:
+            file.truncate(state["offset"])
+            file.seek(state["offset"])
+
+            documents = []
+            cursor = self.db[collection].find(query, sort=[("_id", 1)], batch_size=self.batch_size)
+            async for document in cursor:
+                documents.append(document)
+                if len(documents) < self.batch_size:
+                    continue
+
+                self._write_batch(file, documents)
+                state.update(
+                    offset=file.tell(),
+                    last_id=json_util.dumps(documents[-1]["_id"]),
+                    count=state["count"] + len(documents),
+                )
+                self.save_manifest(manifest)
+                documents = []
+
+            if documents:
+                self._write_batch(file, documents)
+            state.update(offset=file.tell(), count=state["count"] + len(documents), done=True)
+            self.save_manifest(manifest)
+
+        self.logger.info("Exported %d %s documents to %s", state["count"], collection, path)
+        return state["count"]
+
+    async def export_collections(self, collections: Sequence[str], restart: bool = False) -> None:  # noqa: FBT001, FBT002
+        """
+        Exports collections one after another.
+
+        Parameters:
+            collections (Sequence[str]): The collection names.
+            restart (bool): Whether to discard the progress of a previous export.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest = {} if restart else self.load_manifest()
+        for collection in collections:
+            await self.export_collection(collection, manifest)
+
+
+class CollectionImporter:
+    """
+    Upserts the documents of export files with unordered bulk writes, keeping up to concurrency batches
+    in flight.
+
+    Documents replace the ones with the same _id, so importing twice is harmless. The amount of lines
+    imported without a gap is saved in the target's 'Migrations' collection after every batch, and an
+    interrupted import of the same file skips them.
+
+    Parameters:
+        db (AsyncIOMotorDatabase): The target database.
+        directory (Path): The export directory.
+        batch_size (int): The amount of documents per bulk write.
+        concurrency (int): The maximum amount of bulk writes in flight.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, db: AsyncIOMotorDatabase, directory: Path, batch_size: int = 1000, concurrency: int = 4) -> None:
+        self.db = db
+        self.directory = directory
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+
+    @staticmethod
+    def read_lines(path: Path) -> Iterator[bytes]:
+        """
+        Reads an export file line by line, decompressing zstd files across frames.
+
+        Parameters:
+            path (Path): The export file.
+
+        Yields:
+            bytes: Each line, including blank ones.
+
+        Raises:
+            ZstandardMissingError: If the file is compressed and zstandard is not installed.
+        """
+        if path.suffix != ".zst":
+            with path.open("rb") as file:
+                yield from file
+            return
+
+        if zstandard is None:
+            raise ZstandardMissingError
+        with (
+            path.open("rb") as file,
+            zstandard.ZstdDecompressor().stream_reader(file, read_across_frames=True) as reader,
+        ):
+            yield from io.BufferedReader(reader)
+
+    def read_batches(self, path: Path, skip: int) -> Iterator[tuple[int, int, list[dict]]]:
+        """
+        Reads the documents of an export file batch_size documents at a time.
+
+        Parameters:
+            path (Path): The export file.
+            skip (int): The amount of leading lines already imported.
+
+        Yields:
+            tuple[int, int, list[dict]]: The start and end line of a batch, counted from 0 and exclusive,
+                and its documents.
+        """
+        documents, start, end = [], skip, skip
+        for end, line in enumerate(self.read_lines(path), start=1):
+            if end <= skip:
+                continue
+            if line.strip():
+                documents.append(json_util.loads(line))
+            if len(documents) >= self.batch_size:
+                yield start, end, documents
+                documents, start = [], end
+
+        if documents:
+            yield start, end, documents
+
+    async def import_collection(self, collection: str, path: Path, restart: bool = False) -> int:  # noqa: FBT001, FBT002
+        """
+        Imports one export file, resuming after the lines a previous import of the same file wrote.
+
+        Parameters:
+            collection (str): The target collection name.
+            path (Path): The export file.
+            restart (bool): Whether to discard the progress of a previous import.
+
+        Returns:
+            int: The amount of lines imported.
+        """
+        progress = self.db["Migrations"]
+        progress_id = f"import:{collection}"
+        source = {"source": path.name, "size": path.stat().st_size}
+        state = await progress.find_one({"_id": progress_id}) or {}
+        if restart or any(state.get(key) != value for key, value in source.items()):
+            state = {}
+        if state.get("done"):
+            return state["lines"]
+
+        imported = state.get("lines", 0)
+        finished: dict[int, int] = {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks: set[asyncio.Task] = set()
+
+        async def write(start: int, end: int, documents: list[dict]) -> None:
+            nonlocal imported
+            try:
+                await self.db[collection].bulk_write(
+                    [ReplaceOne({"_id": i["_id"]}, i, upsert=True) for i in documents],
+                    ordered=False,
+                )
+            finally:
+                semaphore.release()
+
+            # Only the lines before the first unfinished batch count as imported.
+            finished[start] = end
+            while imported in finished:
+                imported = finished.pop(imported)
+            await progress.update_one({"_id": progress_id}, {"$set": {**source, "lines": imported}}, upsert=True)
+
+        for start, end, documents in self.read_batches(path, skip=imported):
+            # Surface the error of a failed batch before queuing more.
+            for task in [i for i in tasks if i.done()]:
+                tasks.discard(task)
+                task.result()
+            await semaphore.acquire()
+            tasks.add(asyncio.create_task(write(start, end, documents)))
+        await asyncio.gather(*tasks)
+
+        await progress.update_one(
+            {"_id": progress_id},
+            {"$set": {**source, "lines": imported, "done": True}},
+            upsert=True,
+        )
+        self.logger.info("Imported %d %s lines from %s", imported, collection, path)
+        return imported
+
+    async def import_collections(self, collections: Sequence[str], restart: bool = False) -> None:  # noqa: FBT001, FBT002
+        """
+        Imports the export file of each collection found in the directory.
+
+        Parameters:
+            collections (Sequence[str]): The collection names.
+            restart (bool): Whether to discard the progress of a previous import.
+        """
+        for collection in collections:
+            paths = [export_path(self.directory, collection, compress) for compress in (True, False)]
+            path = next((i for i in paths if i.exists()), None)
+            if path is None:
+                self.logger.warning("No export file for %s in %s", collection, self.directory)
+                continue
+            await self.import_collection(collection, path, restart=restart)
@@ -1,11 +1,28 @@
+from .bitmap import MessageIdBitmap
+from .bloom import CountingBloomFilter
+from .cache import CacheStats, MemoryCache
 from .data_encoding import DataEncoder, DataValidationError
+from .expiry import ExpiryParser
+from .link_search import InvalidLinkCursorError, LinkCursor, SearchText
 from .pyrohelper import NoInviteLinkError, PyroHelper
 from .rate_limiter import RateLimiter
+from .user_ids import ParsedUserIds, TooManyUserIdsError, UserIdParser
 
 __all__ = [
+    "CacheStats",
+    "CountingBloomFilter",
     "DataEncoder",
     "DataValidationError",
+    "ExpiryParser",
+    "InvalidLinkCursorError",
+    "LinkCursor",
+    "MemoryCache",
+    "MessageIdBitmap",
     "NoInviteLinkError",
+    "ParsedUserIds",
     "PyroHelper",
     "RateLimiter",
+    "SearchText",
+    "TooManyUserIdsError",
+    "UserIdParser",
 ]
@@ -0,0 +1,60 @@
+import hashlib
+import math
+
+
+class CountingBloomFilter:
+    """
+    A Bloom filter with a one byte counter per slot instead of a bit, so keys can also be removed.
+
+    A key that was added is always reported present, a key that was never added is reported present with
+    a probability of about error_rate. A million keys at a 1% error rate take about 9.6 MB. Counters stop
+    at 255 and are never decremented from there, which only keeps some removed keys present.
+
+    Parameters:
+        capacity (int): The amount of keys the filter is sized for.
+        error_rate (float): The false positive rate at capacity.
+    """
+
+    __slots__ = ("_counters", "hash_count", "size")
+
+    MAX_COUNT = 255
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        capacity = max(capacity, 1)
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(round(self.size / capacity * math.log(2)), 1)
+        self._counters = bytearray(self.size)
+
+    def _positions(self, key: str) -> list[int]:
+        # Double hashing: two 64-bit halves of one digest derive every position.
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, key: str) -> None:
+        """
+        Adds a key.
+
+        Parameters:
+            key (str): The key.
+        """
+        for position in self._positions(key):
+            if self._counters[position] < self.MAX_COUNT:
+                self._counters[position] += 1
+
+    def discard(self, key: str) -> None:
+        """
+        Removes a key that was added, keys reported absent are ignored.
+
+        Parameters:
+            key (str): The key.
+        """
+        positions = self._positions(key)
+        if not all(self._counters[i] for i in positions):
+            return
+        for position in positions:
+            if self._counters[position] < self.MAX_COUNT:
+                self._counters[position] -= 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._counters[i] for i in self._positions(key))
@@ -0,0 +1,234 @@
+import sys
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, ClassVar, NamedTuple
+
+from bot.config import config
+
+_MISSING = object()
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    expires_at: float
+    size: int
+
+
+class CacheStats(NamedTuple):
+    """
+    A snapshot of a cache's counters.
+
+    Parameters:
+        name (str): The cache name.
+        size (int): The amount of entries.
+        max_size (int): The maximum amount of entries, 0 for unbounded.
+        memory_usage (int): The approximate memory used in bytes, 0 if there is no memory budget.
+        hits (int): Lookups that found a live entry.
+        misses (int): Lookups that found nothing or an expired entry.
+        evictions (int): Entries dropped to stay within max_size or max_memory.
+        expirations (int): Entries dropped because their TTL passed.
+    """
+
+    name: str
+    size: int
+    max_size: int
+    memory_usage: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+
+class MemoryCache:
+    """
+    An in-process LRU cache with an optional time-to-live and memory budget.
+
+    Every cache is registered by name and its limits can be overridden per name through config.CACHES,
+    e.g. CACHES='{"links": {"max_size": 50000, "ttl": 3600}}'.
+
+    Parameters:
+        name (str): The cache name used for configuration and metrics.
+        max_size (int): The default maximum amount of entries, 0 for unbounded.
+        ttl (float): The default seconds before an entry expires, 0 to never expire.
+        max_memory (int): The default approximate memory budget in bytes, 0 for unbounded.
+        sizeof (Callable[[Any], int] | None): Returns the size of a value in bytes. Defaults to sys.getsizeof.
+
+    Attributes:
+        instances (ClassVar[dict[str, MemoryCache]]): Every created cache by name.
+    """
+
+    instances: ClassVar[dict[str, "MemoryCache"]] = {}
+
+    def __init__(
+        self,
+        name: str,
+        max_size: int,
+        ttl: float = 0,
+        max_memory: int = 0,
+        sizeof: Callable[[Any], int] | None = None,
+    ) -> None:
+        overrides = config.CACHES.get(name, {})
+
+        self.name = name
+        self.max_size = overrides.get("max_size", max_size)
+        self.ttl = overrides.get("ttl", ttl)
+        self.max_memory = overrides.get("max_memory", max_memory)
+        self.sizeof = sizeof or sys.getsizeof
+        self.memory_usage = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._data: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+
+        MemoryCache.instances[name] = self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __getitem__(self, key: Hashable) -> Any:  # noqa: ANN401
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:  # noqa: ANN401
+        self.set(key, value)
+
+    def __delitem__(self, key: Hashable) -> None:
+        if self.pop(key, _MISSING) is _MISSING:
+            raise KeyError(key)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:  # noqa: ANN401
+        """
+        Returns a cached value and marks it as recently used.
+
+        Parameters:
+            key (Hashable): The cache key.
+            default (Any): Returned if the key is missing or expired.
+
+        Returns:
+            Any: The cached value or default.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        if entry.expires_at and entry.expires_at <= time.monotonic():
+            self.pop(key)
+            self.misses += 1
+            self.expirations += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: Hashable, value: Any) -> None:  # noqa: ANN401
+        """
+        Stores a value, evicting the least recently used entries when over budget.
+
+        Parameters:
+            key (Hashable): The cache key.
+            value (Any): The value to store.
+        """
+        size = self.sizeof(value) if self.max_memory else 0
+        if self.max_memory and size > self.max_memory:
+            self.pop(key)
+            return
+
+        self.pop(key)
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0
+        self._data[key] = CacheEntry(value=value, expires_at=expires_at, size=size)
+        self.memory_usage += size
+
+        while (self.max_size and len(self._data) > self.max_size) or (
+            self.max_memory and self.memory_usage > self.max_memory
+        ):
+            _, evicted = self._data.popitem(last=False)
+            self.memory_usage -= evicted.size
+            self.evictions += 1
+
+    def setdefault(self, key: Hashable, default: Any) -> Any:  # noqa: ANN401
+        """
+        Returns a cached value, storing and returning default if the key is missing or expired.
+
+        Parameters:
+            key (Hashable): The cache key.
+            default (Any): The value to store if the key is missing.
+
+        Returns:
+            Any: The cached value.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            self.set(key, default)
+            return default
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:  # noqa: ANN401
+        """
+        Removes a key from the cache.
+
+        Parameters:
+            key (Hashable): The cache key.
+            default (Any): Returned if the key is missing.
+
+        Returns:
+            Any: The removed value or default.
+        """
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+
+        self.memory_usage -= entry.size
+        return entry.value
+
+    def items(self) -> list[tuple[Hashable, Any]]:
+        """
+        Returns a copy of every live entry, from least to most recently used.
+
+        Returns:
+            list[tuple[Hashable, Any]]: The keys and values.
+        """
+        now = time.monotonic()
+        return [
+            (key, entry.value)
+            for key, entry in list(self._data.items())
+            if not entry.expires_at or entry.expires_at > now
+        ]
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache.
+        """
+        self._data.clear()
+        self.memory_usage = 0
+
+    def stats(self) -> CacheStats:
+        """
+        Returns the cache's size and hit, miss and eviction counters.
+
+        Returns:
+            CacheStats: The cache statistics.
+        """
+        return CacheStats(
+            name=self.name,
+            size=len(self._data),
+            max_size=self.max_size,
+            memory_usage=self.memory_usage,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            expirations=self.expirations,
+        )
@@ -1,8 +1,19 @@
 import base64
 import binascii
+import datetime
 import json
+import secrets
+import string
+import time
 from json.decoder import JSONDecodeError
-from typing import Any
+from typing import Any, ClassVar
+
+from pyrogram.file_id import FileId, FileType
+
+BASE62_ALPHABET = string.digits + string.ascii_uppercase + string.ascii_lowercase
+LINK_ID_EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+LINK_ID_RANDOM_BITS = 22
+LINK_ID_LENGTH = 11
 
 
 class DataValidationError(Exception):
@@ -17,8 +28,94 @@ class DataValidationError(Exception):
 class DataEncoder:
     """
     A class providing methods for encoding and decoding data or file links using JSON and Base64.
+
+    New links use short time-ordered IDs from generate_link_id, links made with encode_data keep resolving.
+
+    Attributes:
+        _last_link_id (ClassVar[int]): The last generated link ID, keeps IDs of the same millisecond unique.
     """
 
+    _last_link_id: ClassVar[int] = 0
+
+    @staticmethod
+    def encode_base62(number: int, width: int = LINK_ID_LENGTH) -> str:
+        """
+        Encode a non-negative integer to a fixed width Base62 string that sorts like the integer.
+
+        Parameters:
+            number (int): The integer to encode.
+            width (int): The minimum length, padded with '0'.
+
+        Returns:
+            str: The Base62 string.
+        """
+        digits = []
+        while number:
+            number, remainder = divmod(number, 62)
+            digits.append(BASE62_ALPHABET[remainder])
+        return "".join(reversed(digits)).rjust(width, "0")
+
+    @staticmethod
+    def decode_base62(base62_string: str) -> int:
+        """
+        Decode a Base62 string back to an integer.
+
+        Parameters:
+            base62_string (str): The Base62 string.
+
+        Returns:
+            int: The decoded integer.
+
+        Raises:
+            DataValidationError: If the string contains non Base62 characters.
+        """
+        number = 0
+        for char in base62_string:
+            digit = BASE62_ALPHABET.find(char)
+            if digit == -1:
+                raise DataValidationError(base62_string)
+            number = number * 62 + digit
+        return number
+
+    @classmethod
+    def generate_link_id(cls) -> str:
+        """
+        Generate a short, URL-safe link ID that sorts by creation time.
+
+        The ID is a 64-bit value of the milliseconds since 2024 followed by 22 random bits, encoded as
+        11 Base62 characters. IDs generated in the same millisecond increment the random bits instead.
+
+        Returns:
+            str: The link ID.
+        """
+        timestamp = int(time.time() * 1000) - LINK_ID_EPOCH_MS
+        link_id = (timestamp << LINK_ID_RANDOM_BITS) | secrets.randbits(LINK_ID_RANDOM_BITS)
+        if link_id >> LINK_ID_RANDOM_BITS <= cls._last_link_id >> LINK_ID_RANDOM_BITS:
+            link_id = cls._last_link_id + 1
+
+        cls._last_link_id = link_id
+        return cls.encode_base62(link_id)
+
+    @classmethod
+    def decode_link_id(cls, link_id: str) -> datetime.datetime:
+        """
+        Decode the creation time of a link ID made by generate_link_id.
+
+        Parameters:
+            link_id (str): The link ID.
+
+        Returns:
+            datetime.datetime: The UTC time the link ID was generated.
+
+        Raises:
+            DataValidationError: If the link ID is not a generated link ID.
+        """
+        if len(link_id) != LINK_ID_LENGTH:
+            raise DataValidationError(link_id)
+
+        timestamp = (cls.decode_base62(link_id) >> LINK_ID_RANDOM_BITS) + LINK_ID_EPOCH_MS
+        return datetime.datetime.fromtimestamp(timestamp / 1000, tz=datetime.timezone.utc)
+
     @staticmethod
     def encode_data(data_to_encode: Any) -> str:  # noqa: ANN401
         """
@@ -55,6 +152,29 @@ class DataEncoder:
         except (JSONDecodeError, binascii.Error) as exc:
             raise DataValidationError(base64_string) from exc
 
+    @staticmethod
+    def decode_file_type(file_id: str) -> FileType:
+        """
+        Decode the file type of a Telegram file ID.
+
+        Parameters:
+            file_id (str): The file ID.
+
+        Returns:
+            FileType: The pyrogram FileType of the file.
+
+        Raises:
+            DataValidationError: If the file ID is invalid or has no file type.
+        """
+        try:
+            file_type = FileId.decode(file_id=file_id).file_type
+        except Exception as exc:
+            raise DataValidationError(file_id) from exc
+
+        if file_type is None:
+            raise DataValidationError(file_id)
+        return file_type
+
     @staticmethod
     def codex_decode(base64_string: str, backup_channel: int) -> list[int]:
         """
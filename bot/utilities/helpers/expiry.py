@@ -0,0 +1,62 @@
+import datetime
+import re
+
+from bot.config import config
+
+EXPIRY_PATTERN = re.compile(r"(\d+)([mhdw])")
+EXPIRY_UNIT_SECONDS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+class ExpiryParser:
+    """
+    Parses link expiry arguments, either a TTL like '30m', '12h', '7d' and '2w' or an absolute date like
+    '2025-12-31' or '2025-12-31T18:00+07:00'.
+    """
+
+    @staticmethod
+    def parse(value: str, now: datetime.datetime | None = None) -> datetime.datetime | None:
+        """
+        Parses a single expiry argument.
+
+        Parameters:
+            value (str): The argument to parse.
+            now (datetime.datetime | None): The time a TTL is relative to, defaults to the current time.
+
+        Returns:
+            datetime.datetime | None: The timezone-aware expiry, or None if the value is not an expiry.
+        """
+        now = now or datetime.datetime.now(tz=datetime.timezone.utc)
+
+        if match := EXPIRY_PATTERN.fullmatch(value.lower()):
+            return now + datetime.timedelta(seconds=int(match.group(1)) * EXPIRY_UNIT_SECONDS[match.group(2)])
+
+        # Require a date separator so plain message IDs are never read as compact ISO dates.
+        if "-" not in value:
+            return None
+        try:
+            expires_at = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return None
+        return expires_at if expires_at.tzinfo else expires_at.replace(tzinfo=datetime.timezone.utc)
+
+    @classmethod
+    def from_args(cls, args: list[str]) -> tuple[datetime.datetime | None, list[str]]:
+        """
+        Takes the first expiry out of command arguments, falling back to config.LINK_TTL.
+
+        Parameters:
+            args (list[str]): The command arguments.
+
+        Returns:
+            tuple[datetime.datetime | None, list[str]]: The expiry, None if links should not expire, and the
+                remaining arguments.
+        """
+        now = datetime.datetime.now(tz=datetime.timezone.utc)
+        for index, arg in enumerate(args):
+            expires_at = cls.parse(arg, now=now)
+            if expires_at is not None:
+                return expires_at, args[:index] + args[index + 1 :]
+
+        if config.LINK_TTL:
+            return now + datetime.timedelta(seconds=config.LINK_TTL), args
+        return None, args
@@ -0,0 +1,127 @@
+import datetime
+import re
+import unicodedata
+from typing import NamedTuple
+
+NON_WORD_PATTERN = re.compile(r"[\W_]+")
+UNIX_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class InvalidLinkCursorError(ValueError):
+    """
+    Raised when a link cursor argument is not a cursor created by LinkCursor.encode.
+    """
+
+    def __init__(self, value: str) -> None:
+        super().__init__(f"Invalid link cursor: {value}")
+
+
+class SearchText:
+    """
+    Normalizes link captions and file names into the searchable text stored with a link: NFKC normalized,
+    case folded, punctuation and markdown stripped, each word kept once.
+    """
+
+    MAX_LENGTH = 4096
+
+    @classmethod
+    def normalize(cls, *values: str | None) -> str:
+        """
+        Builds the search text of a link.
+
+        Parameters:
+            *values (str | None): The captions and file names of the link's files, None values are skipped.
+
+        Returns:
+            str: The space separated words, at most MAX_LENGTH characters.
+        """
+        words = dict.fromkeys(
+            word
+            for value in values
+            if value
+            for word in NON_WORD_PATTERN.sub(" ", unicodedata.normalize("NFKC", value).casefold()).split()
+        )
+        text = " ".join(words)
+        if len(text) > cls.MAX_LENGTH:
+            text = text[: cls.MAX_LENGTH].rsplit(" ", 1)[0]
+        return text
+
+    @classmethod
+    def terms(cls, query: str) -> list[str]:
+        """
+        Splits a search query into normalized terms, a link matches if its search text contains every term.
+
+        Parameters:
+            query (str): The search query.
+
+        Returns:
+            list[str]: The unique terms of the query.
+        """
+        return cls.normalize(query).split()
+
+
+class LinkCursor(NamedTuple):
+    """
+    A keyset pagination cursor over links ordered newest first, the position after the last listed link.
+
+    Parameters:
+        created_at_ms (int): The creation time of the last listed link in milliseconds since the epoch.
+        link (str): The last listed link.
+    """
+
+    created_at_ms: int
+    link: str
+
+    @property
+    def created_at(self) -> datetime.datetime:
+        """
+        Returns the creation time of the last listed link.
+
+        Returns:
+            datetime.datetime: The timezone-aware creation time.
+        """
+        return UNIX_EPOCH + datetime.timedelta(milliseconds=self.created_at_ms)
+
+    @classmethod
+    def from_document(cls, link_document: dict) -> "LinkCursor":
+        """
+        Creates the cursor positioned after a listed link.
+
+        Parameters:
+            link_document (dict): A document returned by StorageBackend.find_links.
+
+        Returns:
+            LinkCursor: The cursor.
+        """
+        created_at: datetime.datetime = link_document["created_at"]
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=datetime.timezone.utc)
+        return cls(round(created_at.timestamp() * 1000), link_document["_id"])
+
+    def encode(self) -> str:
+        """
+        Encodes the cursor as a command argument.
+
+        Returns:
+            str: The encoded cursor.
+        """
+        return f"{self.created_at_ms}_{self.link}"
+
+    @classmethod
+    def decode(cls, value: str) -> "LinkCursor":
+        """
+        Decodes a cursor created by encode.
+
+        Parameters:
+            value (str): The encoded cursor.
+
+        Returns:
+            LinkCursor: The cursor.
+
+        Raises:
+            InvalidLinkCursorError: If the value is not an encoded cursor.
+        """
+        created_at_ms, separator, link = value.partition("_")
+        if not separator or not link or not created_at_ms.isdigit():
+            raise InvalidLinkCursorError(value)
+        return cls(int(created_at_ms), link)
@@ -63,6 +63,27 @@ class PyroHelper:
 
         return channels_n_invite
 
+    @staticmethod
+    async def get_access_hash(client: Client, user_id: int) -> int | None:
+        """
+        Get a user's access hash from the session's peer storage without any request.
+
+        Parameters:
+            client (Client):
+                Pyrogram client instance.
+            user_id (int):
+                The ID of the user, who should have sent the current update.
+
+        Returns:
+            int | None:
+                The access hash, or None if the session does not know the user.
+        """
+        try:
+            peer = await client.storage.get_peer_by_id(user_id)
+        except (KeyError, ValueError):
+            return None
+        return getattr(peer, "access_hash", None)
+
     @staticmethod
     async def option_message(
         client: Client,
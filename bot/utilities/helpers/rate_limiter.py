@@ -5,12 +5,13 @@ from collections.abc import Callable
 from functools import wraps
 from typing import ClassVar
 
-from lru import LRU
 from pyrogram.client import Client
 from pyrogram.types import Message
 
 from bot.config import config
 
+from .cache import MemoryCache
+
 
 class RateLimiter:
     """
@@ -19,8 +20,8 @@ class RateLimiter:
     Attributes:
         MAX_EXECUTIONS_PER_MINUTE_SAME_CHAT (ClassVar[int]):
             The maximum number of executions per minute for the same chat ID.
-        chat_execution_counts (ClassVar[LRU]):
-            A lru dictionary to store the execution counts for each chat ID.
+        chat_execution_counts (ClassVar[MemoryCache]):
+            A lru cache to store the execution counts for each chat ID.
         last_second_reset (ClassVar[float]):
             The time of the last second reset.
         last_minute_reset (ClassVar[float]):
@@ -31,18 +32,19 @@ class RateLimiter:
 
     MAX_EXECUTIONS_PER_MINUTE_SAME_CHAT: ClassVar[int] = 25
 
-    chat_execution_counts: ClassVar[LRU] = LRU(100)
+    chat_execution_counts: ClassVar[MemoryCache] = MemoryCache(name="rate_limiter", max_size=10000)
 
     last_second_reset: ClassVar[float] = time.perf_counter()
     last_minute_reset: ClassVar[float] = time.perf_counter()
 
     @classmethod
-    def cooldown_limiter(cls) -> None:
+    async def cooldown_limiter(cls) -> None:
         """
         Used to update every minute with new time and chat_execution_counts per id.
         Moves queue to execs for rate limiter.
         Deletes the key if there's nothing to execute or queue.
-        Should only be runned once during startup."""
+        Should only be runned once during startup, as a task on the event loop that runs the handlers so
+        chat_execution_counts is never mutated from another thread."""
         exec_per_min = cls.MAX_EXECUTIONS_PER_MINUTE_SAME_CHAT
         cls.logger.info("cooldown_limiter Started...")
 
@@ -57,8 +59,8 @@ class RateLimiter:
                     if execs == 0 and new_queue == 0:
                         cls.chat_execution_counts.pop(key)
                     else:
-                        cls.chat_execution_counts.update({key: {"exec": execs, "queue": new_queue}})
-            time.sleep(2)
+                        cls.chat_execution_counts.set(key, {"exec": execs, "queue": new_queue})
+            await asyncio.sleep(2)
 
     @classmethod
     def hybrid_limiter(cls, func_count: int = 1) -> Callable[[Callable], Callable]:
@@ -93,14 +95,12 @@ class RateLimiter:
 
                 chat_id = message.chat.id
 
-                cls.chat_execution_counts.setdefault(chat_id, {"exec": 0, "queue": 0})
-
-                user_dict = cls.chat_execution_counts[chat_id]
+                user_dict = cls.chat_execution_counts.setdefault(chat_id, {"exec": 0, "queue": 0})
                 now = time.perf_counter()
                 elapsed_time_minute = now - cls.last_minute_reset
 
                 if user_dict["exec"] >= cls.MAX_EXECUTIONS_PER_MINUTE_SAME_CHAT:
-                    cls.chat_execution_counts[chat_id]["queue"] += func_count
+                    user_dict["queue"] += func_count
 
                     sleep_time = 60
                     sleep_queue = (user_dict["queue"] // cls.MAX_EXECUTIONS_PER_MINUTE_SAME_CHAT) + 1
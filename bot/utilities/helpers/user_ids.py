@@ -0,0 +1,134 @@
+import re
+from collections.abc import Sequence
+from io import BytesIO
+from typing import NamedTuple
+
+from pyrogram.client import Client
+from pyrogram.types import Message
+
+SEPARATOR_PATTERN = re.compile(r"[\s,]+")
+USER_ID_PATTERN = re.compile(r"(\d+)(?:-(\d+))?")
+
+
+class TooManyUserIdsError(Exception):
+    """
+    Raised when a user ID list or range holds more IDs than allowed.
+
+    Parameters:
+        limit (int): The maximum amount of user IDs.
+    """
+
+    def __init__(self, limit: int) -> None:
+        super().__init__(f"Too many user IDs, the limit is {limit}")
+
+
+class ParsedUserIds(NamedTuple):
+    """
+    The outcome of parsing user IDs.
+
+    Parameters:
+        user_ids (list[int]): The unique user IDs in ascending order.
+        invalid (list[str]): Tokens that are neither a user ID nor an ascending 'start-end' range.
+    """
+
+    user_ids: list[int]
+    invalid: list[str]
+
+
+class UserIdParser:
+    """
+    Parses user IDs for bulk commands from text, ranges and replied-to text files.
+    """
+
+    MAX_USER_IDS = 100000
+    MAX_FILE_SIZE = 4 * 1024 * 1024
+
+    @classmethod
+    def parse(cls, text: str, limit: int = MAX_USER_IDS) -> ParsedUserIds:
+        """
+        Parses user IDs and inclusive 'start-end' ranges separated by whitespace or commas.
+
+        Parameters:
+            text (str): The text to parse, e.g. '1 2,3\n10-20'.
+            limit (int): The maximum amount of user IDs.
+
+        Returns:
+            ParsedUserIds: The unique user IDs and the tokens that aren't valid, e.g. '-100123' or '20-10'.
+
+        Raises:
+            TooManyUserIdsError: If the text holds more than limit user IDs.
+        """
+        user_ids: set[int] = set()
+        invalid: list[str] = []
+
+        for token in SEPARATOR_PATTERN.split(text):
+            if not token:
+                continue
+
+            match = USER_ID_PATTERN.fullmatch(token)
+            start = int(match.group(1)) if match else 0
+            end = int(match.group(2)) if match and match.group(2) else start
+            if not match or end < start:
+                invalid.append(token)
+                continue
+
+            if len(user_ids) + end - start >= limit:
+                raise TooManyUserIdsError(limit)
+            user_ids.update(range(start, end + 1))
+
+        return ParsedUserIds(user_ids=sorted(user_ids), invalid=invalid)
+
+    @classmethod
+    async def from_message(cls, client: Client, message: Message) -> ParsedUserIds:
+        """
+        Parses user IDs from a command's arguments and the message or text file it replies to.
+
+        Parameters:
+            client (Client): The client instance.
+            message (Message): The command message.
+
+        Returns:
+            ParsedUserIds: The unique user IDs and the tokens that aren't valid.
+
+        Raises:
+            TooManyUserIdsError: If there are more than MAX_USER_IDS user IDs.
+        """
+        texts = [" ".join(message.command[1:])]
+
+        reply = message.reply_to_message
+        if reply and reply.text:
+            texts.append(reply.text)
+        elif (
+            reply
+            and reply.document
+            and reply.document.file_size is not None
+            and reply.document.file_size <= cls.MAX_FILE_SIZE
+        ):
+            document = await client.download_media(reply, in_memory=True)
+            if isinstance(document, BytesIO):
+                texts.append(document.getvalue().decode(errors="ignore"))
+
+        return cls.parse("\n".join(texts))
+
+    @staticmethod
+    async def reply_results(message: Message, results: dict[str, Sequence[int | str]]) -> Message:
+        """
+        Replies with the amount of user IDs per outcome and every user ID's outcome, sent as a text
+        file when it doesn't fit in a message.
+
+        Parameters:
+            message (Message): The command message.
+            results (dict[str, Sequence[int | str]]): The user IDs per outcome, e.g. {"Banned": [1, 2]}.
+
+        Returns:
+            Message: The replied message.
+        """
+        summary = "\n".join(f"**{outcome}:** `{len(user_ids)}`" for outcome, user_ids in results.items())
+        details = "\n".join(f"{user_id} {outcome}" for outcome, user_ids in results.items() for user_id in user_ids)
+
+        if len(summary) + len(details) < 3500:  # noqa: PLR2004
+            return await message.reply(text=f"{summary}\n```\n{details}\n```", quote=True)
+
+        document = BytesIO(details.encode())
+        document.name = "results.txt"
+        return await message.reply_document(document=document, caption=summary, quote=True)
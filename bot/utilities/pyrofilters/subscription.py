@@ -1,8 +1,5 @@
-import datetime
 from typing import ClassVar
 
-import tzlocal
-from lru import LRU
 from pyrogram import filters
 from pyrogram.client import Client
 from pyrogram.enums import ChatMemberStatus
@@ -10,14 +7,16 @@ from pyrogram.errors import UserNotParticipant
 from pyrogram.types import Message
 
 from bot.config import config
-from bot.database import MongoDB
+from bot.database import UserContext, get_storage
+from bot.utilities.helpers import MemoryCache, PyroHelper
 
-database = MongoDB()
+database = get_storage()
 
 
 class SubscriptionMessage(Message):
     def __init__(self) -> None:
         self.user_is_banned = False
+        self.user_context: UserContext | None = None
 
 
 class SubscriptionFilter:
@@ -25,12 +24,34 @@ class SubscriptionFilter:
     A filter to check if a user is subscribed to the required channels.
 
     Attributes:
-        CACHE_USER_SECONDS (int): Amount of seconds before checking the user again to avoid spams.
-        _subs_cache (ClassVar[LRU[int, datetime.datetime]]): A lru dict to store user IDs and their last check time.
+        _subs_cache (ClassVar[MemoryCache]): User IDs recently verified as subscribed, expires after the
+            'subscriptions' cache TTL to avoid checking the same user on every message.
     """
 
-    CACHE_USER_SECONDS: int = 15
-    _subs_cache: ClassVar[LRU] = LRU(10)
+    _subs_cache: ClassVar[MemoryCache] = MemoryCache(name="subscriptions", max_size=10000, ttl=15)
+
+    @staticmethod
+    async def get_user_context(client: Client, message: Message) -> UserContext:
+        """
+        Loads the sender's context once per update and caches it on the message for later filters and handlers.
+        The sender's access hash is stored with them so broadcasts can reach them without resolving the peer.
+
+        Parameters:
+            client (Client): The Pyrogram client.
+            message (Message): The message of the current update.
+
+        Returns:
+            UserContext: The sender's context.
+        """
+        user_context = getattr(message, "user_context", None)
+        if user_context is None:
+            user_id = message.from_user.id
+            user_context = await database.load_user_context(
+                user_id=user_id,
+                access_hash=await PyroHelper.get_access_hash(client=client, user_id=user_id),
+            )
+            message.user_context = user_context  # type: ignore[reportAttributeAccessIssue]
+        return user_context
 
     @classmethod
     def subscription(cls) -> filters.Filter:
@@ -63,20 +84,13 @@ class SubscriptionFilter:
             if user_id in config.ROOT_ADMINS_ID or not config.FORCE_SUB_CHANNELS:
                 return True
 
-            if await database.is_user_banned(user_id):
+            user_context = await cls.get_user_context(client, message)
+            if user_context.banned:
                 message.user_is_banned = True
                 return False
 
             if user_id in cls._subs_cache:
-                user_cache_time = cls._subs_cache.get(user_id)
-                current_time = datetime.datetime.now(tz=tzlocal.get_localzone())
-
-                if user_cache_time and (current_time - user_cache_time) <= datetime.timedelta(
-                    seconds=cls.CACHE_USER_SECONDS,
-                ):
-                    return True
-
-                cls._subs_cache.pop(user_id)
+                return True
 
             for channel_info in config.channels_n_invite.values():
                 channel_id = channel_info["channel_id"]
@@ -88,13 +102,12 @@ class SubscriptionFilter:
                         return False
 
                 except UserNotParticipant:
-                    joined_request_channel = await database.user_requested_channels(user_id)
                     if (not config.PRIVATE_REQUEST) or (
-                        channel_id not in joined_request_channel and config.PRIVATE_REQUEST
+                        channel_id not in user_context.channels and config.PRIVATE_REQUEST
                     ):
                         return False
 
-            cls._subs_cache[user_id] = datetime.datetime.now(tz=tzlocal.get_localzone())
+            cls._subs_cache[user_id] = True
             return True
 
         return filters.create(func, "SubscriptionFilter")
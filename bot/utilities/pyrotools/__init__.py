@@ -1,9 +1,12 @@
+from .file_backup import FileBackup
 from .file_resolver import FileResolverModel, SendMedia
 from .help_cmd import HelpCmd
+from .link_sweeper import LinkSweeper
+from .orphan_collector import OrphanCollector, OrphanReport
 
 
 class Pyrotools(SendMedia):
     pass
 
 
-__all__ = ["FileResolverModel", "HelpCmd"]
+__all__ = ["FileBackup", "FileResolverModel", "HelpCmd", "LinkSweeper", "OrphanCollector", "OrphanReport"]
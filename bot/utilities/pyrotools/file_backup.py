@@ -0,0 +1,78 @@
+from collections.abc import Sequence
+
+from pyrogram.client import Client
+
+from bot.config import config
+from bot.database import StorageBackend
+
+from .file_resolver import FileResolverModel
+
+
+class FileBackup:
+    """
+    Copies files to the backup channel once, files already in the file registry reuse their backup message.
+    """
+
+    FORWARD_LIMIT = 100
+
+    @classmethod
+    async def backup(
+        cls,
+        client: Client,
+        database: StorageBackend,
+        from_chat_id: int,
+        files: Sequence[FileResolverModel],
+    ) -> None:
+        """
+        Claims the registered backup messages of the files, forwards the files missing from the file registry
+        to the backup channel, 100 per request, registers the forwarded copies and points every file's message_id
+        at its backup message. A copy forwarded while another backup registered the same file is deleted and
+        the file points at the registered message instead.
+
+        References are kept if the link is not stored, leaving the backup messages in place.
+
+        Parameters:
+            client (Client): The Pyrogram client instance.
+            database (StorageBackend): The storage backend holding the file registry.
+            from_chat_id (int): The chat the files were sent in.
+            files (Sequence[FileResolverModel]): The files with their message ID in from_chat_id and their
+                file_unique_id, files without one are always forwarded.
+        """
+        registered = await database.claim_registered_files([i.file_unique_id for i in files if i.file_unique_id])
+
+        # Forward each missing file once, even if it was sent twice.
+        pending: dict[str | int, FileResolverModel] = {}
+        for file in files:
+            if file.file_unique_id not in registered:
+                pending.setdefault(file.file_unique_id or file.message_id, file)
+
+        forwarded: dict[str | int, int] = {}
+        keys = list(pending)
+        for i in range(0, len(keys), cls.FORWARD_LIMIT):
+            chunk = keys[i : i + cls.FORWARD_LIMIT]
+            forwarded_messages = await client.forward_messages(
+                chat_id=config.BACKUP_CHANNEL,
+                from_chat_id=from_chat_id,
+                message_ids=[pending[key].message_id for key in chunk],
+                hide_sender_name=True,
+            )
+            forwarded_messages = forwarded_messages if isinstance(forwarded_messages, list) else [forwarded_messages]
+            forwarded.update(zip(chunk, [i.id for i in forwarded_messages], strict=True))
+
+        retained = await database.retain_registered_files(
+            [
+                (file.file_unique_id, forwarded[file.file_unique_id])
+                for file in files
+                if file.file_unique_id and file.file_unique_id not in registered
+            ],
+        )
+        duplicates = [forwarded[key] for key, message_id in retained.items() if forwarded[key] != message_id]
+        if duplicates:
+            await client.delete_messages(chat_id=config.BACKUP_CHANNEL, message_ids=duplicates)
+        registered.update(retained)
+
+        for file in files:
+            if file.file_unique_id in registered:
+                file.message_id = registered[file.file_unique_id]
+            else:
+                file.message_id = forwarded[file.file_unique_id or file.message_id]
@@ -2,12 +2,12 @@ import contextlib
 from itertools import groupby
 from typing import TYPE_CHECKING, Any, cast
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from pyrogram.client import Client
-from pyrogram.file_id import FileId
 from pyrogram.types import InputMediaAudio, InputMediaDocument, InputMediaPhoto, InputMediaVideo, Message
 
 from bot.options import options
+from bot.utilities.helpers import DataEncoder, DataValidationError
 
 if TYPE_CHECKING:
     from collections.abc import Callable
@@ -20,12 +20,34 @@ class FileResolverModel(BaseModel):
     Parameters:
         file_id (str): The file ID.
         caption (str | None): The file caption.
+        message_id (int): The message ID in the file origin.
+        media_group_id (int | None): The media group ID.
+        file_type (str | None): The stored pyrogram FileType name, decoded from file_id if missing.
+        file_unique_id (str | None): The file's unique ID while it is being backed up, never stored in links.
+        file_name (str | None): The file name while the link's search text is built, never stored in links.
     """
 
     caption: str | None
     file_id: str
     message_id: int
     media_group_id: int | None = None
+    file_type: str | None = None
+    file_unique_id: str | None = Field(default=None, exclude=True)
+    file_name: str | None = Field(default=None, exclude=True)
+
+    def get_file_type(self) -> str | None:
+        """
+        Returns the file type name, only decoding the file ID for documents stored without one.
+
+        Returns:
+            str | None: The pyrogram FileType name, or None if the file ID is invalid.
+        """
+        if self.file_type:
+            return self.file_type
+
+        with contextlib.suppress(DataValidationError):
+            return DataEncoder.decode_file_type(self.file_id).name
+        return None
 
 
 class UnsupportedFileError(Exception):
@@ -33,7 +55,7 @@ class UnsupportedFileError(Exception):
     Raised when an unsupported file type is encountered.
     """
 
-    def __init__(self, file_type: FileId | None) -> None:
+    def __init__(self, file_type: str | None) -> None:
         super().__init__(f"Unsupported file: {file_type}")
 
 
@@ -72,7 +94,7 @@ class SendMedia:
             if not getattr(get_file, "empty", False):
                 return cast(Message, await get_file.copy(chat_id=chat_id))  # pyright: ignore[reportCallIssue]
 
-        file_type_data = FileId.decode(file_id=file_data.file_id)
+        file_type = file_data.get_file_type()
         methods: dict[str, Callable[..., Any]] = {
             "AUDIO": client.send_audio,
             "DOCUMENT": client.send_document,
@@ -80,24 +102,22 @@ class SendMedia:
             "VIDEO": client.send_video,
             "STICKER": client.send_sticker,
         }
-        if file_type_data:
-            file_type = file_type_data.file_type.name
-            if file_type in methods:
-                file_kwargs: dict[str, int | str] = {
-                    "chat_id": chat_id,
-                    file_type.lower(): file_data.file_id,
-                    "protect_content": protect_content,
-                }
-
-                if file_type != "STICKER":
-                    file_kwargs["caption"] = file_data.caption or ""
-
-                return await methods[file_type](
-                    **file_kwargs,  # pyright: ignore[reportCallIssue]
-                    # https://github.com/microsoft/pyright/issues/5069#issuecomment-1533839392
-                )
+        if file_type in methods:
+            file_kwargs: dict[str, int | str] = {
+                "chat_id": chat_id,
+                file_type.lower(): file_data.file_id,
+                "protect_content": protect_content,
+            }
+
+            if file_type != "STICKER":
+                file_kwargs["caption"] = file_data.caption or ""
+
+            return await methods[file_type](
+                **file_kwargs,  # pyright: ignore[reportCallIssue]
+                # https://github.com/microsoft/pyright/issues/5069#issuecomment-1533839392
+            )
 
-        raise UnsupportedFileError(file_type_data)
+        raise UnsupportedFileError(file_type)
 
     @classmethod
     async def send_media_group(
@@ -116,11 +136,7 @@ class SendMedia:
 
         media_group = []
         for i in file_data:
-            file_type_data = FileId.decode(file_id=i.file_id)
-            if not file_type_data:
-                continue
-
-            file_type = file_type_data.file_type.name
+            file_type = i.get_file_type()
             if file_type in input_media:
                 media_group.append(input_media[file_type](media=i.file_id, caption=i.caption or ""))
 
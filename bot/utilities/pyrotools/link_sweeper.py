@@ -0,0 +1,105 @@
+import asyncio
+import datetime
+import logging
+from collections.abc import Sequence
+from typing import cast
+
+from pyrogram.client import Client
+from pyrogram.errors import FloodWait, RPCError
+
+from bot.config import config
+from bot.database import StorageBackend
+
+from .file_resolver import FileResolverModel
+
+
+class LinkSweeper:
+    """
+    Deletes expired links in batches, then their files from the backup channel.
+
+    Link documents are deleted before their messages so an interrupted sweep never leaves a link pointing
+    to deleted files, messages another link still refers to are kept.
+
+    Parameters:
+        client (Client): The Pyrogram client instance.
+        database (StorageBackend): The storage backend holding the links.
+        batch_size (int): The amount of link documents deleted per batch.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    DELETE_LIMIT = 100
+
+    def __init__(self, client: Client, database: StorageBackend, batch_size: int = 100) -> None:
+        self.client = client
+        self.database = database
+        self.batch_size = batch_size
+
+    @classmethod
+    async def delete_backup_messages(cls, client: Client, message_ids: Sequence[int], pace: float = 1.0) -> None:
+        """
+        Deletes messages from the backup channel 100 IDs per request, waiting out flood limits.
+
+        Parameters:
+            client (Client): The Pyrogram client instance.
+            message_ids (Sequence[int]): The IDs of the messages to delete.
+            pace (float): Seconds to wait between requests.
+        """
+        for i in range(0, len(message_ids), cls.DELETE_LIMIT):
+            if i:
+                await asyncio.sleep(pace)
+
+            chunk = list(message_ids[i : i + cls.DELETE_LIMIT])
+            try:
+                await client.delete_messages(chat_id=config.BACKUP_CHANNEL, message_ids=chunk)
+            except FloodWait as e:
+                await asyncio.sleep(float(cast(float, e.value)))
+                await client.delete_messages(chat_id=config.BACKUP_CHANNEL, message_ids=chunk)
+
+    @classmethod
+    async def release_backup_messages(
+        cls,
+        client: Client,
+        database: StorageBackend,
+        message_ids: Sequence[int],
+    ) -> None:
+        """
+        Releases the backup messages of deleted links, only deleting the ones no other link refers to.
+
+        Parameters:
+            client (Client): The Pyrogram client instance.
+            database (StorageBackend): The storage backend holding the file registry.
+            message_ids (Sequence[int]): The backup message IDs of the deleted links.
+        """
+        unreferenced = await database.release_registered_messages(message_ids)
+        await cls.delete_backup_messages(client, unreferenced)
+
+    async def sweep(self) -> None:
+        """
+        Deletes every link that has expired, batch_size links at a time.
+        """
+        now = datetime.datetime.now(tz=datetime.timezone.utc)
+        deleted = 0
+
+        while documents := await self.database.get_expired_links(now=now, limit=self.batch_size):
+            link_message_ids = {
+                document["_id"]: [
+                    FileResolverModel(**file).message_id
+                    async for files in self.database.iter_link_files(document)
+                    for file in files
+                ]
+                for document in documents
+                if document["file_origin"] == config.BACKUP_CHANNEL
+            }
+
+            # Only the links this sweep deleted are released, another process may sweep the same batch.
+            deleted_links = await self.database.delete_link_documents([document["_id"] for document in documents])
+            deleted += len(deleted_links)
+            message_ids = [i for link in deleted_links for i in link_message_ids.get(link, [])]
+            try:
+                await self.release_backup_messages(self.client, self.database, message_ids)
+            except RPCError:
+                self.logger.exception("Couldn't delete the backup messages of expired links")
+
+        if deleted:
+            self.logger.info("Deleted %d expired links", deleted)
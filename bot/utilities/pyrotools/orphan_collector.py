@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import time
+from array import array
+from typing import ClassVar, NamedTuple, cast
+
+from pyrogram.client import Client
+from pyrogram.errors import FloodWait
+from pyrogram.types import Message
+
+from bot.config import config
+from bot.database import StorageBackend
+from bot.options import options
+from bot.utilities.helpers import MessageIdBitmap
+
+from .file_resolver import FileResolverModel
+from .link_sweeper import LinkSweeper
+
+
+class OrphanReport(NamedTuple):
+    """
+    The outcome of an orphan collection run.
+
+    Parameters:
+        start_id (int): The first message ID scanned.
+        last_id (int): The last message ID scanned.
+        scanned (int): The amount of existing messages scanned.
+        orphans (array): The IDs of the messages no link or option refers to.
+        deleted (bool): Whether the orphans were deleted.
+    """
+
+    start_id: int
+    last_id: int
+    scanned: int
+    orphans: array
+    deleted: bool
+
+
+class OrphanCollector:
+    """
+    Finds backup channel messages that no link refers to, left over by failed link creation or links
+    deleted while BACKUP_FILES was off.
+
+    The channel's message ID space is walked SCAN_LIMIT IDs at a time and checked against a bitmap of every
+    message ID referenced by links and option messages. Progress is saved after every chunk so an
+    interrupted run resumes where it stopped. Messages younger than GRACE_SECONDS are skipped, since their
+    link may still be being created.
+
+    Parameters:
+        client (Client): The Pyrogram client instance.
+        database (StorageBackend): The storage backend holding the links.
+        pace (float): Seconds to wait between requests.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    STATE_ID = "OrphanCollector"
+    SCAN_LIMIT = 200
+    EMPTY_CHUNKS_LIMIT = 5
+    GRACE_SECONDS = 3600
+
+    lock: ClassVar[asyncio.Lock] = asyncio.Lock()
+
+    def __init__(self, client: Client, database: StorageBackend, pace: float = 1.0) -> None:
+        self.client = client
+        self.database = database
+        self.pace = pace
+
+    async def referenced_message_ids(self) -> MessageIdBitmap:
+        """
+        Collects the backup channel message IDs referenced by links and option messages.
+
+        Returns:
+            MessageIdBitmap: The referenced message IDs.
+        """
+        referenced = MessageIdBitmap()
+        for value in options.settings.model_dump().values():
+            if isinstance(value, int) and not isinstance(value, bool):
+                referenced.add(value)
+
+        async for document in self.database.iter_link_documents(file_origin=config.BACKUP_CHANNEL):
+            async for files in self.database.iter_link_files(document):
+                for file in files:
+                    referenced.add(FileResolverModel(**file).message_id)
+        return referenced
+
+    async def _get_messages(self, message_ids: list[int]) -> list[Message]:
+        try:
+            messages = await self.client.get_messages(chat_id=config.BACKUP_CHANNEL, message_ids=message_ids)
+        except FloodWait as e:
+            await asyncio.sleep(float(cast(float, e.value)))
+            messages = await self.client.get_messages(chat_id=config.BACKUP_CHANNEL, message_ids=message_ids)
+        return messages if isinstance(messages, list) else [messages]
+
+    async def collect(self, delete: bool = False, start_id: int | None = None) -> OrphanReport:  # noqa: FBT001, FBT002
+        """
+        Walks the backup channel and reports or deletes the orphaned messages.
+
+        Parameters:
+            delete (bool): Whether to delete the orphans, 100 per request, or only report them.
+            start_id (int | None): The message ID to start from, defaults to where the last run stopped.
+
+        Returns:
+            OrphanReport: The scanned range and the orphans found.
+        """
+        async with self.lock:
+            state = await self.database.get_settings(self.STATE_ID) or {}
+            start_id = start_id or state.get("last_id", 0) + 1
+            referenced = await self.referenced_message_ids()
+            horizon = time.time() - self.GRACE_SECONDS
+
+            orphans, scanned, empty_chunks = array("q"), 0, 0
+            chunk_start = start_id
+            while chunk_start <= referenced.max_id or empty_chunks < self.EMPTY_CHUNKS_LIMIT:
+                message_ids = list(range(chunk_start, chunk_start + self.SCAN_LIMIT))
+                messages = [i for i in await self._get_messages(message_ids) if not i.empty]
+                empty_chunks = 0 if messages else empty_chunks + 1
+                scanned += len(messages)
+
+                chunk_orphans = [
+                    i.id
+                    for i in messages
+                    if i.id not in referenced and not i.service and i.date and i.date.timestamp() < horizon
+                ]
+                if delete and chunk_orphans:
+                    await LinkSweeper.delete_backup_messages(self.client, chunk_orphans, pace=self.pace)
+                orphans.extend(chunk_orphans)
+
+                chunk_start += self.SCAN_LIMIT
+                await self.database.update_settings(self.STATE_ID, {"last_id": chunk_start - 1})
+                await asyncio.sleep(self.pace)
+
+            # The walk reached the end of the channel, the next run starts over.
+            await self.database.update_settings(self.STATE_ID, {"last_id": 0})
+
+        self.logger.info("Found %d orphaned backup messages from %d", len(orphans), start_id)
+        return OrphanReport(
+            start_id=start_id,
+            last_id=chunk_start - 1,
+            scanned=scanned,
+            orphans=orphans,
+            deleted=delete,
+        )
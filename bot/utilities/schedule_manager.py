@@ -1,4 +1,5 @@
 import datetime
+from collections.abc import Awaitable, Callable
 
 import tzlocal
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -63,5 +64,29 @@ class ScheduleManager:
             args=[client, chat_id, message_ids],
         )
 
+    async def schedule_interval(
+        self,
+        func: Callable[[], Awaitable[None]],
+        interval_seconds: int,
+        run_now: bool = True,  # noqa: FBT001, FBT002
+    ) -> None:
+        """
+        Schedules a recurring task.
+
+        Parameters:
+            func (Callable[[], Awaitable[None]]): The coroutine function to run.
+            interval_seconds (int): The number of seconds between runs.
+            run_now (bool): Whether to run the task immediately instead of after the first interval.
+        """
+        now = datetime.datetime.now(tz=tzlocal.get_localzone())
+        self.scheduler.add_job(
+            func=func,
+            trigger="interval",
+            seconds=interval_seconds,
+            next_run_time=now if run_now else now + datetime.timedelta(seconds=interval_seconds),
+            max_instances=1,
+            coalesce=True,
+        )
+
 
 schedule_manager = ScheduleManager()
@@ -0,0 +1,21 @@
+import asyncio
+import inspect
+import os
+
+import pytest
+
+# Modules that load the bot options at import time get a storage backend that doesn't need a server.
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem: pytest.Function) -> bool | None:
+    """
+    Runs coroutine test functions in a new event loop.
+    """
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+
+    arguments = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}  # noqa: SLF001
+    asyncio.run(pyfuncitem.obj(**arguments))
+    return True
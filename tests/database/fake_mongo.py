@@ -0,0 +1,212 @@
+import copy
+import datetime
+from collections.abc import AsyncIterator
+from typing import Any
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+
+def _matches_condition(value: Any, condition: Any) -> bool:  # noqa: ANN401
+    if not isinstance(condition, dict) or not any(str(i).startswith("$") for i in condition):
+        return value == condition
+
+    for operator, operand in condition.items():
+        if operator == "$in" and value not in operand:
+            return False
+        if operator == "$type" and not (
+            (operand == "number" and isinstance(value, int | float) and not isinstance(value, bool))
+            or (operand == "date" and isinstance(value, datetime.datetime))
+        ):
+            return False
+        if value is None and operator in {"$gt", "$gte", "$lt", "$lte"}:
+            return False
+        if (
+            (operator == "$gt" and not value > operand)
+            or (operator == "$gte" and not value >= operand)
+            or (operator == "$lt" and not value < operand)
+            or (operator == "$lte" and not value <= operand)
+        ):
+            return False
+    return True
+
+
+def matches(document: dict, query: dict) -> bool:
+    """
+    Checks a document against a query of equality, $in, $type and range conditions.
+    """
+    return all(_matches_condition(document.get(field), condition) for field, condition in query.items())
+
+
+def apply_update(document: dict, update: dict, inserted: bool) -> None:  # noqa: FBT001
+    """
+    Applies $set, $setOnInsert, $inc and $addToSet with $each to a document in place.
+    """
+    document.update(update.get("$set", {}))
+    if inserted:
+        document.update(update.get("$setOnInsert", {}))
+    for field, amount in update.get("$inc", {}).items():
+        document[field] = document.get(field, 0) + amount
+    for field, values in update.get("$addToSet", {}).items():
+        field_values = document.setdefault(field, [])
+        field_values.extend(i for i in values.get("$each", [values]) if i not in field_values)
+
+
+def project(document: dict, projection: dict | None) -> dict:
+    if not projection:
+        return copy.deepcopy(document)
+    if not any(projection.values()):
+        return {key: copy.deepcopy(value) for key, value in document.items() if key not in projection}
+
+    fields = {key for key, included in projection.items() if included}
+    if projection.get("_id", 1):
+        fields.add("_id")
+    return {key: copy.deepcopy(value) for key, value in document.items() if key in fields}
+
+
+class UpdateResult:
+    def __init__(self, matched_count: int, upserted_id: Any = None) -> None:  # noqa: ANN401
+        self.matched_count = matched_count
+        self.upserted_id = upserted_id
+
+
+class BulkWriteResult:
+    def __init__(self, upserted_count: int) -> None:
+        self.upserted_count = upserted_count
+
+
+class DeleteResult:
+    def __init__(self, deleted_count: int) -> None:
+        self.deleted_count = deleted_count
+
+
+class FakeCollection:
+    """
+    An in-memory stand-in for the AsyncIOMotorCollection methods used by the database mixins.
+
+    Attributes:
+        documents (dict[Any, dict]): The documents keyed by '_id'.
+        failures (list[Exception | None]): Exceptions raised by the next writes in order, None lets one succeed.
+        rejected (set[Any]): Document IDs whose bulk_write updates fail with a write error.
+        bulk_writes (list[list[UpdateOne]]): The requests of every bulk_write call.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.documents: dict[Any, dict] = {}
+        self.failures: list[Exception | None] = []
+        self.rejected: set[Any] = set()
+        self.bulk_writes: list[list[UpdateOne]] = []
+
+    def _fail(self) -> None:
+        failure = self.failures.pop(0) if self.failures else None
+        if failure is not None:
+            raise failure
+
+    def _find(self, query: dict, sort: list[tuple[str, int]] | None = None) -> list[dict]:
+        documents = [i for i in self.documents.values() if matches(i, query)]
+        for field, direction in reversed(sort or []):
+            documents.sort(key=lambda i: i[field], reverse=direction < 0)
+        return documents
+
+    def _upsert(self, query: dict, update: dict, upsert: bool) -> tuple[dict | None, dict | None, bool]:  # noqa: FBT001
+        documents = self._find(query)
+        if documents:
+            before = copy.deepcopy(documents[0])
+            apply_update(documents[0], update, inserted=False)
+            return before, documents[0], False
+        if not upsert:
+            return None, None, False
+
+        document = {key: value for key, value in query.items() if not isinstance(value, dict)}
+        apply_update(document, update, inserted=True)
+        self.documents[document["_id"]] = document
+        return None, document, True
+
+    async def find(
+        self,
+        filter: dict | None = None,  # noqa: A002
+        projection: dict | None = None,
+        sort: list[tuple[str, int]] | None = None,
+        limit: int = 0,
+        batch_size: int = 0,  # noqa: ARG002
+    ) -> AsyncIterator[dict]:
+        documents = self._find(filter or {}, sort)
+        for document in documents[:limit] if limit else documents:
+            yield project(document, projection)
+
+    async def find_one(
+        self,
+        filter: dict | None = None,  # noqa: A002
+        projection: dict | None = None,
+        sort: list[tuple[str, int]] | None = None,
+    ) -> dict | None:
+        documents = self._find(filter or {}, sort)
+        return project(documents[0], projection) if documents else None
+
+    async def find_one_and_update(
+        self,
+        filter: dict,  # noqa: A002
+        update: dict,
+        *,
+        projection: dict | None = None,
+        upsert: bool = False,
+        return_document: bool = ReturnDocument.BEFORE,
+    ) -> dict | None:
+        self._fail()
+        before, after, _ = self._upsert(filter, update, upsert)
+        document = after if return_document == ReturnDocument.AFTER else before
+        return project(document, projection) if document is not None else None
+
+    async def update_one(self, filter: dict, update: dict, upsert: bool = False) -> UpdateResult:  # noqa: A002, FBT001, FBT002
+        self._fail()
+        before, after, inserted = self._upsert(filter, update, upsert)
+        return UpdateResult(matched_count=int(before is not None), upserted_id=after["_id"] if inserted else None)
+
+    async def bulk_write(self, requests: list[UpdateOne], ordered: bool = True) -> BulkWriteResult:  # noqa: ARG002, FBT001, FBT002
+        self._fail()
+        self.bulk_writes.append(list(requests))
+
+        upserted, errors = 0, []
+        for index, request in enumerate(requests):
+            if request._filter.get("_id") in self.rejected:  # noqa: SLF001
+                errors.append({"index": index, "code": 11000, "errmsg": "E11000 duplicate key error"})
+                continue
+            upserted += self._upsert(request._filter, request._doc, request._upsert)[2]  # noqa: SLF001
+
+        if errors:
+            raise BulkWriteError({"nUpserted": upserted, "writeErrors": errors})
+        return BulkWriteResult(upserted_count=upserted)
+
+    async def insert_one(self, document: dict) -> None:
+        self._fail()
+        self.documents[document["_id"]] = copy.deepcopy(document)
+
+    async def delete_one(self, filter: dict) -> DeleteResult:  # noqa: A002
+        self._fail()
+        documents = self._find(filter)[:1]
+        for document in documents:
+            del self.documents[document["_id"]]
+        return DeleteResult(deleted_count=len(documents))
+
+    async def delete_many(self, filter: dict) -> DeleteResult:  # noqa: A002
+        self._fail()
+        documents = self._find(filter)
+        for document in documents:
+            del self.documents[document["_id"]]
+        return DeleteResult(deleted_count=len(documents))
+
+    async def estimated_document_count(self) -> int:
+        return len(self.documents)
+
+
+class FakeDatabase:
+    """
+    An in-memory stand-in for AsyncIOMotorDatabase, collections are created on first access.
+    """
+
+    def __init__(self) -> None:
+        self.collections: dict[str, FakeCollection] = {}
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return self.collections.setdefault(name, FakeCollection(name))
@@ -0,0 +1,42 @@
+import datetime
+
+from bot.database.counters import Counters
+
+from tests.database.fake_mongo import FakeDatabase
+
+
+class FakeCounters(Counters):
+    def __init__(self) -> None:
+        self.db = FakeDatabase()  # type: ignore[assignment]
+
+
+async def test_counters_increment() -> None:
+    counters = FakeCounters()
+
+    await counters.increment_counter("links")
+    await counters.increment_counter("links", 4)
+    await counters.increment_counter("links", -2)
+    await counters.increment_counter("users", 0)
+
+    stats = await counters.stats()
+    assert (stats.links_count, stats.users_count) == (3, 0)
+    assert "users" not in counters.db["Counters"].documents
+
+
+async def test_counters_reconcile_and_growth() -> None:
+    counters = FakeCounters()
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    snapshots = counters.db["CounterSnapshots"]
+
+    for days, links in ((10, 0), (2, 10), (1, 20)):
+        snapshot_time = now - datetime.timedelta(days=days, minutes=1)
+        snapshots.documents[snapshot_time] = {"_id": snapshot_time, "links": links, "users": links}
+    for link_id in range(30):
+        counters.db["Files"].documents[link_id] = {"_id": link_id}
+    await counters.increment_counter("links", 100)
+
+    await counters.reconcile_counters()
+
+    stats = await counters.stats()
+    assert (stats.links_count, stats.users_count) == (30, 0)
+    assert (len(snapshots.documents), round(stats.links_per_day)) == (3, 10)
@@ -0,0 +1,33 @@
+from bot.database.file_registry import FileRegistry
+
+from tests.database.fake_mongo import FakeDatabase
+
+
+class FakeFileRegistry(FileRegistry):
+    REGISTRY_CONCURRENCY = 2
+
+    def __init__(self) -> None:
+        self.db = FakeDatabase()  # type: ignore[assignment]
+
+
+async def test_file_registry_references() -> None:
+    registry = FakeFileRegistry()
+
+    assert await registry.claim_registered_files(["a", "b"]) == {}
+    assert await registry.retain_registered_files([("a", 10), ("b", 11), ("b", 11)]) == {"a": 10, "b": 11}
+    assert await registry.claim_registered_files(["a", "b", "c", "b"]) == {"a": 10, "b": 11}
+    assert registry.db["FileRegistry"].documents["b"]["refs"] == len(["retain", "retain", "claim", "claim"])
+
+    # 10 is still used by the claimed link, 12 was never registered.
+    assert await registry.release_registered_messages([10, 11, 11, 12]) == [12]
+    assert await registry.release_registered_messages([10, 11, 11]) == [10, 11]
+    assert registry.db["FileRegistry"].documents == {}
+
+
+async def test_file_registry_keeps_the_first_registered_copy() -> None:
+    registry = FakeFileRegistry()
+
+    assert await registry.retain_registered_files([("a", 10)]) == {"a": 10}
+    assert await registry.retain_registered_files([("a", 20), ("b", 21)]) == {"a": 10, "b": 21}
+    assert await registry.release_registered_messages([10]) == []
+    assert await registry.release_registered_messages([10, 20]) == [10, 20]
@@ -0,0 +1,14 @@
+from bot.database import INDEX_MANIFEST, QUERY_SHAPES
+
+
+def test_every_index_has_a_query_shape() -> None:
+    used = {
+        (shape.collection, field)
+        for shape in QUERY_SHAPES
+        for field in [*shape.filter, *(shape.sort or {})]
+        if not field.startswith("$") or field == "$text"
+    }
+    for collection, index_models in INDEX_MANIFEST.items():
+        for index_model in index_models:
+            field, kind = next(iter(index_model.document["key"].items()))
+            assert (collection, "$text" if kind == "text" else field) in used, index_model.document["name"]
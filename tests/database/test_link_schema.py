@@ -0,0 +1,27 @@
+from bot.database import decode_files, encode_files
+
+
+def test_link_schema_roundtrip() -> None:
+    files = [
+        {"caption": None, "file_id": "a", "message_id": 10, "media_group_id": None, "file_type": "VIDEO"},
+        {"caption": "b", "file_id": "b", "message_id": 11, "media_group_id": None, "file_type": "DOCUMENT"},
+    ]
+    encoded = encode_files(files)
+
+    assert encoded["r"] == files[0]["message_id"]
+    assert "m" not in encoded
+    assert "g" not in encoded
+    assert decode_files(encoded) == files
+
+
+def test_link_schema_legacy_and_gaps() -> None:
+    legacy = [{"caption": None, "file_id": "a", "message_id": 1}]
+    assert decode_files(legacy) == legacy
+
+    files = [
+        {"caption": None, "file_id": "a", "message_id": 1, "media_group_id": 5, "file_type": "PHOTO"},
+        {"caption": None, "file_id": "b", "message_id": 3, "media_group_id": 5, "file_type": None},
+    ]
+    encoded = encode_files(files)
+    assert encoded["m"] == [1, 3]
+    assert decode_files(encoded) == files
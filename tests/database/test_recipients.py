@@ -0,0 +1,75 @@
+import pytest
+from bot.database import CODEX_SOURCE, USERS_SOURCE
+from bot.database.counters import Counters
+from bot.database.recipients import Recipients
+from pymongo.errors import AutoReconnect
+
+from tests.database.fake_mongo import FakeDatabase
+
+BOTH_SOURCES = USERS_SOURCE | CODEX_SOURCE
+
+
+class FakeRecipients(Recipients, Counters):
+    def __init__(self) -> None:
+        self.db = FakeDatabase()  # type: ignore[assignment]
+
+
+@pytest.fixture
+def recipients() -> FakeRecipients:
+    Recipients._codex_users_merged = False  # noqa: SLF001
+    recipients = FakeRecipients()
+
+    for user_id in (1, 3, 5):
+        recipients.db["Users"].documents[user_id] = {"_id": user_id, "access_hash": user_id * 10}
+    for user_id in (2, 3, 6, 7):
+        recipients.db["users"].documents[user_id] = {"_id": user_id}
+    recipients.db["users"].documents["admin"] = {"_id": "admin"}
+    recipients.db["Counters"].documents["users"] = {"_id": "users", "value": 3}
+    return recipients
+
+
+async def collect(recipients: FakeRecipients, batch_size: int) -> list[tuple[list[int], list[int], list[int]]]:
+    return [
+        (batch.user_ids.tolist(), list(batch.sources), batch.access_hashes.tolist())
+        async for batch in recipients.iter_user_ids(batch_size=batch_size)
+    ]
+
+
+async def test_recipients_merge_cursors_in_order(recipients: FakeRecipients) -> None:
+    assert await collect(recipients, batch_size=4) == [
+        ([1, 2, 3, 5], [USERS_SOURCE, CODEX_SOURCE, BOTH_SOURCES, USERS_SOURCE], [10, 0, 30, 50]),
+        ([6, 7], [CODEX_SOURCE, CODEX_SOURCE], [0, 0]),
+    ]
+
+
+async def test_recipients_merge_resumes_after_failure(recipients: FakeRecipients) -> None:
+    expected = await collect(recipients, batch_size=10)
+
+    recipients.db["Users"].failures.extend([None, AutoReconnect("down")])
+
+    await recipients.merge_codex_users(batch_size=2)
+    assert not Recipients._codex_users_merged  # noqa: SLF001
+    assert recipients.db["Migrations"].documents[Recipients.MIGRATION_ID] == {
+        "_id": Recipients.MIGRATION_ID,
+        "last_id": 3,
+    }
+    assert await recipients.has_codex_users()
+
+    await recipients.merge_codex_users(batch_size=2)
+    assert [[i._filter["_id"] for i in requests] for requests in recipients.db["Users"].bulk_writes] == [  # noqa: SLF001
+        [2, 3],
+        [6, 7],
+    ]
+    assert Recipients._codex_users_merged  # noqa: SLF001
+    assert recipients.db["Migrations"].documents[Recipients.MIGRATION_ID]["done"]
+    assert (recipients.db["Counters"].documents["users"]["value"], recipients.db["Users"].documents[3]["source"]) == (
+        6,
+        BOTH_SOURCES,
+    )
+    assert "source" not in recipients.db["Users"].documents[1]
+
+    # Merged users live in 'Users', so they are cleaned up from there as well.
+    assert await collect(recipients, batch_size=10) == [
+        (user_ids, [source | USERS_SOURCE for source in sources], access_hashes)
+        for user_ids, sources, access_hashes in expected
+    ]
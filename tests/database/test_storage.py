@@ -0,0 +1,212 @@
+import asyncio
+import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from bot.config import config
+from bot.database import MemoryStorage, SQLiteStorage, StorageBackend
+from bot.utilities.helpers import LinkCursor, SearchText
+from bot.utilities.pyrotools import FileBackup, FileResolverModel, LinkSweeper
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def storage(request: pytest.FixtureRequest, tmp_path: Path) -> StorageBackend:
+    if request.param == "sqlite":
+        return SQLiteStorage(path=str(tmp_path / "test.db"))
+    return MemoryStorage()
+
+
+async def test_storage_links(storage: StorageBackend) -> None:
+    file_data: list[dict[str, str | int]] = [{"file_id": "abc", "message_id": 1}]
+    assert await storage.add_file(file_link="link", file_origin=-100, file_data=file_data)
+    await storage.add_file(file_link="other", file_origin=-200, file_data=file_data)
+    link_document = await storage.get_link_document("link")
+    assert link_document == {"_id": "link", "file_origin": -100, "files": file_data}
+    assert [i async for i in storage.iter_link_documents(file_origin=-100)] == [link_document]
+    assert [files async for files in storage.iter_link_files(link_document)] == [file_data]
+    assert await storage.delete_link_document("other")
+    assert (await storage.stats()).links_count == 1
+
+    assert await storage.delete_link_document("link")
+    assert not await storage.delete_link_document("link")
+    assert await storage.get_link_document("link") is None
+    await storage.close()
+
+
+async def test_storage_link_filter(storage: StorageBackend) -> None:
+    file_data: list[dict[str, str | int]] = [{"file_id": "abc", "message_id": 1}]
+    await storage.add_file("old", -100, file_data)
+    assert storage.link_may_exist("junk")
+
+    await storage.build_link_filter(min_capacity=100)
+    await storage.add_file("new", -100, file_data)
+    assert [storage.link_may_exist(i) for i in ("old", "new", "junk")] == [True, True, False]
+
+    await storage.delete_link_document("old")
+    await storage.delete_link_documents(["new", "junk"])
+    assert not any(storage.link_may_exist(i) for i in ("old", "new", "junk"))
+    await storage.close()
+
+
+async def test_storage_find_links(storage: StorageBackend) -> None:
+    file_data: list[dict[str, str | int]] = [{"file_id": "abc", "message_id": 1}]
+    for link in ("a", "b", "c"):
+        search_text = SearchText.normalize(f"Movie {link}", "trailer.mp4" if link != "b" else None)
+        await storage.add_file(link, -100, file_data, created_by=1, search_text=search_text)
+        await asyncio.sleep(0.002)
+
+    assert "search_text" not in (await storage.get_link_document("a") or {})
+    first_page = await storage.find_links(limit=2)
+    assert [(i["_id"], i["created_by"]) for i in first_page] == [("c", 1), ("b", 1)]
+    after = LinkCursor.from_document(first_page[-1])
+    assert [i["_id"] for i in await storage.find_links(limit=2, after=after)] == ["a"]
+
+    terms = SearchText.terms("MOVIE trailer")
+    assert [i["_id"] for i in await storage.find_links(limit=10, terms=terms)] == ["c", "a"]
+    assert [i["_id"] for i in await storage.find_links(limit=10, after=after, terms=terms)] == ["a"]
+    await storage.close()
+
+
+async def test_storage_expired_links(storage: StorageBackend) -> None:
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    file_data: list[dict[str, str | int]] = [{"file_id": "abc", "message_id": 1}]
+    for link, hours in (("late", -1), ("early", -2), ("future", 1)):
+        await storage.add_file(link, -100, file_data, expires_at=now + datetime.timedelta(hours=hours))
+    await storage.add_file("forever", -100, file_data)
+
+    future = await storage.get_link_document("future")
+    assert future is not None
+    assert future["expires_at"] == now + datetime.timedelta(hours=1)
+    assert not storage.link_expired(future, now=now)
+
+    expired = await storage.get_expired_links(now=now, limit=10)
+    assert [i["_id"] for i in expired] == ["early", "late"]
+    assert storage.link_expired(expired[0], now=now)
+    assert [i["_id"] for i in await storage.get_expired_links(now=now, limit=1)] == ["early"]
+
+    deleted = await storage.delete_link_documents(["early", "late", "missing"])
+    assert (sorted(deleted), (await storage.stats()).links_count) == (["early", "late"], 2)
+    assert await storage.get_expired_links(now=now, limit=10) == []
+    await storage.close()
+
+
+async def test_storage_racing_sweeps(storage: StorageBackend) -> None:
+    class Client:
+        def __init__(self) -> None:
+            self.deleted: list[int] = []
+
+        async def delete_messages(self, chat_id: int, message_ids: list[int]) -> None:  # noqa: ARG002
+            self.deleted += message_ids
+
+    expires_at = datetime.datetime.now(tz=datetime.timezone.utc) - datetime.timedelta(hours=1)
+    for link, message_id, link_expires_at in (("a", 10, expires_at), ("b", 11, expires_at), ("live", 10, None)):
+        file_data: list[dict[str, str | int | None]] = [
+            {"caption": None, "file_id": "abc", "message_id": message_id},
+        ]
+        await storage.add_file(link, config.BACKUP_CHANNEL, file_data, expires_at=link_expires_at)
+        await storage.retain_registered_files([(f"unique{message_id}", message_id)])
+
+    # Both sweeps fetch the same expired batch before either deletes it.
+    get_expired_links = storage.get_expired_links
+
+    async def get_expired_links_together(now: datetime.datetime, limit: int) -> list[dict]:
+        documents = await get_expired_links(now=now, limit=limit)
+        await asyncio.sleep(0.01)
+        return documents
+
+    storage.get_expired_links = get_expired_links_together  # type: ignore[method-assign]
+    client = Client()
+    sweepers = [LinkSweeper(client=client, database=storage) for _ in range(2)]  # type: ignore[arg-type]
+    await asyncio.gather(*(i.sweep() for i in sweepers))
+
+    assert client.deleted == [11]
+    assert await storage.claim_registered_files(["unique10"]) == {"unique10": 10}
+    await storage.close()
+
+
+async def test_storage_file_registry(storage: StorageBackend) -> None:
+    assert await storage.claim_registered_files(["a", "b"]) == {}
+    assert await storage.retain_registered_files([("a", 10), ("b", 11)]) == {"a": 10, "b": 11}
+    assert await storage.claim_registered_files(["a", "c"]) == {"a": 10}
+
+    # 10 is still used by the second link, 12 was never registered.
+    assert await storage.release_registered_messages([10, 11, 12]) == [11, 12]
+    assert await storage.release_registered_messages([10]) == [10]
+    assert await storage.claim_registered_files(["a", "b"]) == {}
+    await storage.close()
+
+
+async def test_storage_racing_backups(storage: StorageBackend) -> None:
+    class Client:
+        def __init__(self) -> None:
+            self.forwarded = 100
+            self.deleted: list[int] = []
+
+        async def forward_messages(self, message_ids: list[int], **_: object) -> list[SimpleNamespace]:
+            # Both backups forward before either registers its copy.
+            await asyncio.sleep(0.01)
+            self.forwarded += len(message_ids)
+            return [SimpleNamespace(id=self.forwarded)]
+
+        async def delete_messages(self, chat_id: int, message_ids: list[int]) -> None:  # noqa: ARG002
+            self.deleted += message_ids
+
+    client = Client()
+    links = [[FileResolverModel(caption=None, file_id="abc", message_id=1, file_unique_id="a")] for _ in range(2)]
+    await asyncio.gather(
+        *(FileBackup.backup(client=client, database=storage, from_chat_id=1, files=files) for files in links),  # type: ignore[arg-type]
+    )
+
+    assert (links[0][0].message_id, links[1][0].message_id, client.deleted) == (101, 101, [102])
+    assert await storage.release_registered_messages([101]) == []
+    assert await storage.release_registered_messages([101]) == [101]
+    await storage.close()
+
+
+async def test_storage_link_accesses(storage: StorageBackend) -> None:
+    assert await storage.top_links(since_day="2025-01-01", limit=10) == []
+    await storage.record_link_accesses({("a", "2025-01-01"): 3, ("b", "2025-01-02"): 2, ("c", "2024-12-31"): 9})
+    await storage.record_link_accesses({("b", "2025-01-01"): 2})
+    await storage.record_link_accesses({})
+
+    assert await storage.top_links(since_day="2025-01-01", limit=10) == [("b", 4), ("a", 3)]
+    assert await storage.top_links(since_day="2025-01-02", limit=1) == [("b", 2)]
+    await storage.close()
+
+
+async def test_storage_users(storage: StorageBackend) -> None:
+    assert not await storage.ban_user(1)
+    assert (await storage.load_user_context(1)).is_new
+    assert await storage.ban_user(1)
+    assert await storage.user_join_request(user_id=1, channel_id=-100)
+    assert await storage.user_join_request(user_id=1, channel_id=-100)
+
+    user_context = await storage.load_user_context(1)
+    assert (user_context.is_new, user_context.banned, user_context.channels) == (False, True, [-100])
+    assert await storage.unban_user(1)
+    assert not await storage.is_user_banned(1)
+
+    await storage.add_user(3)
+    await storage.add_user(2, access_hash=42)
+    await storage.add_user(3, access_hash=-7)
+    batches = [batch async for batch in storage.iter_user_ids(batch_size=2)]
+    assert [list(batch.user_ids) for batch in batches] == [[1, 2], [3]]
+    assert [list(batch.access_hashes) for batch in batches] == [[0, 42], [-7]]
+
+    moderation = await storage.set_users_banned([1, 2, 4], banned=True)
+    assert (moderation.changed, moderation.unchanged, moderation.missing) == ([1, 2], [], [4])
+    assert (await storage.set_users_banned([1], banned=True)).unchanged == [1]
+
+    await storage.cleanup_users([2], [])
+    user_stats = await storage.stats()
+    assert (user_stats.users_count, user_stats.users_per_hour) == (2, 2)
+    await storage.close()
+
+
+async def test_storage_settings(storage: StorageBackend) -> None:
+    assert await storage.get_settings("MainOptions") is None
+    await storage.update_settings("MainOptions", {"GLOBAL_MODE": False, "START_MESSAGE": "hi"})
+    await storage.update_settings("MainOptions", {"GLOBAL_MODE": True})
+    assert await storage.get_settings("MainOptions") == {"GLOBAL_MODE": True, "START_MESSAGE": "hi"}
+    await storage.close()
@@ -0,0 +1,100 @@
+from bot.database.write_behind import WriteBehindQueue
+from pymongo.errors import AutoReconnect
+
+from tests.database.fake_mongo import FakeCollection
+
+
+def make_queue(collection: FakeCollection, upserted: list[int], max_pending: int = 100) -> WriteBehindQueue:
+    async def on_upserted(amount: int) -> None:
+        upserted.append(amount)
+
+    return WriteBehindQueue(
+        collection=collection,  # type: ignore[arg-type]
+        max_batch_size=100,
+        flush_interval=60,
+        max_pending=max_pending,
+        on_upserted=on_upserted,
+    )
+
+
+async def test_write_behind_coalesces_writes() -> None:
+    collection, upserted = FakeCollection("Users"), []
+    queue = make_queue(collection, upserted)
+
+    await queue.upsert(1, set_fields={"name": "a"}, add_to_set={"channels": [10]})
+    await queue.upsert(1, set_fields={"name": "b"}, add_to_set={"channels": [10, 11]})
+    await queue.upsert(2, set_fields={"name": "c"})
+    assert (len(queue), queue.pending_values(1, "channels")) == (2, [10, 11])
+
+    await queue.close()
+
+    assert len(collection.bulk_writes) == 1
+    assert collection.documents == {1: {"_id": 1, "name": "b", "channels": [10, 11]}, 2: {"_id": 2, "name": "c"}}
+    assert upserted == [2]
+
+
+async def test_write_behind_requeues_failed_batches_under_newer_writes() -> None:
+    collection, upserted = FakeCollection("Users"), []
+    queue = make_queue(collection, upserted)
+
+    await queue.upsert(1, set_fields={"name": "old", "lang": "en"}, add_to_set={"channels": [10]})
+    collection.failures.append(AutoReconnect("down"))
+    await queue.flush()
+    assert (collection.documents, len(queue)) == ({}, 1)
+
+    await queue.upsert(1, set_fields={"name": "new"}, add_to_set={"channels": [11]})
+    await queue.close()
+
+    assert collection.documents[1] == {"_id": 1, "name": "new", "lang": "en", "channels": [10, 11]}
+    assert upserted == [1]
+
+
+async def test_write_behind_retries_rejected_writes() -> None:
+    collection, upserted = FakeCollection("Users"), []
+    queue = make_queue(collection, upserted)
+
+    await queue.upsert(1, set_fields={"name": "a"})
+    await queue.upsert(2, set_fields={"name": "b"})
+    collection.rejected.add(2)
+    await queue.flush()
+
+    assert (list(collection.documents), len(queue), upserted) == ([1], 1, [1])
+
+    collection.rejected.clear()
+    await queue.flush()
+
+    assert (list(collection.documents), len(queue), upserted) == ([1, 2], 0, [1, 1])
+
+
+async def test_write_behind_drops_writes_rejected_max_attempts_times() -> None:
+    collection, upserted = FakeCollection("Users"), []
+    queue = make_queue(collection, upserted)
+    collection.rejected.add(1)
+
+    await queue.upsert(1, set_fields={"name": "a"})
+    for _ in range(WriteBehindQueue.max_attempts):
+        await queue.flush()
+
+    assert (len(collection.bulk_writes), len(queue), upserted) == (WriteBehindQueue.max_attempts, 0, [])
+
+
+async def test_write_behind_rejects_new_keys_while_full_and_failing() -> None:
+    collection, upserted = FakeCollection("Users"), []
+    queue = make_queue(collection, upserted, max_pending=2)
+
+    assert await queue.upsert(1, set_fields={"name": "a"})
+    assert await queue.upsert(2, set_fields={"name": "b"})
+
+    collection.failures.append(AutoReconnect("down"))
+    assert not await queue.upsert(3, set_fields={"name": "c"})
+    assert await queue.upsert(1, set_fields={"name": "d"})
+    assert not await queue.upsert(4, set_fields={"name": "e"})
+    assert (len(collection.bulk_writes), len(queue)) == (0, 2)
+
+    queue._retry_at = 0  # noqa: SLF001
+    assert await queue.upsert(3, set_fields={"name": "c"})
+    await queue.close()
+
+    assert sorted(collection.documents) == [1, 2, 3]
+    assert collection.documents[1]["name"] == "d"
+    assert upserted == [2, 1]
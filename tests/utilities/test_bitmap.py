@@ -0,0 +1,11 @@
+from bot.utilities.helpers import MessageIdBitmap
+
+
+def test_message_id_bitmap() -> None:
+    added = [1, 8, 100000]
+    bitmap = MessageIdBitmap()
+    for message_id in [*added, -5]:
+        bitmap.add(message_id)
+
+    assert [i for i in range(-10, 100010) if i in bitmap] == added
+    assert (len(bitmap), bitmap.max_id) == (len(added), added[-1])
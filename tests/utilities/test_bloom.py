@@ -0,0 +1,19 @@
+from bot.utilities.helpers import CountingBloomFilter
+
+
+def test_counting_bloom_filter() -> None:
+    bloom_filter = CountingBloomFilter(capacity=1000, error_rate=0.01)
+    added = [f"link{i}" for i in range(1000)]
+    for key in added:
+        bloom_filter.add(key)
+
+    assert all(key in bloom_filter for key in added)
+    false_positives = sum(f"other{i}" in bloom_filter for i in range(10000))
+    assert false_positives < len(added) / 2
+
+    bloom_filter.add("link0")
+    bloom_filter.discard("link0")
+    assert "link0" in bloom_filter
+    for key in added:
+        bloom_filter.discard(key)
+    assert not any(key in bloom_filter for key in added)
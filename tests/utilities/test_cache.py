@@ -0,0 +1,44 @@
+import time
+
+from bot.utilities.helpers import MemoryCache
+
+
+def test_memory_cache_lru_eviction() -> None:
+    cache = MemoryCache(name="test_lru", max_size=2)
+    cache.set("a", "value_a")
+    cache.set("b", "value_b")
+    assert cache.get("a") == "value_a"
+    cache.set("c", "value_c")
+
+    assert "b" not in cache
+    assert cache.get("a") == "value_a"
+    assert cache.get("c") == "value_c"
+
+    cache_stats = cache.stats()
+    assert (cache_stats.hits, cache_stats.misses, cache_stats.evictions) == (3, 1, 1)
+    assert cache_stats.hit_ratio == 0.75  # noqa: PLR2004
+
+
+def test_memory_cache_ttl() -> None:
+    cache = MemoryCache(name="test_ttl", max_size=10, ttl=0.01)
+    cache.set("a", "value_a")
+    assert cache.get("a") == "value_a"
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_memory_cache_memory_budget() -> None:
+    entry_size = 4
+    cache = MemoryCache(name="test_memory", max_size=0, max_memory=entry_size * 2 + 2, sizeof=len)
+    cache.set("a", "a" * entry_size)
+    cache.set("b", "b" * entry_size)
+    cache.set("c", "c" * entry_size)
+
+    assert "a" not in cache
+    assert cache.memory_usage == entry_size * 2
+
+    cache.set("d", "d" * 11)
+    assert "d" not in cache
+    assert cache.pop("b") == "b" * entry_size
+    assert cache.memory_usage == entry_size
@@ -1,4 +1,8 @@
-from bot.utilities.helpers import DataEncoder
+import time
+
+import pytest
+from bot.utilities.helpers import DataEncoder, DataValidationError
+from pyrogram.file_id import FileId, FileType
 
 
 def test_data_encoder() -> None:
@@ -18,3 +22,21 @@ def test_codex_decoder() -> None:
 
     assert DataEncoder.codex_decode(base64_string_batch, backup_channel) == expected_batch
     assert DataEncoder.codex_decode(base64_string_solo, backup_channel) == expected_solo
+
+
+def test_link_id() -> None:
+    link_ids = [DataEncoder.generate_link_id() for _ in range(1000)]
+    assert link_ids == sorted(set(link_ids))
+    assert all(len(i) == len(link_ids[0]) and i.isalnum() for i in link_ids)
+
+    created_at = DataEncoder.decode_link_id(link_ids[0])
+    assert abs(time.time() - created_at.timestamp()) < 5  # noqa: PLR2004
+    assert DataEncoder.decode_base62(DataEncoder.encode_base62(2**64 - 1)) == 2**64 - 1
+
+
+def test_decode_file_type() -> None:
+    file_id = FileId(file_type=FileType.DOCUMENT, dc_id=1, media_id=1, access_hash=1, file_reference=b"").encode()
+    assert DataEncoder.decode_file_type(file_id) == FileType.DOCUMENT
+
+    with pytest.raises(DataValidationError):
+        DataEncoder.decode_file_type("invalid")
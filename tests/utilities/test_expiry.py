@@ -0,0 +1,16 @@
+import datetime
+
+from bot.utilities.helpers import ExpiryParser
+
+
+def test_expiry_parser() -> None:
+    now = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    assert ExpiryParser.parse("12h", now=now) == now + datetime.timedelta(hours=12)
+    assert ExpiryParser.parse("2W", now=now) == now + datetime.timedelta(weeks=2)
+    assert ExpiryParser.parse("2025-12-31") == datetime.datetime(2025, 12, 31, tzinfo=datetime.timezone.utc)
+    assert ExpiryParser.parse("69") is None
+    assert ExpiryParser.parse("20250101") is None
+
+    expires_at, args = ExpiryParser.from_args(["69", "7d", "70"])
+    assert expires_at is not None
+    assert args == ["69", "70"]
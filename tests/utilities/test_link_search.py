@@ -0,0 +1,21 @@
+import datetime
+
+import pytest
+from bot.utilities.helpers import InvalidLinkCursorError, LinkCursor, SearchText
+
+
+def test_search_text() -> None:
+    assert SearchText.normalize("**Movie** Part_2.mkv", None, "movie PART 3") == "movie part 2 mkv 3"
+    assert SearchText.normalize("\uff2dovie \ufb01le") == "movie file"
+    assert SearchText.terms("  Part-2 ") == ["part", "2"]
+    assert len(SearchText.normalize(*(f"word{i}" for i in range(1000)))) <= SearchText.MAX_LENGTH
+
+
+def test_link_cursor() -> None:
+    created_at = datetime.datetime(2025, 1, 1, 12, 0, 0, 123000, tzinfo=datetime.timezone.utc)
+    cursor = LinkCursor.from_document({"_id": "a_b", "created_at": created_at.replace(tzinfo=None)})
+    assert LinkCursor.decode(cursor.encode()) == cursor
+    assert (cursor.created_at, cursor.link) == (created_at, "a_b")
+
+    with pytest.raises(InvalidLinkCursorError):
+        LinkCursor.decode("link")
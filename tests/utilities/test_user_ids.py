@@ -0,0 +1,16 @@
+import pytest
+from bot.utilities.helpers import ParsedUserIds, TooManyUserIdsError, UserIdParser
+
+
+def test_user_id_parser() -> None:
+    assert UserIdParser.parse("5 1,2\n3-6\t7") == ParsedUserIds(user_ids=[1, 2, 3, 4, 5, 6, 7], invalid=[])
+    assert UserIdParser.parse(", \n") == ParsedUserIds(user_ids=[], invalid=[])
+
+    with pytest.raises(TooManyUserIdsError):
+        UserIdParser.parse("1-10", limit=5)
+
+
+def test_user_id_parser_reports_invalid_tokens() -> None:
+    parsed = UserIdParser.parse("1 -100123 abc 20-10 4-5x 7-7 3--4")
+
+    assert parsed == ParsedUserIds(user_ids=[1, 7], invalid=["-100123", "abc", "20-10", "4-5x", "3--4"])